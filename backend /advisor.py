@@ -1,6 +1,9 @@
 # advisor.py
 class AdvisorAgent:
-    def generate_advice(self, emotion, tasks):
+    # a recalled task must be at least this similar to count as "like today's"
+    min_similarity = 0.3
+
+    def generate_advice(self, emotion, tasks, memory=None, user_id=None):
         tips = {
             "joy": "You're full of energy! Start with creative work first.",
             "sadness": "Try a walk or music between tasks to lift your mood.",
@@ -8,4 +11,26 @@ class AdvisorAgent:
             "anger": "Take breaks often; redirect that fire into results.",
             "neutral": "Perfect time for consistent progress."
         }
-        return f"Advice: {tips.get(emotion, 'Stay balanced today.')} You have {len(tasks)} tasks ahead."
+        advice = f"Advice: {tips.get(emotion, 'Stay balanced today.')} You have {len(tasks)} tasks ahead."
+        past = self._past_success(emotion, tasks, memory, user_id)
+        if past:
+            advice += f" Last time you felt {emotion}, you got \"{past}\" done — start there."
+        return advice
+
+    def _past_success(self, emotion, tasks, memory, user_id):
+        """
+        The completed same-mood task from the RAG memory that is most similar
+        to any one of today's tasks (one query per task, so a long list does
+        not blur into one averaged query).
+        """
+        if memory is None or not tasks:
+            return None
+        best, best_score = None, self.min_similarity
+        for task in dict.fromkeys(tasks):
+            for hit in memory.recall(task, k=10, kind="task", user_id=user_id):
+                if hit["score"] < best_score:
+                    break
+                if hit.get("emotion") == emotion and "Completed" in (hit.get("status") or ""):
+                    best, best_score = hit["text"], hit["score"]
+                    break
+        return best
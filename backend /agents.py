@@ -0,0 +1,143 @@
+# agents.py
+"""
+Long-lived agent instances shared across planning requests.
+
+An AgentRegistry holds one instance per agent name together with its
+lifecycle hooks: start (connect, warm up), stop (release connections) and
+health (a short status). get() builds and starts an agent on first use,
+once, even when several requests ask at the same time; after that every
+request reuses it. Agents kept here must not hold per-request state; that
+belongs in a per-call object such as executor.ExecutionContext.
+
+default_registry() is the process-wide registry with the planner's agents.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+Hook = Optional[Callable[[Any], Any]]
+
+
+class _Entry:
+    def __init__(self, factory: Callable[[], Any], start: Hook, stop: Hook, health: Hook):
+        self.factory = factory
+        self.start = start
+        self.stop = stop
+        self.health = health
+        self.instance: Any = None
+        self.started_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class AgentRegistry:
+    """Named, lazily started agents with start/stop/health hooks."""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], start: Hook = None,
+                 stop: Hook = None, health: Hook = None) -> None:
+        with self._lock:
+            if name in self._entries and self._entries[name].instance is not None:
+                raise RuntimeError(f"agent {name!r} is running; stop it before re-registering")
+            self._entries[name] = _Entry(factory, start, stop, health)
+
+    def _entry(self, name: str) -> _Entry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"no agent registered as {name!r}") from None
+
+    def get(self, name: str) -> Any:
+        """The started instance for `name`; built and started on first use."""
+        entry = self._entry(name)
+        if entry.instance is not None:
+            return entry.instance
+        with entry.lock:
+            if entry.instance is None:
+                agent = entry.factory()
+                try:
+                    if entry.start:
+                        entry.start(agent)
+                except Exception as e:
+                    entry.error = f"{type(e).__name__}: {e}"
+                    raise
+                entry.error = None
+                entry.started_at = time.time()
+                entry.instance = agent
+        return entry.instance
+
+    def start(self) -> "AgentRegistry":
+        """Start every registered agent now instead of on first request."""
+        for name in list(self._entries):
+            self.get(name)
+        return self
+
+    def stop(self) -> None:
+        """Run stop hooks and drop the instances; the next get() starts fresh ones."""
+        for entry in list(self._entries.values()):
+            with entry.lock:
+                agent, entry.instance, entry.started_at = entry.instance, None, None
+                if agent is not None and entry.stop:
+                    try:
+                        entry.stop(agent)
+                    except Exception as e:
+                        entry.error = f"stop failed: {type(e).__name__}: {e}"
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for name, entry in list(self._entries.items()):
+            agent = entry.instance
+            report: Dict[str, Any] = {"state": "running" if agent is not None else "stopped"}
+            if entry.error:
+                report["error"] = entry.error
+            if agent is not None:
+                report["uptime_s"] = round(time.time() - entry.started_at, 1)
+                if entry.health:
+                    try:
+                        report["detail"] = entry.health(agent)
+                    except Exception as e:
+                        report["state"] = "unhealthy"
+                        report["error"] = f"{type(e).__name__}: {e}"
+            out[name] = report
+        return out
+
+
+# ---------- process-wide registry ----------
+_default: Optional[AgentRegistry] = None
+_default_lock = threading.Lock()
+
+
+def _build_default() -> AgentRegistry:
+    # imported here: planner imports this module
+    from advisor import AdvisorAgent
+    from emotion_model import EmotionModel
+    from executor import ExecutorAgent
+    from mcp import MCPAgent
+    from planner import PlannerAgent
+    from rag_index import RAGAgent
+    from tools import ToolAgent
+
+    registry = AgentRegistry()
+    registry.register("emotion", EmotionModel, start=lambda m: m.engine.start(),
+                      health=lambda m: m.engine.status())
+    registry.register("planner", PlannerAgent)
+    registry.register("executor", ExecutorAgent)
+    registry.register("advisor", AdvisorAgent)
+    registry.register("rag", RAGAgent, start=lambda a: a.connect(), stop=lambda a: a.close(),
+                      health=lambda a: a.status())
+    registry.register("mcp", MCPAgent, start=lambda a: a.connect(), health=lambda a: a.status())
+    registry.register("tools", ToolAgent, start=lambda a: a.connect_tools(["calendar_api", "reminder_bot"]),
+                      stop=lambda a: a.close(), health=lambda a: a.status())
+    return registry
+
+
+def default_registry() -> AgentRegistry:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = _build_default()
+    return _default
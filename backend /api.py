@@ -3,10 +3,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import datetime
-import pandas as pd
 
-# reuse your working logic from app.py
-from app import detect_emotion, df_to_tasks, make_events
+# shared logic (importing app.py would run the Streamlit page)
+from core import detect_emotion, make_events, tasks_from_items
 
 app = FastAPI(title="MindSync API")
 
@@ -37,14 +36,11 @@ class ScheduleRequest(BaseModel):
 
 @app.post("/generate_schedule")
 def generate_schedule_api(body: ScheduleRequest):
-    df = pd.DataFrame(
-        [{"Task Name": t.name, "Hours": t.hours, "Minutes": t.minutes} for t in body.tasks]
-    )
-    tasks = df_to_tasks(df)
+    tasks = tasks_from_items(body.tasks)
     h, m = map(int, body.start_time.split(":"))
     start_dt = datetime.datetime.combine(datetime.date.today(), datetime.time(h, m))
     events = make_events(tasks, start_dt, body.break_min)
-    return {"events": events}
+    return {"events": events.to_list()}
 
 @app.get("/")
 def root():
@@ -4,8 +4,6 @@ import datetime
 import pandas as pd
 import json
 import os
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from streamlit_calendar import calendar
 from ics import Calendar, Event
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -13,47 +11,37 @@ from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
 import pickle
 
+from core import df_to_tasks
+from emotion_engine import get_engine
+from optimizer import optimize_order
+from reschedule import apply_diff, apply_edit
+from scheduler import parse_when, schedule_tasks
+
 # ------------------ Page Config ------------------
 st.set_page_config(page_title="🧠 MindSync", layout="wide")
 st.title("🧠 MindSync — Emotion-Aware Smart Scheduler")
 
 # ------------------ Emotion Model ------------------
+# Shared with the API and planner; one resident copy per process.
 @st.cache_resource(show_spinner=False)
 def load_emotion_model():
-    try:
-        from transformers import AutoTokenizer, AutoModelForSequenceClassification
-        import torch as _torch
-
-        model_name = "j-hartmann/emotion-english-distilroberta-base"
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        id2label = {int(k): v for k, v in model.config.id2label.items()}
-        return tokenizer, model, id2label, None
-    except Exception as e:
-        # Return None to let the app continue and show a friendly message
-        return None, None, None, e
-
-tokenizer, model, id2label, _load_err = load_emotion_model()
+    engine = get_engine()
+    engine.load()
+    return engine, engine.error
+
+engine, _load_err = load_emotion_model()
 if _load_err:
     st.warning(
-        "⚠️ The emotion model couldn’t be loaded. "
+        "⚠️ The emotion model couldn’t be loaded, so moods come from keywords for now. "
         "Please update your Python packages: `pip install -U \"torch>=2.2\" \"transformers>=4.42\"`.\n\n"
         f"Details: `{type(_load_err).__name__}: {_load_err}`"
     )
 
 def detect_emotion(text):
-    if not text.strip() or tokenizer is None or model is None:
+    if not text.strip():
         # graceful fallback
         return None, "Neutral", "😐", 0.0
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-    scores = torch.nn.functional.softmax(outputs.logits, dim=1)[0]
-    best_idx = torch.argmax(scores).item()
-    label = id2label[best_idx].lower()
-    emoji, friendly = EMOJI_MAP.get(label, ("🙂", label.capitalize()))
-    confidence = float(scores[best_idx])
-    return label, friendly, emoji, confidence
+    return engine.predict_one(text)
 
 # ------------------ Session Setup ------------------
 if "tasks_df" not in st.session_state:
@@ -110,6 +98,7 @@ with col2:
     break_min = st.number_input("Break between tasks (mins)", 0, 180, 10)
 with col3:
     timezone = st.selectbox("Timezone", ["Asia/Kolkata", "UTC", "US/Eastern", "Europe/London"], 0)
+energy_aware = st.checkbox("Energy-aware ordering", help="Fit tasks to your energy through the day instead of a plain sort")
 
 # ------------------ Helper ------------------
 def emotion_to_strategy(label):
@@ -121,50 +110,6 @@ def emotion_to_strategy(label):
     if label in high: return "long-first"
     return "neutral"
 
-def df_to_tasks(df):
-    tasks = []
-    for _, r in df.iterrows():
-        # Safely extract and convert values
-        hours = r.get("Hours", 0)
-        minutes = r.get("Minutes", 0)
-        try:
-            hours = int(hours) if hours not in [None, ""] else 0
-        except ValueError:
-            hours = 0
-        try:
-            minutes = int(minutes) if minutes not in [None, ""] else 0
-        except ValueError:
-            minutes = 0
-
-        duration_mins = hours * 60 + minutes
-
-        # ✅ Correct column name for task name
-        task_name = str(r.get("Task Name", "") or "").strip()
-
-        task = {
-            "Task": task_name if task_name else "Untitled Task",
-            "Duration (mins)": duration_mins
-        }
-        tasks.append(task)
-    return tasks
-
-
-def make_events(tasks, start_dt, gap):
-    evs = []
-    now = start_dt
-    for task in tasks:
-        # Correct key lookups
-        name = task.get("Task") or task.get("Task Name") or "Untitled Task"
-        mins = int(task.get("Duration (mins)", 30))
-        end = now + datetime.timedelta(minutes=mins)
-        evs.append({
-            "title": name.strip() if name else "Untitled Task",
-            "start": now.strftime("%Y-%m-%dT%H:%M:%S"),
-            "end": end.strftime("%Y-%m-%dT%H:%M:%S")
-        })
-        now = end + datetime.timedelta(minutes=gap)
-    return evs
-
 
 # ------------------ Step 4: Calendar Choice ------------------
 st.markdown("---")
@@ -182,20 +127,45 @@ if st.button("🚀 Generate Smart Schedule"):
     else:
         mood = st.session_state.detected_mood["label"] if st.session_state.detected_mood else None
         strategy = emotion_to_strategy(mood)
-        if strategy == "long-first":
-            task_list.sort(key=lambda x: -x[1])
+        start_dt = datetime.datetime.combine(datetime.date.today(), start_time)
+        if energy_aware:
+            task_list = optimize_order(task_list, mood, start_dt, break_min)
+            st.info("Ordered to match your energy through the day.")
+        elif strategy == "long-first":
+            task_list.sort(key=lambda x: -x["Duration (mins)"])
             st.info("High energy — long tasks first.")
         elif strategy == "short-first":
-            task_list.sort(key=lambda x: x.get("Priority", ""), reverse=True)
+            task_list.sort(key=lambda x: x["Duration (mins)"])
             st.info("Low energy — starting easy.")
         else:
             st.info("Neutral — default order.")
 
-        start_dt = datetime.datetime.combine(datetime.date.today(), start_time)
-        st.session_state.events = make_events(task_list, start_dt, break_min)
+        # the calendar view ends at 23:00, so nothing is placed past it
+        placed = schedule_tasks(task_list, start_dt, break_min, day_end=datetime.time(23, 0))
+        st.session_state.events = placed["events"].to_list()  # edited in place by the calendar
         st.success("✅ Schedule generated!")
+        if placed["unscheduled"]:
+            st.warning("Didn't fit today: " + ", ".join(u["title"] for u in placed["unscheduled"]))
 
 # ------------------ Local Calendar ------------------
+def apply_calendar_change(events, change):
+    """Turn a drag/resize in the calendar into one edit and ripple only the events it hits."""
+    new, old = change.get("event") or {}, change.get("oldEvent") or {}
+    if not new.get("start"):
+        return events
+    # the calendar sends offsets ("...+02:00"); compare instants, not the first 19 characters
+    today = datetime.date.today()
+    old_start = parse_when(old.get("start"), today)
+    idx = next((i for i, e in enumerate(events)
+                if str(e.get("id", i)) == str(new.get("id", ""))
+                or (old_start is not None and e["title"] == old.get("title")
+                    and parse_when(e["start"], today) == old_start)), None)
+    if idx is None:
+        return events
+    op = "resize" if parse_when(new["start"], today) == old_start else "move"
+    edit = {"op": op, "index": idx, "start": new["start"], "end": new.get("end")}
+    return apply_diff(events, apply_edit(events, edit, gap=break_min))
+
 def show_local_calendar():
     st.subheader("📆 Local Calendar")
     if not st.session_state.events:
@@ -234,7 +204,9 @@ def show_local_calendar():
     }
 
     cal_state = calendar(events=st.session_state.events, options=options, key="cal_main")
-    if cal_state and "events" in cal_state:
+    if cal_state and cal_state.get("eventChange"):
+        st.session_state.events = apply_calendar_change(st.session_state.events, cal_state["eventChange"])
+    elif cal_state and "events" in cal_state:
         st.session_state.events = cal_state["events"]
 
     st.download_button(
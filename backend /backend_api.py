@@ -1,104 +1,76 @@
 # backend_api.py
-from fastapi import FastAPI, HTTPException
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
 from typing import List, Optional
+import asyncio
 import datetime as dt
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import threading
+import uuid
 
-# ---------- Optional ML (safe fallback if not installed) ----------
-try:
-    import torch
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
-    _HAS_ML = True
-except Exception:
-    torch = None
-    AutoTokenizer = AutoModelForSequenceClassification = None
-    _HAS_ML = False
-
-_tokenizer = None
-_model = None
-_id2label = None
-
-_EMOJI_MAP = {
-    "joy": ("😄", "Joy"),
-    "sadness": ("😢", "Sadness"),
-    "anger": ("😡", "Anger"),
-    "fear": ("😨", "Fear"),
-    "optimism": ("😊", "Optimism"),
-    "love": ("😍", "Love"),
-    "neutral": ("🙂", "Neutral"),
-}
-
-def _maybe_load_model():
-    global _tokenizer, _model, _id2label
-    if not _HAS_ML or _tokenizer is not None:
-        return
-    model_name = "j-hartmann/emotion-english-distilroberta-base"
-    _tokenizer = AutoTokenizer.from_pretrained(model_name)
-    _model = AutoModelForSequenceClassification.from_pretrained(model_name)
-    _id2label = {int(k): v for k, v in _model.config.id2label.items()}
-
-def _heuristic_emotion(text: str):
-    t = (text or "").lower()
-    if any(w in t for w in ["happy", "great", "excited", "optimistic"]):
-        return ("joy",) + _EMOJI_MAP["joy"] + (0.85,)
-    if any(w in t for w in ["sad", "down", "tired", "exhausted", "anxious"]):
-        return ("sadness",) + _EMOJI_MAP["sadness"] + (0.8,)
-    if any(w in t for w in ["angry", "mad", "furious"]):
-        return ("anger",) + _EMOJI_MAP["anger"] + (0.8,)
-    if any(w in t for w in ["scared", "afraid", "worried", "panic"]):
-        return ("fear",) + _EMOJI_MAP["fear"] + (0.75,)
-    return ("neutral",) + _EMOJI_MAP["neutral"] + (0.6,)
+from agents import default_registry
+from batching import MicroBatcher
+from cache import TTLCache
+from emotion_engine import get_engine
+from event_table import EventsView
+from inference_backends import configure_threads
+from model_loader import loading_policy
+from reschedule import ScheduleIndex, apply_edit
+from scheduler import parse_clock
+import schedule_build
+from schedule_build import ScheduleIn, emotion_to_strategy, schedule_chunk
+import task_queries
+from write_behind import default_writer, shutdown_default_writer
+
+# one shared, lazily-loaded classifier (see emotion_engine.py)
+_engine = get_engine()
+
+def detect_emotion_batch(texts: List[str]):
+    """Classify several texts in one padded forward pass; one result tuple per input."""
+    return _engine.predict(texts)
 
 def detect_emotion(text: str):
-    text = (text or "").strip()
-    if not text:
-        return ("neutral",) + _EMOJI_MAP["neutral"] + (0.0,)
+    return _engine.predict_one(text)
 
-    if not _HAS_ML:
-        return _heuristic_emotion(text)
+def detect_emotion_many(texts: List[str], chunk_size: int = 64, max_tokens: int = 8192):
+    """Bulk detect_emotion: length-bucketed chunks, results in input order."""
+    return _engine.predict_many(texts, chunk_size=chunk_size, max_tokens=max_tokens)
 
-    try:
-        _maybe_load_model()
-        inputs = _tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-        with torch.no_grad():
-            outputs = _model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=1)[0]
-        idx = int(torch.argmax(probs))
-        label = _id2label[idx].lower()
-        emoji, friendly = _EMOJI_MAP.get(label, _EMOJI_MAP["neutral"])
-        conf = float(probs[idx])
-        return (label, friendly, emoji, conf)
-    except Exception:
-        return _heuristic_emotion(text)
-
-def emotion_to_strategy(label: Optional[str]) -> str:
-    if not label:
-        return "neutral"
-    label = label.lower()
-    low = {"sadness", "fear", "anger"}
-    high = {"joy", "optimism", "love"}
-    if label in low: return "short-first"
-    if label in high: return "long-first"
-    return "neutral"
-
-def make_events(tasks, start_dt: dt.datetime, gap: int):
-    events = []
-    now = start_dt
-    for t in tasks:
-        title = t.get("Task") or t.get("Task Name") or "Untitled Task"
-        mins = int(t.get("Duration (mins)", 30))
-        end = now + dt.timedelta(minutes=mins)
-        events.append({
-            "title": (title or "Untitled Task").strip(),
-            "start": now.strftime("%Y-%m-%dT%H:%M:%S"),
-            "end": end.strftime("%Y-%m-%dT%H:%M:%S")
-        })
-        now = end + dt.timedelta(minutes=gap)
-    return events
+# Concurrent /detect_mood calls are coalesced into padded batches.
+_batcher = MicroBatcher(
+    detect_emotion_batch,
+    max_batch_size=int(os.getenv("MINDSYNC_BATCH_MAX_SIZE", "16")),
+    max_wait_ms=float(os.getenv("MINDSYNC_BATCH_MAX_WAIT_MS", "5")),
+)
 
 # ---------- FastAPI ----------
-app = FastAPI(title="MindSync API", version="1.0")
+_BULK_MAX_TEXTS = int(os.getenv("MINDSYNC_BULK_MAX_TEXTS", "10000"))
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # load the model once, off the request path
+    _engine.start()
+    default_writer()
+    yield
+    global _bulk_pool
+    pool, _bulk_pool = _bulk_pool, None  # a restarted app gets a fresh pool
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+    # close tool connection pools and the RAG index (its writer thread and memmaps)
+    default_registry().stop()
+    # rows still queued for tasks_db are written before the process exits
+    shutdown_default_writer()
+
+app = FastAPI(title="MindSync API", version="1.0", lifespan=_lifespan)
 
 # CORS (allow Vite dev)
 app.add_middleware(
@@ -107,59 +79,442 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 class MoodIn(BaseModel):
     text: str
+    user_id: Optional[str] = None
 
-class TaskIn(BaseModel):
-    name: str
-    hours: int = 0
-    minutes: int = 0
+class MoodBatchIn(BaseModel):
+    texts: List[str]
 
-class ScheduleIn(BaseModel):
-    tasks: List[TaskIn]
-    mood_label: Optional[str] = "neutral"
-    start_time: str = "09:00"
+class EditIn(BaseModel):
+    op: str  # move | resize | insert | delete
+    index: Optional[int] = None
+    id: Optional[str] = None
+    title: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    duration: Optional[int] = None
+
+class RescheduleIn(BaseModel):
+    events: Optional[List[dict]] = None  # the current schedule, sorted by start
+    version: Optional[str] = None  # or the token from the previous /reschedule answer
+    edit: EditIn
     break_min: int = 10
+    compact: bool = False
+
+class ExecuteIn(BaseModel):
+    tasks: List[str]
+    mood_label: Optional[str] = "neutral"
+    start_time: Optional[str] = None  # "HH:MM" today; defaults to now
+    task_interval: int = 60  # minutes between planned tasks
+    user_id: Optional[str] = None
+
+def _readiness():
+    return _engine.ready, _engine.status()
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    ready, model = _readiness()
+    return {"ok": True, "live": True, "ready": ready, "loading_policy": loading_policy(), "model": model}
+
+@app.get("/health/live")
+def health_live():
+    return {"live": True}
+
+@app.get("/health/ready")
+def health_ready(response: Response):
+    ready, model = _readiness()
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, "model": model}
 
 @app.post("/detect_mood")
 def detect_mood_api(body: MoodIn):
     try:
-        label, friendly, emoji, conf = detect_emotion(body.text or "")
+        label, friendly, emoji, conf = _batcher.predict(body.text or "")
         label = label or "neutral"
+        if (body.text or "").strip():
+            # an empty text is answered "neutral" but says nothing about the user's mood
+            default_writer().submit("moods", {"label": label, "confidence": conf, "user_id": body.user_id})
         return {"label": label, "friendly": friendly, "emoji": emoji, "confidence": conf}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"detect_mood failed: {type(e).__name__}: {e}")
 
-@app.post("/generate_schedule")
-def generate_schedule_api(body: ScheduleIn):
+@app.post("/detect_mood/batch")
+def detect_mood_batch_api(body: MoodBatchIn):
+    if len(body.texts) > _BULK_MAX_TEXTS:
+        raise HTTPException(status_code=413, detail=f"at most {_BULK_MAX_TEXTS} texts per request")
     try:
-        label = (body.mood_label or "neutral").lower()
-        strategy = emotion_to_strategy(label)
+        results = detect_emotion_many(body.texts)
+        return {"results": [{"label": label or "neutral", "friendly": friendly, "emoji": emoji, "confidence": conf}
+                            for label, friendly, emoji, conf in results]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"detect_mood/batch failed: {type(e).__name__}: {e}")
 
-        # reorder by strategy
-        tasks = list(body.tasks)
-        if strategy == "long-first":
-            tasks.sort(key=lambda t: -((t.hours or 0) * 60 + (t.minutes or 0)))
-        elif strategy == "short-first":
-            tasks.sort(key=lambda t: ((t.hours or 0) * 60 + (t.minutes or 0)))
+@app.get("/metrics")
+def metrics():
+    return {
+        "inference": {"backend": _engine.backend, "threads": configure_threads()},
+        "batching": _batcher.stats(),
+        "emotion_cache": _engine.cache.stats(),
+        "schedule_cache": {**_schedule_cache.stats(), "not_modified": _not_modified},
+        "reschedule_versions": _schedule_versions.stats(),
+        "write_behind": default_writer().stats(),
+    }
 
-        rows = [{"Task": (t.name or "").strip() or "Untitled Task",
-                 "Duration (mins)": (t.hours or 0) * 60 + (t.minutes or 0)} for t in tasks]
+def _json_default(value):
+    if isinstance(value, EventsView):
+        return value.to_list()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
 
-        h, m = [int(x) for x in body.start_time.split(":")]
-        start_dt = dt.datetime.combine(dt.date.today(), dt.time(h, m))
-        evs = make_events(rows, start_dt, body.break_min)
+def _dumps(data) -> str:
+    """json.dumps that formats event views in one pass each, at the response boundary."""
+    return json.dumps(data, default=_json_default)
 
-        return {"events": evs, "strategy": strategy}
+def _json_response(data, headers: Optional[dict] = None) -> Response:
+    # serialized here rather than by FastAPI, which would walk every event dict again
+    return Response(_dumps(data), media_type="application/json", headers=headers)
+
+def build_schedule(body: ScheduleIn, persist: bool = True) -> dict:
+    """
+    schedule_build.build_schedule, saved unless persist=False (bulk workers run
+    in other processes and hand results back to this one to save).
+    """
+    result = schedule_build.build_schedule(body)
+    if persist:
+        persist_schedule((body.mood_label or "neutral").lower(), body.user_id, body.date or dt.date.today(), result)
+    return result
+
+def persist_schedule(label: str, user_id: Optional[str], day: dt.date, result: dict) -> None:
+    """Log a freshly built schedule's tasks and save it for the user (off the request path)."""
+    # generated tasks are logged once per build, not on cache hits
+    titles = result["events"].table.titles  # no need to format the events for this
+    default_writer().submit_many("tasks", [(title, label, "🔜 Pending", user_id) for title in titles])
+    save_schedule(user_id, day, result)
+
+def save_schedule(user_id: Optional[str], day: dt.date, result: dict) -> None:
+    """Make `result` the user's saved schedule for the day (a no-op without user_id)."""
+    if user_id:
+        default_writer().submit("schedules", {"user_id": user_id, "day": day.isoformat(),
+                                              "strategy": result["strategy"], "events": result["events"]})
+
+# ---------- Schedule cache ----------
+# plain (strategy-sorted) schedules are a pure function of the request, so the request hash is both
+# cache key and ETag; optimized ones depend on how far the optimizer got within budget_ms, so they
+# are neither cached nor tagged
+_schedule_cache = TTLCache(
+    maxsize=int(os.getenv("MINDSYNC_SCHEDULE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("MINDSYNC_SCHEDULE_CACHE_TTL", "86400")),
+)
+_not_modified = 0
+_not_modified_lock = threading.Lock()  # sync endpoints run on a thread pool
+
+def schedule_key(body: ScheduleIn) -> str:
+    """
+    sha256 of the request in canonical form: date resolved, and mood reduced to its
+    strategy unless `optimize` is set (the optimizer's energy curve uses the label itself).
+    """
+    data = body.model_dump() if hasattr(body, "model_dump") else body.dict()
+    data["date"] = (body.date or dt.date.today()).isoformat()
+    label = (body.mood_label or "neutral").lower()
+    data["mood_label"] = label if body.optimize else emotion_to_strategy(label)
+    for t in data["tasks"]:
+        t["name"] = (t["name"] or "").strip()
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+def _count_not_modified() -> None:
+    global _not_modified
+    with _not_modified_lock:
+        _not_modified += 1
+
+@app.post("/generate_schedule")
+def generate_schedule_api(body: ScheduleIn, if_none_match: Optional[str] = Header(None)):
+    try:
+        if body.optimize:
+            return _json_response(build_schedule(body))
+        etag = f'"{schedule_key(body)}"'
+        matched = _etag_matches(if_none_match, etag)
+        # a user's request is saved as their schedule for the day even when it is served from
+        # cache or as a 304, or an earlier, different request would stay saved
+        if body.user_id or not matched:
+            result = _schedule_cache.get(etag)
+            if result is None:
+                result = build_schedule(body)
+                _schedule_cache.set(etag, result)
+            else:
+                save_schedule(body.user_id, body.date or dt.date.today(), result)
+        if matched:
+            # the client already holds exactly this schedule
+            _count_not_modified()
+            return Response(status_code=304, headers={"ETag": etag})
+        return _json_response(result, headers={"ETag": etag})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"generate_schedule failed: {type(e).__name__}: {e}")
 
+# ---------- Bulk scheduling ----------
+_BULK_CHUNK = max(1, int(os.getenv("MINDSYNC_BULK_CHUNK", "32")))
+_BULK_IN_FLIGHT = max(1, int(os.getenv("MINDSYNC_BULK_IN_FLIGHT", str(os.cpu_count() or 2))))
+_bulk_pool: Optional[ProcessPoolExecutor] = None
+
+def _bulk_executor() -> ProcessPoolExecutor:
+    """Worker processes for bulk scheduling, started on first use (scheduling is CPU-bound Python)."""
+    global _bulk_pool
+    if _bulk_pool is None:
+        # spawned, not forked: this process already runs threads (writer, batcher, event loop)
+        _bulk_pool = ProcessPoolExecutor(max_workers=_BULK_IN_FLIGHT, mp_context=mp.get_context("spawn"))
+    return _bulk_pool
+
+_BULK_MAX_LINE = max(1, int(os.getenv("MINDSYNC_BULK_MAX_LINE_BYTES", str(1 << 20))))
+
+class _LineTooLong(ValueError):
+    pass
+
+async def _ndjson_lines(request: Request):
+    """Non-empty lines of the request body, read as it arrives; _LineTooLong past _BULK_MAX_LINE bytes."""
+    tail = b""  # the unfinished line after the last newline
+    async for chunk in request.stream():
+        *lines, rest = chunk.split(b"\n")  # only the new bytes are split
+        if lines:
+            lines[0], tail = tail + lines[0], rest
+        else:
+            tail += rest
+        for line in lines:
+            if len(line) > _BULK_MAX_LINE:
+                raise _LineTooLong(f"a line is longer than {_BULK_MAX_LINE} bytes")
+            if line.strip():
+                yield line
+        if len(tail) > _BULK_MAX_LINE:
+            raise _LineTooLong(f"a line is longer than {_BULK_MAX_LINE} bytes")
+    if tail.strip():
+        yield tail
+
+async def _bulk_results(request: Request, body_read: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    pending = {}  # future -> its chunk
+
+    async def _drain():
+        global _bulk_pool
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        lines = []
+        for fut in done:
+            chunk = pending.pop(fut)
+            try:
+                results = fut.result()
+            except BrokenProcessPool as e:
+                _bulk_pool = None  # a worker died; the next chunk starts a fresh pool
+                results = [({"index": i, "user_id": None, "error": f"{type(e).__name__}: {e}"}, None)
+                           for i, _ in chunk]
+            saves = [(saved[0], record["user_id"], saved[1], record) for record, saved in results if saved]
+            if saves:
+                # queueing can block on a full write-behind queue; keep that off the event loop
+                await loop.run_in_executor(None, _persist_all, saves)
+            lines.extend(_dumps(record) + "\n" for record, _ in results)
+        return "".join(lines)
+
+    def _persist_all(saves):
+        for args in saves:
+            persist_schedule(*args)
+
+    def _submit(chunk):
+        pending[loop.run_in_executor(_bulk_executor(), schedule_chunk, chunk)] = chunk
+
+    try:
+        chunk, index, sent, too_long = [], 0, False, None
+        try:
+            async for line in _ndjson_lines(request):
+                chunk.append((index, line))
+                index += 1
+                if len(chunk) < _BULK_CHUNK:
+                    continue
+                _submit(chunk)
+                chunk = []
+                # bounded work in flight: stop reading until a chunk finishes
+                if len(pending) >= _BULK_IN_FLIGHT:
+                    sent = True
+                    yield await _drain()
+        except _LineTooLong as e:
+            if not sent:
+                raise  # nothing sent yet: the whole request is answered 413
+            too_long = e  # results already streamed: finish them, then report where input stopped
+        body_read.set()
+        if chunk:
+            _submit(chunk)
+        while pending:
+            yield await _drain()
+        if too_long is not None:
+            yield _dumps({"index": index, "user_id": None, "error": str(too_long)}) + "\n"
+    finally:
+        for fut in pending:
+            fut.cancel()  # client gone: chunks not yet started are dropped
+
+class _NDJSONStream(StreamingResponse):
+    """
+    Streams while the request body is still being read. Until the body is
+    consumed the body reader is the only receive() caller (request.stream()
+    raises ClientDisconnect); after that a watcher waits on receive() for the
+    disconnect, so a client that hangs up stops the remaining work. The status
+    line is held back until the first result, so an over-long input line
+    found before then is answered 413 instead.
+    """
+    media_type = "application/x-ndjson"
+
+    def __init__(self, content, body_read: asyncio.Event):
+        super().__init__(content)
+        self.body_read = body_read
+
+    async def __call__(self, scope, receive, send):
+        async def _watch():
+            await self.body_read.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        held = []
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                held.append(message)
+                return
+            if held:
+                await send(held.pop())
+            await send(message)
+
+        stream = asyncio.ensure_future(self.stream_response(_send))
+        watch = asyncio.ensure_future(_watch())
+        try:
+            await asyncio.wait({stream, watch}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watch.cancel()
+            stream.cancel()
+        if not stream.cancelled() and stream.exception() is not None:
+            if isinstance(stream.exception(), (ClientDisconnect, OSError)):
+                return  # nobody left to answer
+            if isinstance(stream.exception(), _LineTooLong) and held:
+                await JSONResponse({"detail": str(stream.exception())}, status_code=413)(scope, receive, send)
+                return
+            raise stream.exception()
+
+@app.post("/generate_schedule/bulk")
+async def generate_schedule_bulk_api(request: Request):
+    """
+    NDJSON in, NDJSON out: one /generate_schedule body per line (plus an
+    optional "user_id"), one result per line in completion order, each
+    tagged with its input line "index".
+    """
+    body_read = asyncio.Event()
+    return _NDJSONStream(_bulk_results(request, body_read), body_read)
+
+# ---------- Streaming execution ----------
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _execution_events(body: ExecuteIn, emotion: str, start: dt.datetime):
+    """
+    SSE frames: "plan" first (before any task runs), then one "task" per item
+    as it finishes, then "done". Items are planned, executed and sent one at
+    a time, so nothing per connection grows with the plan.
+    """
+    agents = default_registry()
+    planner, executor = agents.get("planner"), agents.get("executor")
+    yield _sse("plan", {"emotion": emotion, "motivation": planner.strategies[emotion], "total": len(body.tasks)})
+    completed = 0
+    items = planner.iter_plan(emotion, body.tasks, start, body.task_interval)
+    for index, task in enumerate(executor.execute_stream(items, emotion, user_id=body.user_id, persist=True)):
+        completed += "Completed" in task["status"]
+        yield _sse("task", {"index": index, **task}, event_id=index)
+    yield _sse("done", {"total": len(body.tasks), "completed": completed})
+
+@app.post("/execute/stream")
+def execute_stream_api(body: ExecuteIn):
+    """Plan and execute `tasks`, pushing each task's status as a Server-Sent Event."""
+    if not body.tasks:
+        raise HTTPException(status_code=400, detail="no tasks provided")
+    label = (body.mood_label or "neutral").lower()
+    emotion = label if label in default_registry().get("planner").strategies else "neutral"
+    try:
+        start = dt.datetime.combine(dt.date.today(), parse_clock(body.start_time, dt.datetime.now().time()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"bad start_time: {e}")
+    return StreamingResponse(
+        _execution_events(body, emotion, start),
+        media_type="text/event-stream",
+        # no caching, and no buffering by a reverse proxy (nginx), or events arrive in one lump
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ---------- Task history ----------
+@app.get("/tasks")
+def tasks_api(emotion: Optional[str] = None, status: Optional[str] = None, user_id: Optional[str] = None,
+              limit: int = 50):
+    return {"tasks": task_queries.find_tasks(emotion=emotion, status=status, user_id=user_id, limit=limit)}
+
+@app.get("/tasks/stats")
+def tasks_stats_api(user_id: Optional[str] = None):
+    return {"emotions": task_queries.completion_stats(user_id=user_id)}
+
+@app.get("/tasks/history")
+def tasks_history_api(user_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = 50):
+    try:
+        return task_queries.history(user_id=user_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/events")
+def events_api(user_id: str, start: str, end: str):
+    """Saved events overlapping [start, end); dates or ISO datetimes, e.g. a calendar's visible week."""
+    try:
+        return {"events": task_queries.events_between(user_id, start, end)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ---------- Reschedule versions ----------
+# each answer's schedule is kept, indexed, under a fresh single-use token, so the next edit
+# sends the token instead of the whole list and skips the O(n) re-parse
+_schedule_versions = TTLCache(
+    maxsize=int(os.getenv("MINDSYNC_RESCHEDULE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("MINDSYNC_RESCHEDULE_CACHE_TTL", "3600")),
+)
+
+@app.post("/reschedule")
+def reschedule_api(body: RescheduleIn):
+    """Apply one edit and return only what moved: {"changed", "added", "removed", "version"}."""
+    # pydantic v2 renamed dict() to model_dump()
+    edit = getattr(body.edit, "model_dump", body.edit.dict)()
+    if body.version:
+        # popped, so two edits racing on one version cannot both commit into it
+        index = _schedule_versions.pop(body.version)
+        if index is None:
+            raise HTTPException(status_code=409, detail="unknown or expired version; send events")
+    elif body.events is not None:
+        index = ScheduleIndex(body.events)
+    else:
+        raise HTTPException(status_code=400, detail="send events or version")
+    try:
+        try:
+            diff = apply_edit(index, edit, gap=body.break_min, compact=body.compact)
+        except Exception:
+            if body.version:
+                _schedule_versions.set(body.version, index)  # apply_edit changes nothing; still valid
+            raise
+        index.commit(diff)
+    except (ValueError, IndexError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"reschedule failed: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"reschedule failed: {type(e).__name__}: {e}")
+    version = uuid.uuid4().hex
+    _schedule_versions.set(version, index)
+    return {**diff, "version": version}
+
 @app.get("/")
 def root():
     return {"ok": True, "message": "MindSync API running. See /docs"}
@@ -0,0 +1,141 @@
+# batching.py
+"""
+Micro-batching for emotion inference.
+
+Concurrent callers hand their text to a MicroBatcher, which groups whatever
+arrives within a short window (or until the batch is full) into a single
+padded forward pass, then routes each row back to the caller that asked.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class MicroBatcher:
+    """Collects single requests into batches for a batch-capable predict function."""
+
+    def __init__(self, predict_batch: Callable[[Sequence[Any]], List[Any]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._sizes: Dict[int, int] = {}
+        self._busy_s = 0.0
+
+    # ---------- public API ----------
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the returned future resolves to its own result."""
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def predict(self, item: Any, timeout: float = None) -> Any:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            mean = (self._items / self._batches) if self._batches else 0.0
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": round(mean, 3),
+                "largest_batch": self._max_seen,
+                "batch_size_histogram": dict(sorted(self._sizes.items())),
+                "queue_depth": self._queue.qsize(),
+                "busy_seconds": round(self._busy_s, 4),
+            }
+
+    # ---------- worker ----------
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                t = threading.Thread(target=self._run, name="mindsync-batcher", daemon=True)
+                t.start()
+                self._worker = t
+
+    def _collect(self):
+        """Block for the first item, then gather more until full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            t0 = time.perf_counter()
+            try:
+                results = self.predict_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"predict_batch returned {len(results)} results for {len(items)} inputs")
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+            else:
+                for (_, fut), res in zip(batch, results):
+                    fut.set_result(res)
+            self._record(len(batch), time.perf_counter() - t0)
+
+    def _record(self, size: int, elapsed: float):
+        with self._stats_lock:
+            self._batches += 1
+            self._items += size
+            self._max_seen = max(self._max_seen, size)
+            self._sizes[size] = self._sizes.get(size, 0) + 1
+            self._busy_s += elapsed
+
+
+def bucketed_predict(texts: Sequence[str], predict_batch: Callable[[Sequence[str]], List[Any]],
+                     lengths: Sequence[int], chunk_size: int = 64,
+                     max_tokens: int = 8192) -> List[Any]:
+    """
+    Run predict_batch over texts sorted by length, in chunks, and return the
+    results in the original input order.
+
+    Sorting puts texts of similar length in the same chunk, so little of each
+    padded batch is wasted. A chunk is closed when it reaches chunk_size rows
+    or when rows * longest_row would exceed max_tokens, which bounds the size
+    of any one forward pass no matter how many texts are sent.
+    """
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    results: List[Any] = [None] * len(texts)
+
+    def _flush(chunk):
+        out = predict_batch([texts[i] for i in chunk])
+        for i, res in zip(chunk, out):
+            results[i] = res
+
+    chunk: List[int] = []
+    for i in order:
+        longest = max(lengths[i], 1)
+        if chunk and (len(chunk) >= chunk_size or (len(chunk) + 1) * longest > max_tokens):
+            _flush(chunk)
+            chunk = []
+        chunk.append(i)
+    if chunk:
+        _flush(chunk)
+    return results
@@ -0,0 +1,66 @@
+# bench_df_to_tasks.py
+"""
+Benchmark task conversion: the old iterrows loop vs the column-wise
+core.df_to_tasks vs the DataFrame-free core.tasks_from_items path.
+
+    python bench_df_to_tasks.py            # 10k and 100k rows
+    python bench_df_to_tasks.py 5000 50000
+"""
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from core import df_to_tasks, tasks_from_items
+
+
+def df_to_tasks_iterrows(df):
+    """The previous row-by-row implementation, kept here as the baseline."""
+    tasks = []
+    for _, r in df.iterrows():
+        name = str(r.get("Task Name", "") or "").strip() or "Untitled Task"
+        try:
+            hours = int(r.get("Hours", 0) or 0)
+        except Exception:
+            hours = 0
+        try:
+            minutes = int(r.get("Minutes", 0) or 0)
+        except Exception:
+            minutes = 0
+        tasks.append({"Task": name, "Duration (mins)": hours * 60 + minutes})
+    return tasks
+
+
+def _rows(n, seed=7):
+    rng = random.Random(seed)
+    return [{"Task Name": f"Task {i}", "Hours": rng.randint(0, 3), "Minutes": rng.randint(0, 59)} for i in range(n)]
+
+
+def _time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(sizes):
+    print(f"{'rows':>8}  {'iterrows':>10}  {'vectorized':>10}  {'items':>10}  {'speedup':>8}")
+    for n in sizes:
+        rows = _rows(n)
+        df = pd.DataFrame(rows)
+        items = [SimpleNamespace(name=r["Task Name"], hours=r["Hours"], minutes=r["Minutes"]) for r in rows]
+
+        t_old, ref = _time(df_to_tasks_iterrows, df, repeat=1)
+        t_vec, vec = _time(df_to_tasks, df)
+        t_items, direct = _time(tasks_from_items, items)
+        assert vec == ref and direct == ref, "outputs differ"
+        print(f"{n:>8}  {t_old * 1000:>8.1f}ms  {t_vec * 1000:>8.1f}ms  {t_items * 1000:>8.1f}ms  "
+              f"{t_old / t_vec:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
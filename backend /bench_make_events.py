@@ -0,0 +1,64 @@
+# bench_make_events.py
+"""
+Benchmark schedule building: the old per-event datetime/strftime loop vs
+core.make_events formatted with .to_list() (array-backed, one pass) vs
+building the EventTable alone (no strings until it is serialized).
+
+    python bench_make_events.py            # 10k and 100k events
+    python bench_make_events.py 5000 50000
+"""
+import datetime
+import random
+import sys
+import time
+
+from core import make_event_table, make_events
+
+
+def make_events_loop(tasks, start_dt, gap):
+    """The previous dict-per-event implementation, kept here as the baseline."""
+    events = []
+    now = start_dt
+    for t in tasks:
+        title = t.get("Task") or t.get("Task Name") or "Untitled Task"
+        mins = int(t.get("Duration (mins)", 30))
+        end = now + datetime.timedelta(minutes=mins)
+        events.append({
+            "title": title.strip() or "Untitled Task",
+            "start": now.strftime("%Y-%m-%dT%H:%M:%S"),
+            "end": end.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        now = end + datetime.timedelta(minutes=gap)
+    return events
+
+
+def _tasks(n, seed=7):
+    rng = random.Random(seed)
+    return [{"Task": f"Task {i}", "Duration (mins)": rng.randint(5, 240)} for i in range(n)]
+
+
+def _time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(sizes):
+    start = datetime.datetime(2025, 1, 6, 9, 0)
+    print(f"{'events':>8}  {'loop':>10}  {'arrays':>10}  {'table':>10}  {'speedup':>8}")
+    for n in sizes:
+        tasks = _tasks(n)
+        t_old, ref = _time(make_events_loop, tasks, start, 10, repeat=1)
+        t_new, new = _time(lambda *a: make_events(*a).to_list(), tasks, start, 10)
+        t_table, table = _time(make_event_table, tasks, start, 10)
+        plain = [{k: e[k] for k in ("title", "start", "end")} for e in new]  # the loop emits no ids
+        assert plain == ref and list(table.events) == new, "outputs differ"
+        print(f"{n:>8}  {t_old * 1000:>8.1f}ms  {t_new * 1000:>8.1f}ms  {t_table * 1000:>8.1f}ms  "
+              f"{t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
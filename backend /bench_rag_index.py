@@ -0,0 +1,67 @@
+# bench_rag_index.py
+"""
+Benchmark rag_index.VectorIndex: add throughput, cold open, and top-k query
+latency of the IVF search against an exhaustive scan of the same index, with
+the share of the exact top-k scores the IVF search reaches.
+
+    python bench_rag_index.py             # 200k entries
+    python bench_rag_index.py 1000000     # entries (about 170MB on disk)
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from rag_index import VectorIndex
+
+WORDS = ("finish write read review plan call email draft clean cook study practice fix ship test "
+         "notes blog report slides budget groceries workout run yoga piano essay paper invoice "
+         "meeting team client bug release chapter exam garden laundry taxes").split()
+
+
+def _texts(rng, n):
+    return [" ".join(rng.choices(WORDS, k=rng.randint(2, 5))) + f" #{rng.randrange(1000)}" for _ in range(n)]
+
+
+def _ms(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def main(total):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp)
+        t0 = time.perf_counter()
+        for i in range(0, total, 10000):
+            index.add(_texts(rng, min(10000, total - i)), kind="task", user_id=f"user{i // 10000 % 50}")
+        t_add = time.perf_counter() - t0
+        index.close()  # waits for training / regrouping
+
+        t_open, index = _ms(lambda: VectorIndex(tmp))
+        queries = _texts(rng, 100)
+        ivf, exact, reached = [], [], []
+        for q in queries:
+            t, hits = _ms(lambda: index.search(q, k=5, any_user=True))
+            ivf.append(t)
+            nlist, index.nlist = index.nlist, 0  # force the exhaustive scan
+            t, best = _ms(lambda: index.search(q, k=5, any_user=True))
+            index.nlist = nlist
+            exact.append(t)
+            if best:
+                reached.append(sum(h["score"] >= best[-1]["score"] - 1e-6 for h in hits) / len(best))
+        t_user = [_ms(lambda: index.search(q, k=5, user_id="user7"))[0] for q in queries]
+
+        print(f"{total:,} entries, {index.nlist} lists")
+        print(f"  add        {total / t_add:>10,.0f} texts/s")
+        print(f"  open       {t_open:>10.1f} ms")
+        for name, ts in (("ivf", ivf), ("exhaustive", exact), ("one user", t_user)):
+            ts = sorted(ts)
+            print(f"  {name:<10} p50 {statistics.median(ts):7.2f} ms   p95 {ts[int(len(ts) * 0.95)]:7.2f} ms")
+        print(f"  ivf reaches {statistics.mean(reached):.0%} of the exact top-5")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
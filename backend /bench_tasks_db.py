@@ -0,0 +1,68 @@
+# bench_tasks_db.py
+"""
+Benchmark task persistence: the old connect/insert/commit/close per task vs
+tasks_db.save_task on the pooled WAL connection vs tasks_db.save_tasks
+(one executemany transaction per plan).
+
+    python bench_tasks_db.py              # 30-task plans, 2000 rows per method
+    python bench_tasks_db.py 30 5000      # plan size, rows per method
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import tasks_db
+
+
+def save_task_legacy(path, task, emotion, status):
+    """The previous implementation, kept here as the baseline."""
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute("INSERT INTO tasks (task, emotion, status) VALUES (?, ?, ?)", (task, emotion, status))
+    conn.commit()
+    conn.close()
+
+
+def _rows(n):
+    return [(f"Task {i}", "joy", "🔜 Pending") for i in range(n)]
+
+
+def main(plan_size, total):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(legacy_path)  # default rollback journal, synchronous=FULL
+        conn.execute(tasks_db.SCHEMA)
+        conn.close()
+        pooled_path = os.path.join(tmp, "pooled.db")
+        bulk_path = os.path.join(tmp, "bulk.db")
+        rows = _rows(total)
+
+        t0 = time.perf_counter()
+        for r in rows:
+            save_task_legacy(legacy_path, *r)
+        t_legacy = time.perf_counter() - t0
+
+        tasks_db.connect(pooled_path)
+        t0 = time.perf_counter()
+        for r in rows:
+            tasks_db.save_task(*r, path=pooled_path)
+        t_pooled = time.perf_counter() - t0
+
+        tasks_db.connect(bulk_path)
+        t0 = time.perf_counter()
+        for i in range(0, total, plan_size):
+            tasks_db.save_tasks(rows[i:i + plan_size], path=bulk_path)
+        t_bulk = time.perf_counter() - t0
+        tasks_db.close()
+
+        print(f"{total} rows, plans of {plan_size}")
+        for name, t in (("legacy save_task", t_legacy), ("pooled save_task", t_pooled),
+                        ("save_tasks (bulk)", t_bulk)):
+            print(f"  {name:<18} {total / t:>12,.0f} rows/s  ({t * 1000:.0f}ms, {t_legacy / t:.0f}x)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 30, args[1] if len(args) > 1 else 2000)
@@ -0,0 +1,65 @@
+# bench_tools.py
+"""
+Benchmark ToolAgent against fake_tools.FakeToolServer: one calendar event and
+one reminder per task, sent one at a time vs all at once through
+invoke_many(), then the same batch with injected failures (retried) and a
+repeat of an idempotent read (cached).
+
+    python bench_tools.py                 # 20 tasks, 50 ms per call
+    python bench_tools.py 40 100 0.2      # tasks, latency ms, fail rate
+"""
+import sys
+import time
+
+from fake_tools import FakeToolServer
+from tools import ToolAgent, ToolError
+
+TOOLS = ["calendar_api", "reminder_bot"]
+
+
+def _calls(n, tag):
+    calls = []
+    for i in range(n):
+        when = f"2025-01-06 {9 + i // 4:02d}:{i % 4 * 15:02d}"
+        for tool, path, body in (("calendar_api", "/events", {"title": f"Task {i}", "start": when}),
+                                 ("reminder_bot", "/reminders", {"text": f"Task {i}", "at": when})):
+            calls.append({"tool": tool, "method": "POST", "path": path, "body": body,
+                          "headers": {"Idempotency-Key": f"{tag}-{tool}-{i}"}, "idempotent": True})
+    return calls
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def main(tasks, latency_ms, fail_rate):
+    with FakeToolServer(latency_ms=latency_ms) as url:
+        agent = ToolAgent()
+        agent.connect_tools(TOOLS, urls={t: url for t in TOOLS})
+        t_seq, _ = _timed(lambda: [agent.invoke(**c) for c in _calls(tasks, "seq")])
+        t_par, results = _timed(lambda: agent.invoke_many(_calls(tasks, "par")))
+        t_read, _ = _timed(lambda: agent.invoke("calendar_api", "GET", "/events", params={"date": "2025-01-06"}))
+        t_cached, _ = _timed(lambda: agent.invoke("calendar_api", "GET", "/events", params={"date": "2025-01-06"}))
+        agent.close()
+    print(f"{2 * tasks} calls, {latency_ms:.0f} ms each, {agent.max_concurrency} in flight per tool")
+    print(f"  one at a time  {t_seq:8.1f} ms")
+    print(f"  invoke_many    {t_par:8.1f} ms  ({t_seq / t_par:.1f}x), {sum(isinstance(r, ToolError) for r in results)} failed")
+    print(f"  GET /events    {t_read:8.1f} ms, then {t_cached:.2f} ms from cache")
+
+    with FakeToolServer(latency_ms=latency_ms, fail_rate=fail_rate) as url:
+        agent = ToolAgent()
+        agent.connect_tools(TOOLS, urls={t: url for t in TOOLS})
+        t_flaky, results = _timed(lambda: agent.invoke_many(_calls(tasks, "flaky")))
+        stats = agent.stats()["tools"]
+        agent.close()
+    retries = sum(s["retries"] for s in stats.values())
+    failed = sum(isinstance(r, ToolError) for r in results)
+    print(f"  fail rate {fail_rate:.0%}  {t_flaky:8.1f} ms, {retries} retries, {failed} failed for good")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20, float(args[1]) if len(args) > 1 else 50.0,
+         float(args[2]) if len(args) > 2 else 0.2)
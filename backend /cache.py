@@ -0,0 +1,94 @@
+# cache.py
+"""
+Small in-process caches.
+
+TTLCache is a thread-safe LRU with a per-entry time-to-live and
+hit/miss/eviction counters, used to avoid re-running the emotion model on
+check-ins we have already seen.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+_WS = re.compile(r"\s+")
+_EDGE_PUNCT = " \t\n.,!?;:…\"'()[]"
+
+
+def normalize_text(text: str) -> str:
+    """Cache key for a check-in: case-folded, whitespace collapsed, edge punctuation dropped."""
+    return _WS.sub(" ", (text or "").casefold()).strip(_EDGE_PUNCT)
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = max(0, int(maxsize))
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires = entry
+            if self.ttl > 0 and expires <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = (value, self._clock() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a live entry (atomic, so only one caller gets it)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None or (self.ttl > 0 and entry[1] <= self._clock()):
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
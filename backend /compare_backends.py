@@ -0,0 +1,87 @@
+# compare_backends.py
+"""
+Compare inference backends against the fp32 reference.
+
+    python compare_backends.py --backends torch-int8 onnx --texts checkins.txt
+
+Reports, per backend: label agreement with fp32, mean / max absolute
+difference in class probabilities, and batch latency / throughput. Thread
+counts come from MINDSYNC_TORCH_THREADS / MINDSYNC_TORCH_INTEROP_THREADS.
+"""
+import argparse
+import statistics
+import time
+
+import torch
+
+from inference_backends import BACKENDS, configure_threads, load_emotion_model
+
+MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+SAMPLE_TEXTS = [
+    "I'm feeling great today, ready to take on anything!",
+    "tired",
+    "So exhausted after a long week, I just want to sleep.",
+    "I can't believe they cancelled the meeting again, I'm furious.",
+    "Worried about tomorrow's exam, my stomach is in knots.",
+    "Nothing special, just a regular day.",
+    "I love spending time with my family on weekends.",
+    "Feeling a bit down and unmotivated this morning.",
+    "That was a pleasant surprise, I didn't expect the gift!",
+    "Ugh, the traffic was horrible and now I'm late.",
+    "Calm and focused, let's get the report done.",
+    "I'm scared I won't finish the project on time.",
+]
+
+
+def _probs(tokenizer, model, texts, batch_size):
+    out, timings = [], []
+    for i in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt", truncation=True, padding=True)
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            logits = model(**inputs).logits
+        timings.append(time.perf_counter() - t0)
+        out.append(torch.nn.functional.softmax(torch.as_tensor(logits), dim=1))
+    return torch.cat(out), timings
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", default=["torch-int8"], choices=[b for b in BACKENDS if b != "torch"])
+    ap.add_argument("--texts", help="file with one text per line (default: built-in sample)")
+    ap.add_argument("--batch-size", type=int, default=16)
+    ap.add_argument("--model", default=MODEL_NAME)
+    args = ap.parse_args()
+
+    texts = SAMPLE_TEXTS
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    print(f"threads: {configure_threads()}  texts: {len(texts)}  batch: {args.batch_size}")
+    tok, ref_model, id2label = load_emotion_model(args.model, "torch")
+    ref, ref_t = _probs(tok, ref_model, texts, args.batch_size)
+    ref_labels = ref.argmax(dim=1)
+
+    def _report(name, probs, timings):
+        # label agreement and probability drift relative to the fp32 run
+        agree = float((probs.argmax(dim=1) == ref_labels).float().mean())
+        diff = (probs - ref).abs()
+        total = sum(timings)
+        print(f"{name:<11} agreement={agree:7.2%}  mean|dp|={float(diff.mean()):.5f}  "
+              f"max|dp|={float(diff.max()):.5f}  p50 batch={statistics.median(timings) * 1000:7.1f} ms  "
+              f"throughput={len(texts) / total:8.1f} texts/s")
+
+    _report("torch", ref, ref_t)
+    for backend in args.backends:
+        tok_b, model_b, _ = load_emotion_model(args.model, backend)
+        probs, timings = _probs(tok_b, model_b, texts, args.batch_size)
+        _report(backend, probs, timings)
+        flipped = (probs.argmax(dim=1) != ref_labels).nonzero().flatten().tolist()
+        for i in flipped[:5]:
+            print(f"    {id2label[int(ref_labels[i])]} -> {id2label[int(probs[i].argmax())]}: {texts[i][:70]!r}")
+
+
+if __name__ == "__main__":
+    main()
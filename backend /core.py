@@ -2,101 +2,70 @@
 import datetime, re
 from typing import List, Dict, Tuple
 
-# optional ML load (safe fallback if libs are missing)
-try:
-    import torch
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
-    _HAS_ML = True
-except Exception:
-    torch = None
-    AutoTokenizer = AutoModelForSequenceClassification = None
-    _HAS_ML = False
+import numpy as np
+import pandas as pd
 
-_EMOJI_MAP = {
-    "joy": ("😄", "Joy"),
-    "sadness": ("😢", "Sadness"),
-    "anger": ("😡", "Anger"),
-    "fear": ("😨", "Fear"),
-    "optimism": ("😊", "Optimism"),
-    "love": ("😍", "Love"),
-    "neutral": ("🙂", "Neutral"),
-}
+from emotion_engine import get_engine
+from event_table import EventTable, EventsView
+from schedule_build import tasks_from_items  # re-exported; it lives with the request models
 
-_tokenizer = None
-_model = None
-_id2label = None
+def start_model_loading():
+    """Kick off the one-time model load in the background (call from app startup)."""
+    get_engine().start()
 
-def _maybe_load_model():
-    global _tokenizer, _model, _id2label
-    if not _HAS_ML or _tokenizer is not None:
-        return
-    model_name = "j-hartmann/emotion-english-distilroberta-base"
-    _tokenizer = AutoTokenizer.from_pretrained(model_name)
-    _model = AutoModelForSequenceClassification.from_pretrained(model_name)
-    _id2label = {int(k): v for k, v in _model.config.id2label.items()}
+def model_status() -> Dict:
+    return get_engine().status()
 
-def _heuristic_emotion(text: str) -> Tuple[str, str, str, float]:
-    t = text.lower()
-    if any(x in t for x in ["happy", "excited", "optimistic", "great"]):
-        return ("joy",) + _EMOJI_MAP["joy"] + (0.85,)
-    if any(x in t for x in ["sad", "down", "tired", "exhausted", "anxious"]):
-        return ("sadness",) + _EMOJI_MAP["sadness"] + (0.8,)
-    if any(x in t for x in ["angry", "mad", "furious"]):
-        return ("anger",) + _EMOJI_MAP["anger"] + (0.8,)
-    if any(x in t for x in ["scared", "afraid", "worried", "panic"]):
-        return ("fear",) + _EMOJI_MAP["fear"] + (0.75,)
-    return ("neutral",) + _EMOJI_MAP["neutral"] + (0.6,)
+def detect_emotion_batch(texts: List[str]) -> List[Tuple[str, str, str, float]]:
+    """detect_emotion for several texts in one padded forward pass, in input order."""
+    return get_engine().predict(texts)
 
 def detect_emotion(text: str):
     """Return (label, friendly, emoji, confidence). Never raises for missing ML."""
-    text = (text or "").strip()
-    if not text:
-        return ("neutral",) + _EMOJI_MAP["neutral"] + (0.0,)
+    return get_engine().predict_one(text)
 
-    if not _HAS_ML:
-        return _heuristic_emotion(text)
+def detect_emotion_many(texts: List[str], chunk_size: int = 64,
+                        max_tokens: int = 8192) -> List[Tuple[str, str, str, float]]:
+    """
+    Bulk detect_emotion for imports. Texts are bucketed by token length and run
+    in bounded chunks; results come back in the original order.
+    """
+    return get_engine().predict_many(texts, chunk_size=chunk_size, max_tokens=max_tokens)
 
-    try:
-        _maybe_load_model()
-        inputs = _tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-        with torch.no_grad():
-            outputs = _model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=1)[0]
-        idx = int(torch.argmax(probs))
-        label = _id2label[idx].lower()
-        emoji, friendly = _EMOJI_MAP.get(label, _EMOJI_MAP["neutral"])
-        conf = float(probs[idx])
-        return (label, friendly, emoji, conf)
-    except Exception:
-        # If ML path fails, fallback – keeps API stable
-        return _heuristic_emotion(text)
+def _int_column(df, col: str):
+    """int() of every cell, 0 where that would fail, computed column-wise."""
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    raw = df[col]
+    num = pd.to_numeric(raw, errors="coerce")
+    if not pd.api.types.is_numeric_dtype(raw):
+        # int("2.5") raises, so only integer-looking strings count
+        try:
+            int_like = raw.str.fullmatch(r"\s*[+-]?\d+\s*")
+            num = num.mask(int_like.eq(False))
+        except AttributeError:
+            pass
+    num = num.replace([np.inf, -np.inf], np.nan).fillna(0)
+    return num.to_numpy(dtype=np.float64).astype(np.int64)
 
 def df_to_tasks(df) -> List[Dict]:
-    tasks = []
-    for _, r in df.iterrows():
-        name = str(r.get("Task Name", "") or "").strip() or "Untitled Task"
-        try:
-            hours = int(r.get("Hours", 0) or 0)
-        except Exception:
-            hours = 0
-        try:
-            minutes = int(r.get("Minutes", 0) or 0)
-        except Exception:
-            minutes = 0
-        tasks.append({"Task": name, "Duration (mins)": hours * 60 + minutes})
-    return tasks
+    """Task dicts from the editor DataFrame, converted column-wise rather than row by row."""
+    if len(df) == 0:
+        return []
+    if "Task Name" in df.columns:
+        names = df["Task Name"].astype(object).where(df["Task Name"].notna(), "")
+        names = names.astype(str).str.strip().replace("", "Untitled Task").tolist()
+    else:
+        names = ["Untitled Task"] * len(df)
+    mins = (_int_column(df, "Hours") * 60 + _int_column(df, "Minutes")).tolist()
+    return [{"Task": name, "Duration (mins)": m} for name, m in zip(names, mins)]
+
+def make_event_table(tasks: List[Dict], start_dt: datetime.datetime, gap: int) -> EventTable:
+    """make_events without the per-event dicts; format with .to_list() or read .events."""
+    titles = [(t.get("Task") or t.get("Task Name") or "Untitled Task").strip() or "Untitled Task" for t in tasks]
+    durations = [int(t.get("Duration (mins)", 30)) for t in tasks]
+    return EventTable.back_to_back(titles, durations, start_dt, gap)
 
-def make_events(tasks: List[Dict], start_dt: datetime.datetime, gap: int) -> List[Dict]:
-    events = []
-    now = start_dt
-    for t in tasks:
-        title = t.get("Task") or t.get("Task Name") or "Untitled Task"
-        mins = int(t.get("Duration (mins)", 30))
-        end = now + datetime.timedelta(minutes=mins)
-        events.append({
-            "title": title.strip() or "Untitled Task",
-            "start": now.strftime("%Y-%m-%dT%H:%M:%S"),
-            "end": end.strftime("%Y-%m-%dT%H:%M:%S"),
-        })
-        now = end + datetime.timedelta(minutes=gap)
-    return events
+def make_events(tasks: List[Dict], start_dt: datetime.datetime, gap: int) -> EventsView:
+    """Back-to-back events as a read-only list-of-dicts view, formatted when read or serialized."""
+    return make_event_table(tasks, start_dt, gap).events
@@ -0,0 +1,294 @@
+# emotion_engine.py
+"""
+The one emotion classifier every entry point shares.
+
+get_engine() hands out a process-wide EmotionEngine per (model, backend),
+so app.py, core.py, backend_api.py, emotion_model.py and the planner all
+use the same resident copy of the weights. An engine owns its one-time
+loader and exposes a batch-capable predict(); results go through a shared
+TTL cache, and the keyword heuristic covers missing ML, loading and failures.
+
+Every result is the usual (label, friendly, emoji, confidence) tuple.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from batching import bucketed_predict
+from cache import TTLCache, normalize_text
+from emotion_lexicon import default_lexicon
+from inference_backends import load_emotion_model, selected_backend
+from model_loader import ModelLoader
+
+# ---------- Optional ML (safe fallback if not installed) ----------
+try:
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification  # noqa: F401
+    _HAS_ML = True
+except Exception:
+    torch = None
+    _HAS_ML = False
+
+DEFAULT_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+HEURISTIC_ID = "heuristic"
+LONG_TEXT_MODES = ("off", "mean", "max")
+
+EmotionResult = Tuple[str, str, str, float]
+
+EMOJI_MAP = {
+    "joy": ("😄", "Joy"),
+    "sadness": ("😢", "Sadness"),
+    "anger": ("😡", "Anger"),
+    "fear": ("😨", "Fear"),
+    "optimism": ("😊", "Optimism"),
+    "love": ("😍", "Love"),
+    "neutral": ("🙂", "Neutral"),
+}
+
+
+def make_result(label: str, confidence: float) -> EmotionResult:
+    emoji, friendly = EMOJI_MAP.get(label, EMOJI_MAP["neutral"])
+    return (label, friendly, emoji, float(confidence))
+
+
+def heuristic_emotion(text: str) -> EmotionResult:
+    """Keyword fallback: one pass over the text scores every lexicon category."""
+    label, confidence = default_lexicon().classify(text)
+    return make_result(label, confidence)
+
+
+# results keyed on (model id, normalized text), shared by every engine
+_cache = TTLCache(
+    maxsize=int(os.getenv("MINDSYNC_EMOTION_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MINDSYNC_EMOTION_CACHE_TTL", "3600")),
+)
+
+
+class EmotionEngine:
+    """A lazily-loaded classifier with a batch predict API and heuristic fallback."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, backend: Optional[str] = None):
+        self.model_name = model_name
+        self.backend = backend or selected_backend()
+        # backends can disagree slightly, so cached results are keyed per backend
+        self.model_id = f"{model_name}@{self.backend}"
+        self.cache = _cache
+        # long journal entries: "off" truncates at the model limit, "mean"/"max" window the text
+        self.long_text = os.getenv("MINDSYNC_LONG_TEXT", "mean").strip().lower()
+        if self.long_text not in LONG_TEXT_MODES:
+            raise ValueError(f"MINDSYNC_LONG_TEXT must be one of {', '.join(LONG_TEXT_MODES)}")
+        self.window_stride = int(os.getenv("MINDSYNC_LONG_TEXT_STRIDE", "64"))
+        self.max_windows = max(1, int(os.getenv("MINDSYNC_LONG_TEXT_MAX_WINDOWS", "8")))
+        self.window_batch = max(1, int(os.getenv("MINDSYNC_LONG_TEXT_WINDOW_BATCH", "32")))
+        # loaded once; callers that arrive mid-load follow MINDSYNC_LOADING_POLICY
+        self._loader = ModelLoader(lambda: load_emotion_model(self.model_name, self.backend), name=self.model_id)
+
+    # ---------- lifecycle ----------
+    @property
+    def has_ml(self) -> bool:
+        return _HAS_ML
+
+    @property
+    def ready(self) -> bool:
+        # without ML the heuristic *is* the serving path, so we are ready at once
+        return self._loader.ready if _HAS_ML else True
+
+    def start(self) -> None:
+        """Begin loading in the background (call from app startup)."""
+        if _HAS_ML:
+            self._loader.start_background()
+
+    def load(self):
+        """Load synchronously; returns (tokenizer, model, id2label) or None on failure."""
+        return self._loader.load() if _HAS_ML else None
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self._loader.error
+
+    def status(self) -> Dict[str, Any]:
+        if not _HAS_ML:
+            return {"name": self.model_id, "state": "unavailable"}
+        return self._loader.status()
+
+    def components(self):
+        """(tokenizer, model, id2label), or raise so callers take the heuristic path."""
+        loaded = self._loader.get()
+        if loaded is None:
+            raise RuntimeError(f"emotion model {self._loader.state}")
+        return loaded
+
+    # ---------- inference ----------
+    def _forward(self, model, inputs):
+        with torch.no_grad():
+            outputs = model(**inputs)
+        return torch.nn.functional.softmax(outputs.logits, dim=1)
+
+    def _windowed_probs(self, tokenizer, model, texts: List[str]):
+        """
+        Class probabilities per text from overlapping token windows.
+
+        Each text is split into windows of the model's max length overlapping
+        by `window_stride` tokens; texts longer than `max_windows` windows are
+        thinned to evenly spaced windows so memory stays bounded. Windows run
+        in batches of `window_batch` rows and are combined per text by
+        averaging ("mean") or by keeping the most confident window ("max").
+        """
+        max_len = min(getattr(tokenizer, "model_max_length", 512) or 512, 512)
+        enc = tokenizer(texts, truncation=True, max_length=max_len, stride=self.window_stride,
+                        return_overflowing_tokens=True)
+        owners = enc.get("overflow_to_sample_mapping")
+        if owners is None:
+            # slow tokenizers cannot window; fall back to plain truncation
+            return self._forward(model, tokenizer(texts, return_tensors="pt", truncation=True, padding=True))
+
+        per_text: List[List[int]] = [[] for _ in texts]
+        for w, owner in enumerate(owners):
+            per_text[owner].append(w)
+        cap = self.max_windows
+        for n, ws in enumerate(per_text):
+            if len(ws) > cap:
+                per_text[n] = [ws[round(k * (len(ws) - 1) / max(cap - 1, 1))] for k in range(cap)]
+
+        keys = [k for k in enc.keys() if k != "overflow_to_sample_mapping"]
+        flat = [w for ws in per_text for w in ws]
+        chunks = []
+        for i in range(0, len(flat), self.window_batch):
+            rows = flat[i:i + self.window_batch]
+            batch = tokenizer.pad({k: [enc[k][w] for w in rows] for k in keys}, return_tensors="pt")
+            chunks.append(self._forward(model, batch))
+        window_probs = torch.cat(chunks)
+
+        out, pos = [], 0
+        for ws in per_text:
+            p = window_probs[pos:pos + len(ws)]
+            pos += len(ws)
+            if self.long_text == "max":
+                out.append(p[int(p.max(dim=1).values.argmax())])
+            else:
+                out.append(p.mean(dim=0))
+        return torch.stack(out)
+
+    def _model_predict(self, texts: List[str]) -> List[EmotionResult]:
+        tokenizer, model, id2label = self.components()
+        if self.long_text == "off":
+            probs = self._forward(model, tokenizer(texts, return_tensors="pt", truncation=True, padding=True))
+        else:
+            probs = self._windowed_probs(tokenizer, model, texts)
+        confs, best = torch.max(probs, dim=1)
+        return [make_result(id2label[int(best[row])].lower(), float(confs[row])) for row in range(len(texts))]
+
+    def predict(self, texts: Sequence[str]) -> List[EmotionResult]:
+        """Classify several texts in one padded forward pass; one result per input."""
+        texts = [(t or "").strip() for t in texts]
+        results = [make_result("neutral", 0.0) for _ in texts]
+
+        # group repeats by normalized text so each distinct check-in is looked up once
+        pending: Dict[str, List[int]] = {}
+        for i, t in enumerate(texts):
+            if t:
+                pending.setdefault(normalize_text(t), []).append(i)
+
+        def _fill(norm, res):
+            for i in pending[norm]:
+                results[i] = res
+
+        misses = list(pending)
+        if self.has_ml:
+            misses = []
+            for norm in pending:
+                hit = self.cache.get((self.model_id, norm))
+                if hit is None:
+                    misses.append(norm)
+                else:
+                    _fill(norm, hit)
+            if misses:
+                try:
+                    preds = self._model_predict([texts[pending[norm][0]] for norm in misses])
+                    for norm, res in zip(misses, preds):
+                        self.cache.set((self.model_id, norm), res)
+                        _fill(norm, res)
+                    misses = []
+                except Exception:
+                    # If ML path fails, fallback – keeps API stable
+                    pass
+
+        # heuristic answers live under their own key, never under the model id
+        for norm in misses:
+            key = (HEURISTIC_ID, norm)
+            res = self.cache.get(key)
+            if res is None:
+                res = heuristic_emotion(texts[pending[norm][0]])
+                self.cache.set(key, res)
+            _fill(norm, res)
+        return results
+
+    def predict_one(self, text: str) -> EmotionResult:
+        return self.predict([text])[0]
+
+    def token_lengths(self, texts: Sequence[str], block: int = 256) -> List[int]:
+        """Token count per text (whitespace words until the model is loaded)."""
+        if _HAS_ML and self._loader.ready:
+            try:
+                tokenizer = self._loader.value[0]
+                lengths = []
+                for i in range(0, len(texts), block):
+                    enc = tokenizer([t or "" for t in texts[i:i + block]], truncation=True)
+                    lengths.extend(len(ids) for ids in enc["input_ids"])
+                return lengths
+            except Exception:
+                pass
+        return [len((t or "").split()) for t in texts]
+
+    def predict_many(self, texts: Sequence[str], chunk_size: int = 64,
+                     max_tokens: int = 8192) -> List[EmotionResult]:
+        """
+        Bulk predict for imports. Texts are bucketed by token length and run
+        in bounded chunks; results come back in the original order.
+        """
+        return bucketed_predict(texts, self.predict, self.token_lengths(texts),
+                                chunk_size=chunk_size, max_tokens=max_tokens)
+
+
+# ---------- registry ----------
+_engines: Dict[Tuple[str, str], Any] = {}
+_factories: Dict[str, Callable[[str, str], Any]] = {}
+_registry_lock = threading.Lock()
+
+
+def default_model_name() -> str:
+    return os.getenv("MINDSYNC_EMOTION_MODEL", DEFAULT_MODEL)
+
+
+def register_engine_factory(model_name: str, factory: Callable[[str, str], Any]) -> None:
+    """Plug in a custom engine for a model name; factory(model_name, backend) -> engine."""
+    with _registry_lock:
+        _factories[model_name] = factory
+
+
+def _default_factory():
+    # API workers can hand inference to a shared process pool (see inference_pool.py)
+    if os.getenv("MINDSYNC_INFERENCE_POOL", "").strip():
+        from inference_pool import RemoteEngine
+        return RemoteEngine
+    return EmotionEngine
+
+
+def get_engine(model_name: Optional[str] = None, backend: Optional[str] = None):
+    """The process-wide engine for (model, backend), created on first use."""
+    model_name = model_name or default_model_name()
+    backend = backend or selected_backend()
+    key = (model_name, backend)
+    engine = _engines.get(key)
+    if engine is None:
+        with _registry_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                factory = _factories.get(model_name) or _default_factory()
+                engine = _engines[key] = factory(model_name, backend)
+    return engine
+
+
+def engines() -> Dict[str, Dict[str, Any]]:
+    """Status of every engine resident in this process."""
+    return {engine.model_id: engine.status() for engine in list(_engines.values())}
@@ -0,0 +1,134 @@
+# emotion_lexicon.py
+"""
+Keyword matcher behind the heuristic emotion fallback.
+
+All lexicon entries are compiled into one case-insensitive regex whose
+alternation is factored as a trie, so a single left-to-right scan scores
+every category at once, cost proportional to the text length rather than
+to the number of keywords. Matches respect word boundaries ("sad" does not
+fire inside "crusade").
+
+The lexicon is JSON:
+
+    {"joy": {"confidence": 0.85, "words": ["happy", "feeling good", ...]}, ...}
+
+`words` may also be a {"word": weight} mapping. The bundled
+emotion_lexicon.json is always loaded; MINDSYNC_LEXICON can point at an
+extra file whose words are merged in (and whose confidences override).
+Category order in the file breaks score ties.
+"""
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "emotion_lexicon.json")
+NEUTRAL = ("neutral", 0.6)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for `words`, factored by common prefix."""
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def _walk(node) -> str:
+        end = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            piece = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(piece + _walk(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # a shorter word ends here; the longer continuations stay optional
+            return "(?:" + body + ")?"
+        return body
+
+    return _walk(trie)
+
+
+class EmotionLexicon:
+    """Compiled keyword lexicon scoring every category in one pass."""
+
+    def __init__(self, categories: Dict[str, Dict]):
+        self.order: List[str] = []
+        self.confidence: Dict[str, float] = {}
+        self._word_cat: Dict[str, Tuple[str, float]] = {}
+        for cat, spec in categories.items():
+            self.add_category(cat, spec)
+        self._compile()
+
+    def add_category(self, cat: str, spec: Dict) -> None:
+        cat = cat.lower()
+        if cat not in self.order:
+            self.order.append(cat)
+        if "confidence" in spec:
+            self.confidence[cat] = float(spec["confidence"])
+        self.confidence.setdefault(cat, 0.75)
+        words = spec.get("words", [])
+        items = words.items() if isinstance(words, dict) else ((w, 1.0) for w in words)
+        for word, weight in items:
+            key = " ".join(word.lower().split())
+            if key:
+                self._word_cat[key] = (cat, float(weight))
+
+    def _compile(self) -> None:
+        body = _trie_pattern(self._word_cat) if self._word_cat else r"(?!x)x"
+        self._regex = re.compile(r"(?<!\w)(?:" + body + r")(?!\w)", re.IGNORECASE)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Weighted keyword hits per category."""
+        out: Dict[str, float] = {}
+        for m in self._regex.finditer(text or ""):
+            hit = self._word_cat.get(" ".join(m.group(0).lower().split()))
+            if hit:
+                cat, weight = hit
+                out[cat] = out.get(cat, 0.0) + weight
+        return out
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """(label, confidence) of the best-scoring category, or neutral."""
+        scores = self.scores(text)
+        if not scores:
+            return NEUTRAL
+        best = max(scores, key=lambda c: (scores[c], -self.order.index(c)))
+        return best, self.confidence[best]
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str]) -> "EmotionLexicon":
+        merged: Dict[str, Dict] = {}
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            for cat, spec in data.items():
+                target = merged.setdefault(cat, {"words": {}})
+                if "confidence" in spec:
+                    target["confidence"] = spec["confidence"]
+                words = spec.get("words", [])
+                items = words.items() if isinstance(words, dict) else ((w, 1.0) for w in words)
+                target["words"].update(items)
+        return cls(merged)
+
+
+_default: Optional[EmotionLexicon] = None
+_default_lock = threading.Lock()
+
+
+def default_lexicon() -> EmotionLexicon:
+    """Bundled lexicon plus MINDSYNC_LEXICON, compiled once per process."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                paths = [DEFAULT_LEXICON_PATH]
+                extra = os.getenv("MINDSYNC_LEXICON", "").strip()
+                if extra:
+                    paths.append(extra)
+                _default = EmotionLexicon.from_files(paths)
+    return _default
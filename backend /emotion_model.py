@@ -1,25 +1,52 @@
 # emotion_model.py
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+from emotion_engine import get_engine
 
-def load_emotion_model(model_name="bhadresh-savani/distilbert-base-uncased-emotion"):
+
+class EmotionModel:
+    """Planner-facing wrapper around the shared emotion engine."""
+
+    def __init__(self, model_name=None, backend=None):
+        self.engine = get_engine(model_name, backend)
+
+    def detect_emotion(self, text):
+        """
+        Detects the emotion in a piece of text.
+        Returns: {"emotion", "friendly", "emoji", "confidence"}
+        """
+        label, friendly, emoji, confidence = self.engine.predict_one(text)
+        return {"emotion": label, "friendly": friendly, "emoji": emoji, "confidence": confidence}
+
+    def detect_emotions(self, texts):
+        """Batch version of detect_emotion, one dict per input text."""
+        return [{"emotion": label, "friendly": friendly, "emoji": emoji, "confidence": confidence}
+                for label, friendly, emoji, confidence in self.engine.predict(texts)]
+
+
+def load_emotion_model(model_name=None):
     """
-    Loads a pre-trained emotion detection model.
+    Loads the shared emotion detection model.
     Returns a tuple of (tokenizer, model, id2label mapping)
     """
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSequenceClassification.from_pretrained(model_name)
-    id2label = model.config.id2label
-    return tokenizer, model, id2label
+    engine = get_engine(model_name)
+    if engine.load() is None:
+        raise RuntimeError(f"emotion model unavailable: {engine.error or 'torch/transformers not installed'}")
+    return engine.components()
 
 
-def predict_emotion(text, tokenizer, model, id2label):
+def predict_emotion(text, tokenizer=None, model=None, id2label=None):
     """
     Predicts emotion and confidence score for a given text.
+    Uses the shared engine unless an explicit tokenizer/model is passed.
     Returns: (emotion_label, confidence)
     """
+    if tokenizer is None or model is None:
+        label, _, _, confidence = get_engine().predict_one(text)
+        return label, confidence
+
+    import torch
     inputs = tokenizer(text, return_tensors="pt", truncation=True)
-    outputs = model(**inputs)
+    with torch.no_grad():
+        outputs = model(**inputs)
     probs = torch.nn.functional.softmax(outputs.logits, dim=1)
     pred_id = torch.argmax(probs).item()
     emotion = id2label[pred_id]
@@ -1,19 +1,46 @@
 # executor.py
 import random
 
-class ExecutorAgent:
+from write_behind import default_writer
+
+
+class ExecutionContext:
+    """Per-call execution state, so one ExecutorAgent can serve every request."""
     def __init__(self):
         self.completed_tasks = []
 
-    def execute_plan(self, plan):
-        for task in plan["plan"]:
-            task["status"] = random.choice(["✅ Completed", "⏳ In Progress", "🔜 Pending"])
-            if "Completed" in task["status"]:
-                self.completed_tasks.append(task["task"])
-        return plan
-
     def summary(self):
         return {
             "completed": len(self.completed_tasks),
             "tasks_completed": self.completed_tasks
         }
+
+
+class ExecutorAgent:
+    """Stateless: results go into the ExecutionContext passed to each call."""
+
+    def execute_plan(self, plan, context=None, persist=False):
+        context = context if context is not None else ExecutionContext()
+        for _ in self.execute_stream(plan["plan"], plan.get("emotion"), context, persist=persist):
+            pass
+        return plan
+
+    def execute_stream(self, items, emotion=None, context=None, user_id=None, persist=False):
+        """
+        Execute plan items one by one, yielding each as soon as its status is
+        set. `items` can be any iterable (e.g. PlannerAgent.iter_plan), so a
+        streamed plan is never held in memory as a whole. With persist=True
+        each task is also saved to tasks_db; plain runs touch no files.
+        """
+        writer = default_writer() if persist else None
+        for task in items:
+            task["status"] = random.choice(["✅ Completed", "⏳ In Progress", "🔜 Pending"])
+            if context is not None and "Completed" in task["status"]:
+                context.completed_tasks.append(task["task"])
+            if writer is not None:
+                # saved in the background; execution never waits on the disk
+                writer.submit("tasks", (task["task"], emotion, task["status"], user_id))
+            yield task
+
+    def summary(self, context):
+        return context.summary()
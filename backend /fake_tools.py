@@ -0,0 +1,188 @@
+# fake_tools.py
+"""
+Local stand-in for the calendar and reminder services, for tests and benchmarks.
+
+    python fake_tools.py --port 8765 --latency-ms 50 --fail-rate 0.1
+    MINDSYNC_CALENDAR_API_URL=http://127.0.0.1:8765 MINDSYNC_REMINDER_BOT_URL=http://127.0.0.1:8765 ...
+
+Routes (JSON in and out, state kept in memory):
+
+    GET  /health
+    GET  /events?date=YYYY-MM-DD     {"events": [...]}, optionally one day's
+    POST /events                     {"title", "start"[, "end"]} -> 201 with "id"
+    GET  /reminders                  {"reminders": [...]}
+    POST /reminders                  {"text", "at"} -> 201 with "id"
+
+Every request waits `latency_ms` first (threads, so concurrent requests
+overlap), and a `fail_rate` share of them answer 503, to exercise timeouts
+and retries. A POST repeated with the same Idempotency-Key header gets the
+first response back instead of creating a second item.
+
+In-process use:
+
+    with FakeToolServer(latency_ms=20) as url:
+        agent.connect_tools(["calendar_api"], urls={"calendar_api": url})
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class _State:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.items: Dict[str, List[Dict[str, Any]]] = {"events": [], "reminders": []}
+        self.seen: Dict[str, Tuple[int, Dict[str, Any]]] = {}  # Idempotency-Key -> (status, body)
+        self.requests = 0
+
+
+_REQUIRED = {"events": ("title", "start"), "reminders": ("text", "at")}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"  # keep-alive, so client pools are exercised
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _begin(self) -> bool:
+        """Shared latency and failure injection; False if this request was failed."""
+        with self.server.state.lock:
+            self.server.state.requests += 1
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+        if self.server.fail_rate and random.random() < self.server.fail_rate:
+            self._send(503, {"error": "injected failure"})
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if not self._begin():
+            return
+        state = self.server.state
+        if url.path == "/health":
+            return self._send(200, {"status": "ok"})
+        collection = url.path.strip("/")
+        if collection not in state.items:
+            return self._send(404, {"error": f"no route {url.path}"})
+        with state.lock:
+            items = list(state.items[collection])
+        day = parse_qs(url.query).get("date", [None])[0]
+        if collection == "events" and day:
+            items = [e for e in items if str(e.get("start", "")).startswith(day)]
+        self._send(200, {collection: items})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self._begin():
+            return
+        collection = url.path.strip("/")
+        if collection not in _REQUIRED:
+            return self._send(404, {"error": f"no route {url.path}"})
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "body is not JSON"})
+        missing = [f for f in _REQUIRED[collection] if f not in body]
+        if missing:
+            return self._send(422, {"error": f"missing {', '.join(missing)}"})
+        state = self.server.state
+        key = self.headers.get("Idempotency-Key")
+        with state.lock:
+            if key and key in state.seen:
+                status, item = state.seen[key]
+            else:
+                status, item = 201, {**body, "id": next(state.ids)}
+                state.items[collection].append(item)
+                if key:
+                    state.seen[key] = (status, item)
+        self._send(status, item)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops bursts of parallel connects
+
+    def __init__(self, address, latency_ms: float, fail_rate: float):
+        super().__init__(address, _Handler)
+        self.latency_s = max(0.0, latency_ms) / 1000.0
+        self.fail_rate = fail_rate
+        self.state = _State()
+
+    def handle_error(self, request, client_address):
+        # a client that timed out hangs up before the (slow) reply; expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeToolServer:
+    """The fake API on a background thread; port 0 picks a free port."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, fail_rate: float = 0.0):
+        self._server = _Server((host, port), latency_ms, fail_rate)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def state(self) -> _State:
+        return self._server.state
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-tools", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    server = _Server((args.host, args.port), args.latency_ms, args.fail_rate)
+    print(f"fake calendar/reminder API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# inference_backends.py
+"""
+Selectable CPU inference backends for the emotion classifier.
+
+Every backend returns the same (tokenizer, model, id2label) triple, where
+model(**tokenizer(...)).logits behaves like the fp32 transformers model, so
+the (label, friendly, emoji, confidence) contract upstream is unchanged.
+
+    torch       fp32 AutoModelForSequenceClassification (default)
+    torch-int8  dynamic int8 quantization of every nn.Linear
+    onnx        exported ONNX graph on onnxruntime (needs `optimum[onnxruntime]`)
+
+Thread counts are read from MINDSYNC_TORCH_THREADS / MINDSYNC_TORCH_INTEROP_THREADS
+so the latency/throughput trade-off can be tuned per node.
+"""
+import os
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    _HAS_ML = True
+except Exception:
+    torch = None
+    AutoTokenizer = AutoModelForSequenceClassification = None
+    _HAS_ML = False
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+DEFAULT_BACKEND = "torch"
+
+_threads_configured = False
+
+
+def selected_backend() -> str:
+    name = os.getenv("MINDSYNC_INFERENCE_BACKEND", DEFAULT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"unknown inference backend {name!r}; choose one of {', '.join(BACKENDS)}")
+    return name
+
+
+def thread_settings() -> Dict[str, Optional[int]]:
+    def _int(var):
+        v = os.getenv(var, "").strip()
+        return int(v) if v else None
+    return {"intra_op": _int("MINDSYNC_TORCH_THREADS"), "inter_op": _int("MINDSYNC_TORCH_INTEROP_THREADS")}
+
+
+def configure_threads() -> Dict[str, Optional[int]]:
+    """Apply thread settings to torch once per process; returns what is in effect."""
+    global _threads_configured
+    settings = thread_settings()
+    if torch is None:
+        return settings
+    if not _threads_configured:
+        if settings["intra_op"]:
+            torch.set_num_threads(settings["intra_op"])
+        if settings["inter_op"]:
+            try:
+                torch.set_num_interop_threads(settings["inter_op"])
+            except RuntimeError:
+                # only allowed before any inter-op work has started
+                pass
+        _threads_configured = True
+    return {"intra_op": torch.get_num_threads(), "inter_op": torch.get_num_interop_threads()}
+
+
+def _id2label(config) -> Dict[int, str]:
+    return {int(k): v for k, v in config.id2label.items()}
+
+
+def _load_torch(model_name: str):
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return model
+
+
+def _load_torch_int8(model_name: str):
+    model = _load_torch(model_name)
+    quantize_dynamic = getattr(getattr(torch, "ao", None), "quantization", torch.quantization).quantize_dynamic
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_name: str):
+    try:
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise RuntimeError("onnx backend needs `pip install optimum[onnxruntime]`") from e
+    options = ort.SessionOptions()
+    settings = thread_settings()
+    if settings["intra_op"]:
+        options.intra_op_num_threads = settings["intra_op"]
+    if settings["inter_op"]:
+        options.inter_op_num_threads = settings["inter_op"]
+    return ORTModelForSequenceClassification.from_pretrained(model_name, export=True, session_options=options)
+
+
+_LOADERS = {"torch": _load_torch, "torch-int8": _load_torch_int8, "onnx": _load_onnx}
+
+
+def load_emotion_model(model_name: str, backend: Optional[str] = None) -> Tuple[Any, Any, Dict[int, str]]:
+    """Return (tokenizer, model, id2label) for the requested backend."""
+    if not _HAS_ML:
+        raise RuntimeError("torch/transformers are not installed")
+    backend = backend or selected_backend()
+    if backend not in _LOADERS:
+        raise ValueError(f"unknown inference backend {backend!r}")
+    configure_threads()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = _LOADERS[backend](model_name)
+    return tokenizer, model, _id2label(model.config)
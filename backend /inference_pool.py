@@ -0,0 +1,346 @@
+# inference_pool.py
+"""
+Process-pool inference workers with shared read-only weights.
+
+Run one pool per host:
+
+    python inference_pool.py --address /tmp/mindsync-infer.sock --workers 4 --threads 2
+
+The pool process loads the emotion model once, then forks its workers, so
+every worker maps the same weight pages copy-on-write (the weights are never
+written during inference, so those pages stay shared). API processes started
+with MINDSYNC_INFERENCE_POOL=<address> get a RemoteEngine from get_engine()
+and send their (already micro-batched) texts over a local socket instead of
+loading a model of their own; they do not need torch installed at all.
+
+On platforms without fork, workers are spawned and load their own copy.
+
+The socket only accepts clients that know MINDSYNC_POOL_AUTHKEY, which must
+be set (to the same secret) for the pool and every API process. A request
+whose worker dies mid-job fails instead of waiting forever, and once no
+worker is left every pending and new request fails.
+"""
+import argparse
+import gc
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener, wait
+from typing import Any, Dict, List, Optional, Sequence
+
+from emotion_engine import EmotionEngine, EmotionResult, default_model_name
+
+DEFAULT_ADDRESS = "/tmp/mindsync-infer.sock"
+
+# engine inherited by forked workers; never pickled
+_FORK_ENGINE: Optional[EmotionEngine] = None
+
+
+def pool_authkey() -> bytes:
+    key = os.getenv("MINDSYNC_POOL_AUTHKEY")
+    if not key:
+        raise RuntimeError("set MINDSYNC_POOL_AUTHKEY to the same secret for the inference pool and its clients")
+    return key.encode()
+
+
+def _worker_main(tasks, results, threads: int, spec):
+    try:
+        import torch
+        torch.set_num_threads(max(1, threads))
+    except ImportError:
+        pass
+    engine = _FORK_ENGINE
+    if engine is None:
+        engine = EmotionEngine(*spec)
+        engine.load()
+    pid = os.getpid()
+    while True:
+        job = tasks.get()
+        if job is None:
+            break
+        job_id, texts = job
+        # tell the pool who holds the job, so it can fail it if this process dies
+        results.put(("taken", job_id, pid))
+        try:
+            # raw model output only: the caller owns caching and heuristic fallback
+            results.put(("ok", job_id, engine._model_predict(list(texts))))
+        except Exception as e:
+            results.put(("error", job_id, f"{type(e).__name__}: {e}"))
+
+
+class InferencePool:
+    """N worker processes sharing one loaded model; predict() is thread-safe."""
+
+    def __init__(self, workers: Optional[int] = None, threads_per_worker: int = 1,
+                 model_name: Optional[str] = None, backend: Optional[str] = None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.engine = EmotionEngine(model_name or default_model_name(), backend)
+        self._procs: List[mp.Process] = []
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._holding: Dict[int, int] = {}  # worker pid -> id of the job it last took
+        self._all_dead = False
+        self._stopping = False
+        self._ids = itertools.count()
+        self._jobs = 0
+        self._failures = 0
+        self._started_at = None
+
+    def start(self) -> "InferencePool":
+        global _FORK_ENGINE
+        fork = "fork" in mp.get_all_start_methods()
+        ctx = mp.get_context("fork" if fork else "spawn")
+        if fork:
+            # load before forking so workers share the weight pages
+            if self.engine.load() is None:
+                raise RuntimeError(f"emotion model failed to load: {self.engine.error}")
+            _FORK_ENGINE = self.engine
+            # keep the collector from touching (and so copying) inherited objects
+            gc.freeze()
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        spec = (self.engine.model_name, self.engine.backend)
+        for n in range(self.workers):
+            p = ctx.Process(target=_worker_main, name=f"mindsync-infer-{n}",
+                            args=(self._tasks, self._results, self.threads_per_worker, spec), daemon=True)
+            p.start()
+            self._procs.append(p)
+        threading.Thread(target=self._collect, name="mindsync-pool-results", daemon=True).start()
+        threading.Thread(target=self._watch, name="mindsync-pool-watch", daemon=True).start()
+        self._started_at = time.time()
+        return self
+
+    def _watch(self):
+        """Report each worker's exit through the results queue, behind anything it sent before dying."""
+        alive = list(self._procs)
+        while alive and not self._stopping:
+            exited = wait([p.sentinel for p in alive], timeout=1.0)
+            for p in [p for p in alive if p.sentinel in exited]:
+                alive.remove(p)
+                p.join()  # already exited; reaps it so exitcode is set
+                if not self._stopping:
+                    self._results.put(("exited", None, (p.pid, p.name, p.exitcode, len(alive))))
+
+    def _collect(self):
+        while True:
+            try:
+                kind, job_id, payload = self._results.get()
+            except (EOFError, OSError):
+                # results pipe closed (shutdown): nothing can answer the pending requests now
+                with self._pending_lock:
+                    self._all_dead = True
+                    failed, self._pending = list(self._pending.values()), {}
+                for f in failed:
+                    f.set_exception(RuntimeError("inference pool shut down"))
+                return
+            failed: List[Future] = []
+            with self._pending_lock:
+                if kind == "taken":
+                    self._holding[payload] = job_id
+                    continue
+                if kind == "exited":
+                    pid, name, code, left = payload
+                    error = RuntimeError(f"inference worker {name} exited with code {code}")
+                    held = self._holding.pop(pid, None)
+                    if left == 0:
+                        self._all_dead = True
+                        failed, self._pending = list(self._pending.values()), {}
+                    elif held in self._pending:
+                        failed = [self._pending.pop(held)]
+                    self._failures += len(failed)
+                    fut = None
+                else:
+                    fut = self._pending.pop(job_id, None)
+                    if kind == "error":
+                        self._failures += 1
+            for f in failed:
+                f.set_exception(error)
+            if fut is not None:
+                if kind == "ok":
+                    fut.set_result(payload)
+                else:
+                    fut.set_exception(RuntimeError(payload))
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        fut: Future = Future()
+        job_id = next(self._ids)
+        with self._pending_lock:
+            if self._all_dead:
+                raise RuntimeError("no inference workers left")
+            self._pending[job_id] = fut
+            self._jobs += 1
+        self._tasks.put((job_id, list(texts)))
+        return fut
+
+    def predict(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[EmotionResult]:
+        return self.submit(texts).result(timeout=timeout)
+
+    def status(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            in_flight, jobs, failures = len(self._pending), self._jobs, self._failures
+        return {
+            "model": self.engine.model_id,
+            "state": "ready" if self._procs and all(p.is_alive() for p in self._procs) else "degraded",
+            "workers": self.workers,
+            "alive": sum(p.is_alive() for p in self._procs),
+            "threads_per_worker": self.threads_per_worker,
+            "jobs": jobs,
+            "failures": failures,
+            "in_flight": in_flight,
+            "uptime_s": round(time.time() - self._started_at, 1) if self._started_at else 0.0,
+        }
+
+    def stop(self):
+        self._stopping = True
+        for _ in self._procs:
+            self._tasks.put(None)
+        for p in self._procs:
+            p.join(timeout=5)
+        self._procs = []
+
+
+def serve(pool: InferencePool, address: str = DEFAULT_ADDRESS) -> None:
+    """Answer ("predict", texts) / ("status",) messages on a local socket, one thread per client."""
+    if isinstance(address, str) and os.path.exists(address):
+        os.unlink(address)
+    listener = Listener(address, authkey=pool_authkey())
+
+    def _handle(conn):
+        with conn:
+            while True:
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if msg[0] == "predict":
+                        conn.send(("ok", pool.predict(msg[1])))
+                    elif msg[0] == "status":
+                        conn.send(("ok", pool.status()))
+                    else:
+                        conn.send(("error", f"unknown request {msg[0]!r}"))
+                except Exception as e:
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                # failed handshake (bad authkey, dropped client); keep serving
+                continue
+            threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+    finally:
+        listener.close()
+
+
+class PoolClient:
+    """Thread-safe client for serve(); keeps a few idle connections for reuse."""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, max_idle: int = 8, timeout: float = 30.0):
+        self.address = address
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue" = queue.LifoQueue(maxsize=max_idle)
+
+    def _request(self, msg):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = Client(self.address, authkey=pool_authkey())
+        try:
+            conn.send(msg)
+            if not conn.poll(self.timeout):
+                raise TimeoutError(f"inference pool did not answer within {self.timeout}s")
+            status, payload = conn.recv()
+        except BaseException:
+            conn.close()
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+    def predict(self, texts: Sequence[str]) -> List[EmotionResult]:
+        return [tuple(r) for r in self._request(("predict", list(texts)))]
+
+    def status(self) -> Dict[str, Any]:
+        return self._request(("status",))
+
+
+class RemoteEngine(EmotionEngine):
+    """EmotionEngine whose forward pass runs in the shared inference pool."""
+
+    def __init__(self, model_name: str, backend: Optional[str] = None, address: Optional[str] = None):
+        super().__init__(model_name, backend)
+        self.address = address or os.getenv("MINDSYNC_INFERENCE_POOL", DEFAULT_ADDRESS)
+        self.client = PoolClient(self.address)
+
+    @property
+    def has_ml(self) -> bool:
+        return True
+
+    @property
+    def ready(self) -> bool:
+        try:
+            return self.client.status().get("state") == "ready"
+        except Exception:
+            return False
+
+    def start(self) -> None:
+        pass
+
+    def load(self):
+        return None
+
+    @property
+    def error(self):
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        try:
+            remote = self.client.status()
+        except Exception as e:
+            remote = {"state": "unreachable", "error": f"{type(e).__name__}: {e}"}
+        return {"name": self.model_id, "pool": self.address, **remote}
+
+    def _model_predict(self, texts: List[str]) -> List[EmotionResult]:
+        return self.client.predict(texts)
+
+    def token_lengths(self, texts: Sequence[str], block: int = 256) -> List[int]:
+        return [len((t or "").split()) for t in texts]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="MindSync shared inference pool")
+    ap.add_argument("--address", default=os.getenv("MINDSYNC_INFERENCE_POOL") or DEFAULT_ADDRESS,
+                    help="unix socket path to listen on")
+    ap.add_argument("--workers", type=int, default=int(os.getenv("MINDSYNC_POOL_WORKERS", "0")) or None,
+                    help="worker processes (default: CPU count)")
+    ap.add_argument("--threads", type=int, default=int(os.getenv("MINDSYNC_POOL_THREADS", "1")),
+                    help="torch intra-op threads per worker")
+    ap.add_argument("--model", default=None)
+    ap.add_argument("--backend", default=None)
+    args = ap.parse_args()
+
+    pool_authkey()  # fail before loading the model, not on the first connection
+    pool = InferencePool(args.workers, args.threads, args.model, args.backend).start()
+    print(f"[pool] {pool.workers} workers x {pool.threads_per_worker} threads serving "
+          f"{pool.engine.model_id} on {args.address}")
+    try:
+        serve(pool, args.address)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
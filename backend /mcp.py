@@ -6,61 +6,225 @@ This module coordinates Planner, Advisor, and Executor agents in sequence:
     1. Planner → generates structured task plan.
     2. Advisor → reviews and adjusts based on emotional context.
     3. Executor → produces final schedule or calendar events.
+
+Advisor and Executor both depend only on the plan, so run_multi_agent_plan
+runs them concurrently through a small asyncio DAG (Orchestrator).
 """
+import asyncio
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MCPAgent:
+    """Integration handle the planner reports on (mirrors RAGAgent)."""
+    def __init__(self):
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+        return "MCP connected."
+
+    def status(self):
+        return "Active" if self.connected else "Inactive"
+
+
+class Step:
+    """One node of the agent DAG: fn(results) runs once every dependency has succeeded."""
+    def __init__(self, name, fn, deps=(), timeout=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+
+class Orchestrator:
+    """
+    Runs Steps as an asyncio DAG.
 
-from planner import generate_emotion_aware_plan
-from advisor import generate_advice
-from executor import execute_plan
+    A step starts as soon as all of its dependencies have finished, so
+    independent steps overlap. Plain functions run in worker threads and
+    coroutine functions on the loop. Each step has its own timeout and its
+    own failure: a step that raises or times out is recorded in "errors", and
+    only the steps that depend on it are skipped. Every step leaves a timing
+    span (ms from the start of the run) in "spans".
 
-def run_multi_agent_plan(user_mood: str, user_tasks: list, user_context: str = ""):
+    A timed-out thread step cannot be killed; its result is ignored. Thread
+    steps run on a pool owned by the run, which is let go without waiting, so
+    a step stuck past its timeout does not hold up the caller (asyncio.run
+    would wait for the loop's default executor).
     """
-    Orchestrates all 3 agents to produce a coherent emotion-aware plan.
-    
+    def __init__(self, steps, default_timeout=None):
+        self.steps = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"duplicate step {step.name!r}")
+            self.steps[step.name] = step
+        for step in self.steps.values():
+            missing = [d for d in step.deps if d not in self.steps]
+            if missing:
+                raise ValueError(f"step {step.name!r} depends on unknown {missing}")
+        self._check_acyclic()
+        self.default_timeout = default_timeout
+
+    def _check_acyclic(self):
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "active":
+                raise ValueError("dependency cycle: " + " -> ".join(path + [name]))
+            state[name] = "active"
+            for dep in self.steps[name].deps:
+                visit(dep, path + [name])
+            state[name] = "done"
+
+        for name in self.steps:
+            visit(name, [])
+
+    async def run(self, results=None):
+        results = dict(results or {})
+        errors, spans = {}, []
+        t0 = time.perf_counter()
+        done = {name: asyncio.Event() for name in self.steps}
+        loop = asyncio.get_running_loop()
+        threaded = sum(not asyncio.iscoroutinefunction(s.fn) for s in self.steps.values())
+        pool = ThreadPoolExecutor(max_workers=max(1, threaded), thread_name_prefix="mindsync-step")
+
+        def _ms():
+            return round((time.perf_counter() - t0) * 1000, 3)
+
+        async def _run_step(step):
+            try:
+                for dep in step.deps:
+                    await done[dep].wait()
+                failed = [d for d in step.deps if d in errors]
+                if failed:
+                    errors[step.name] = f"skipped: {', '.join(failed)} failed"
+                    spans.append({"step": step.name, "status": "skipped", "start_ms": _ms(), "end_ms": _ms(),
+                                  "duration_ms": 0.0})
+                    return
+                start = _ms()
+                status = "ok"
+                timeout = step.timeout if step.timeout is not None else self.default_timeout
+                try:
+                    if asyncio.iscoroutinefunction(step.fn):
+                        call = step.fn(results)
+                    else:
+                        call = loop.run_in_executor(pool, step.fn, results)
+                    results[step.name] = await asyncio.wait_for(call, timeout)
+                except asyncio.TimeoutError:
+                    status = "timeout"
+                    errors[step.name] = f"timed out after {timeout}s"
+                except Exception as e:
+                    status = "error"
+                    errors[step.name] = f"{type(e).__name__}: {e}"
+                end = _ms()
+                spans.append({"step": step.name, "status": status, "start_ms": start, "end_ms": end,
+                              "duration_ms": round(end - start, 3)})
+            finally:
+                done[step.name].set()
+
+        try:
+            await asyncio.gather(*(_run_step(step) for step in self.steps.values()))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        spans.sort(key=lambda s: s["start_ms"])
+        return {"results": results, "errors": errors, "spans": spans,
+                "total_ms": round((time.perf_counter() - t0) * 1000, 3)}
+
+
+def _step_timeout():
+    return float(os.getenv("MINDSYNC_AGENT_STEP_TIMEOUT_S", "10"))
+
+
+async def run_multi_agent_plan_async(user_mood: str, user_tasks: list, user_context: str = "", registry=None,
+                                     user_id=None, session_id=None):
+    """
+    Orchestrates the agents as a DAG to produce a coherent emotion-aware plan:
+
+        emotion -> plan -> advice
+                        -> execution
+                        -> tools
+
+    Advice, execution and the calendar/reminder tool calls all need only the
+    plan, so they run concurrently (and the tool calls among themselves).
+
     Args:
-        user_mood (str): Detected or input emotion.
-        user_tasks (list): List of task names or dicts.
+        user_mood (str): Detected emotion label, or free text to detect it from.
+        user_tasks (list): List of task names.
         user_context (str): Optional background info (stress level, deadlines, etc.)
-    
+        registry: AgentRegistry to take agents from (default: the shared one).
+        user_id: Whose history the advisor recalls (None: anonymous history only); also
+            scopes the tool calls' Idempotency-Keys.
+        session_id: Idempotency scope when there is no user_id; pass the same one to make a
+            retried run reuse its keys (default: a fresh one per run).
+
     Returns:
-        dict: Final output with plan, advice, and execution summary.
+        dict: plan, advice, execution and its summary, plus per-step "errors" and timing "spans".
     """
+    # imported here: agents builds the planner, which imports MCPAgent from this module
+    from agents import default_registry
+    from executor import ExecutionContext
+    from planner import plan_tool_calls, summarize_tool_results
+
+    agents = registry or default_registry()
+    context = ExecutionContext()
 
-    result = {}
-
-    # 🧩 Step 1 — Planner
-    try:
-        print("[MCP] Running Planner Agent...")
-        plan = generate_emotion_aware_plan(user_mood, user_tasks)
-        result["plan"] = plan
-    except Exception as e:
-        print("[MCP] Planner failed:", e)
-        result["error"] = f"Planner failed: {e}"
-        return result
-
-    # 💬 Step 2 — Advisor
-    try:
-        print("[MCP] Running Advisor Agent...")
-        advice = generate_advice(user_mood, plan, user_context)
-        result["advice"] = advice
-    except Exception as e:
-        print("[MCP] Advisor failed:", e)
-        result["advice"] = f"Advisor failed: {e}"
-
-    # ⚙️ Step 3 — Executor
-    try:
-        print("[MCP] Running Executor Agent...")
-        execution_result = execute_plan(plan)
-        result["execution"] = execution_result
-    except Exception as e:
-        print("[MCP] Executor failed:", e)
-        result["execution"] = f"Executor failed: {e}"
-
-    print("[MCP] Multi-agent pipeline completed successfully.")
+    def emotion(_):
+        mood = (user_mood or "").strip().lower()
+        if mood in agents.get("planner").strategies:
+            return mood
+        text = f"{user_mood}. {user_context}".strip(" .")
+        return agents.get("emotion").detect_emotion(text)["emotion"]
+
+    def plan(r):
+        return agents.get("planner").generate_plan(r["emotion"], user_tasks)
+
+    def advice(r):
+        return agents.get("advisor").generate_advice(r["emotion"], user_tasks, memory=agents.get("rag"),
+                                                  user_id=user_id)
+
+    def execution(r):
+        # the executor writes statuses into the plan; keep the planner's copy intact
+        return agents.get("executor").execute_plan(copy.deepcopy(r["plan"]), context)
+
+    async def tool_calls(r):
+        tools = agents.get("tools")
+        calls = plan_tool_calls(r["plan"], tools, user_id=user_id, session_id=session_id)
+        return summarize_tool_results(await tools.call_many(calls)) if calls else None
+
+    timeout = _step_timeout()
+    run = await Orchestrator([
+        Step("emotion", emotion, timeout=timeout),
+        Step("plan", plan, deps=["emotion"], timeout=timeout),
+        Step("advice", advice, deps=["plan"], timeout=timeout),
+        Step("execution", execution, deps=["plan"], timeout=timeout),
+        Step("tools", tool_calls, deps=["plan"], timeout=timeout),
+    ]).run()
+
+    results = run["results"]
+    result = {key: results[key] for key in ("emotion", "plan", "advice", "execution") if key in results}
+    if "execution" in results:
+        result["execution_summary"] = context.summary()
+    if results.get("tools") is not None:
+        result["tool_calls"] = results["tools"]
+    result["errors"] = run["errors"]
+    result["spans"] = run["spans"]
+    result["total_ms"] = run["total_ms"]
     return result
 
 
+def run_multi_agent_plan(user_mood: str, user_tasks: list, user_context: str = "", registry=None, user_id=None,
+                         session_id=None):
+    """Blocking wrapper around run_multi_agent_plan_async (not for use inside a running event loop)."""
+    return asyncio.run(run_multi_agent_plan_async(user_mood, user_tasks, user_context, registry, user_id, session_id))
+
+
 # Optional: quick test hook
 if __name__ == "__main__":
+    from pprint import pprint
     sample_tasks = ["Finish report", "Study ML paper", "Go for a walk"]
-    out = run_multi_agent_plan("stressed", sample_tasks)
-    print(out)
+    pprint(run_multi_agent_plan("stressed", sample_tasks))
@@ -0,0 +1,100 @@
+# model_loader.py
+"""
+Load-once model holder.
+
+ModelLoader wraps a zero-argument load function so that, however many
+threads ask for the model at once, it is built exactly one time. Loading
+normally happens in a background thread kicked off at app startup; callers
+that arrive before it finishes either get None (and fall back to the
+heuristic) or block until it is ready, depending on the loading policy.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+POLICY_HEURISTIC = "heuristic"
+POLICY_WAIT = "wait"
+
+
+def loading_policy() -> str:
+    policy = os.getenv("MINDSYNC_LOADING_POLICY", POLICY_HEURISTIC).strip().lower()
+    return policy if policy in (POLICY_HEURISTIC, POLICY_WAIT) else POLICY_HEURISTIC
+
+
+def loading_wait_seconds() -> float:
+    return float(os.getenv("MINDSYNC_LOADING_WAIT_S", "30"))
+
+
+class ModelLoader:
+    """Thread-safe, single-flight lazy loader with readiness reporting."""
+
+    IDLE, LOADING, READY, FAILED = "idle", "loading", "ready", "failed"
+
+    def __init__(self, load_fn: Callable[[], Any], name: str = "model"):
+        self._load_fn = load_fn
+        self.name = name
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state = self.IDLE
+        self.value: Any = None
+        self.error: Optional[Exception] = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == self.READY
+
+    def load(self) -> Any:
+        """Load synchronously (once). Concurrent callers wait on the same load."""
+        with self._lock:
+            if self.state in (self.READY, self.FAILED):
+                return self.value
+            self.state = self.LOADING
+            t0 = time.perf_counter()
+            try:
+                self.value = self._load_fn()
+                self.state = self.READY
+            except Exception as e:
+                self.error = e
+                self.state = self.FAILED
+            finally:
+                self.load_seconds = round(time.perf_counter() - t0, 3)
+                self._done.set()
+            return self.value
+
+    def start_background(self) -> None:
+        """Begin loading in a daemon thread; no-op if a load already started."""
+        # separate lock: must not block behind a synchronous load() in progress
+        with self._start_lock:
+            if self.state != self.IDLE or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.load, name=f"load-{self.name}", daemon=True)
+            self._thread.start()
+
+    def get(self, policy: Optional[str] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Return the loaded value, or None if it is not available.
+
+        With the "heuristic" policy this never blocks on an in-progress load.
+        With "wait" it blocks for up to `timeout` seconds.
+        """
+        if self.state == self.READY:
+            return self.value
+        if self.state == self.FAILED:
+            return None
+        self.start_background()
+        policy = policy or loading_policy()
+        if policy == POLICY_WAIT:
+            self._done.wait(loading_wait_seconds() if timeout is None else timeout)
+        return self.value if self.state == self.READY else None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "error": f"{type(self.error).__name__}: {self.error}" if self.error else None,
+        }
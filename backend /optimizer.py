@@ -0,0 +1,257 @@
+# optimizer.py
+"""
+Energy-aware task ordering.
+
+The detected mood sets an energy curve over the day (a typical
+late-morning peak, a post-lunch dip and a smaller late-afternoon bump,
+lifted or flattened by the mood). Each task has a demand in [0, 1] (its
+"Energy" if given, otherwise from its length relative to the longest
+task). An ordering laid out back to back from the start time costs
+
+    energy    minutes spent where demand and energy disagree (|demand - energy| * duration)
+    switches  one unit each time "Category" changes between neighbours
+    lateness  minutes past "Deadline"
+
+A greedy pass builds an ordering in O(n log n): tasks whose deadline is
+getting close come off an EDF heap, otherwise the task whose demand is
+nearest the current energy is taken (bisect over the sorted demands).
+Adjacent swaps then improve it. A swap only moves the two tasks involved,
+so its cost change is computed in O(1). The search stops when no swap
+helps or the time budget runs out, and returns the best ordering found so
+far; if the budget runs out during the greedy pass, the tasks are
+returned in the order given.
+"""
+import bisect
+import datetime as dt
+import heapq
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_WEIGHTS = {"energy": 1.0, "switch": 15.0, "lateness": 4.0}
+
+# (peak level, how much of the daily shape survives); low moods flatten and lower the curve
+_MOOD_ENERGY = {
+    "joy": (1.0, 1.0), "optimism": (0.95, 1.0), "love": (0.9, 1.0),
+    "neutral": (0.8, 1.0),
+    "fear": (0.6, 0.7), "anger": (0.65, 0.8), "sadness": (0.5, 0.6),
+}
+
+
+def energy_curve(mood_label: Optional[str]) -> np.ndarray:
+    """Energy in [0, 1] for every minute of the day (index = minutes after midnight)."""
+    peak, shape = _MOOD_ENERGY.get((mood_label or "neutral").lower(), _MOOD_ENERGY["neutral"])
+    h = np.arange(1440) / 60.0
+    base = (0.35
+            + 0.55 * np.exp(-((h - 10.5) / 2.5) ** 2)   # late-morning peak
+            - 0.20 * np.exp(-((h - 14.5) / 1.2) ** 2)   # post-lunch dip
+            + 0.25 * np.exp(-((h - 17.5) / 1.8) ** 2))  # second wind
+    base = np.clip(base, 0.0, 1.0)
+    mean = float(base.mean())
+    return np.clip(peak * (mean + shape * (base - mean)) / base.max(), 0.0, 1.0)
+
+
+_CHUNK = 4096  # tasks per step while building a _Model; the budget is checked between steps
+
+
+class _OutOfTime(Exception):
+    """The budget ran out before there was an ordering to return."""
+
+
+def _demands(tasks: Sequence[Dict], longest: int) -> List[float]:
+    out = []
+    for t in tasks:
+        if t.get("Energy") is not None:
+            out.append(min(1.0, max(0.0, float(t["Energy"]))))
+        else:
+            out.append(int(t.get("Duration (mins)", 30)) / longest)
+    return out
+
+
+class _Model:
+    """Per-task terms needed to cost an ordering laid out back to back from `start`."""
+
+    def __init__(self, tasks, mood_label, start_dt, gap, weights, deadline: Optional[float] = None):
+        self.w = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.curve = energy_curve(mood_label)
+        self.start = start_dt.hour * 60 + start_dt.minute
+        self.gap = gap
+        base = dt.datetime.combine(start_dt.date(), dt.time(0, 0))
+        self.dur: List[int] = []
+        self.cat: List = []
+        self.due: List[Optional[int]] = []
+        self.demand: List[float] = []
+        # built in chunks so a budget too small for this many tasks is noticed early
+        for lo in range(0, len(tasks), _CHUNK):
+            _check(deadline)
+            part = tasks[lo:lo + _CHUNK]
+            self.dur.extend(max(0, int(t.get("Duration (mins)", 30))) for t in part)
+            self.cat.extend(t.get("Category") for t in part)
+            self.due.extend(None if t.get("Deadline") is None
+                            else int((t["Deadline"] - base).total_seconds() // 60) for t in part)
+        longest = max(self.dur + [1])
+        for lo in range(0, len(tasks), _CHUNK):
+            _check(deadline)
+            self.demand.extend(_demands(tasks[lo:lo + _CHUNK], longest))
+
+    def task_cost(self, i: int, at: int) -> float:
+        """Energy mismatch + lateness of task i started at minute `at`."""
+        mid = min(1439, max(0, at + self.dur[i] // 2))
+        cost = self.w["energy"] * abs(self.demand[i] - self.curve[mid]) * self.dur[i]
+        if self.due[i] is not None:
+            cost += self.w["lateness"] * max(0, at + self.dur[i] - self.due[i])
+        return cost
+
+    def switch(self, a: int, b: int) -> float:
+        ca, cb = self.cat[a], self.cat[b]
+        return self.w["switch"] if ca is not None and cb is not None and ca != cb else 0.0
+
+    def cost(self, order: Sequence[int]) -> float:
+        total, at = 0.0, self.start
+        for k, i in enumerate(order):
+            total += self.task_cost(i, at)
+            if k:
+                total += self.switch(order[k - 1], i)
+            at += self.dur[i] + self.gap
+        return total
+
+
+def _check(deadline: Optional[float]) -> None:
+    if deadline is not None and time.perf_counter() >= deadline:
+        raise _OutOfTime()
+
+
+def _find(nxt: List[int], p: int) -> int:
+    """Next untaken slot at or after p (union-find with path halving)."""
+    while nxt[p] != p:
+        nxt[p] = nxt[nxt[p]]
+        p = nxt[p]
+    return p
+
+
+def _greedy(m: _Model, n: int, deadline: float) -> Optional[List[int]]:
+    """
+    Greedy ordering in O(n log n), or None if `deadline` passes first.
+
+    The sorted demands never change; taking a task only marks its slot, and
+    two "next untaken slot" forests (one looking right, one looking left)
+    find the nearest untaken demand on either side of the bisect point.
+    """
+    deadlines = [(m.due[i], i) for i in range(n) if m.due[i] is not None]
+    heapq.heapify(deadlines)
+    if time.perf_counter() >= deadline:
+        return None
+    demand = np.asarray(m.demand)
+    by_demand = np.argsort(demand, kind="stable")
+    keys = demand[by_demand].tolist()
+    slot = np.empty(n, dtype=np.int64)
+    slot[by_demand] = np.arange(n)
+    by_demand, slot = by_demand.tolist(), slot.tolist()
+    right = list(range(n + 1))  # right[p]: untaken slot >= p, n if none
+    left = list(range(n + 1))   # left[p + 1] - 1: untaken slot <= p, -1 if none
+    taken = [False] * n
+    order, at = [], m.start
+
+    def _take(i):
+        nonlocal at
+        taken[i] = True
+        p = slot[i]
+        right[p] = p + 1
+        left[p + 1] = p
+        order.append(i)
+        at += m.dur[i] + m.gap
+
+    while len(order) < n:
+        if len(order) & 255 == 255 and time.perf_counter() >= deadline:
+            return None
+        while deadlines and taken[deadlines[0][1]]:
+            heapq.heappop(deadlines)
+        # a deadline task goes now if waiting one more average task would make it late
+        if deadlines:
+            due, i = deadlines[0]
+            if at + m.dur[i] + m.gap + 30 >= due:
+                heapq.heappop(deadlines)
+                _take(i)
+                continue
+        energy = m.curve[min(1439, at)]
+        pos = bisect.bisect_left(keys, energy)
+        hi = _find(right, pos)
+        lo = _find(left, pos) - 1
+        if hi == n or (lo >= 0 and energy - keys[lo] <= keys[hi] - energy):
+            hi = lo
+        _take(by_demand[hi])
+    return order
+
+
+def _improve(m: _Model, order: List[int], deadline: float) -> List[int]:
+    """Adjacent-swap descent; each candidate swap is costed in O(1)."""
+    n = len(order)
+    starts = [0] * n
+    at = m.start
+    for k, i in enumerate(order):
+        starts[k] = at
+        at += m.dur[i] + m.gap
+
+    improved, steps = True, 0
+    while improved:
+        improved = False
+        for k in range(n - 1):
+            steps += 1
+            if steps & 255 == 0 and time.perf_counter() >= deadline:
+                return order
+            a, b = order[k], order[k + 1]
+            s = starts[k]
+            before = m.task_cost(a, s) + m.task_cost(b, s + m.dur[a] + m.gap)
+            after = m.task_cost(b, s) + m.task_cost(a, s + m.dur[b] + m.gap)
+            if k > 0:
+                before += m.switch(order[k - 1], a)
+                after += m.switch(order[k - 1], b)
+            if k + 2 < n:
+                before += m.switch(b, order[k + 2])
+                after += m.switch(a, order[k + 2])
+            if after + 1e-9 < before:
+                order[k], order[k + 1] = b, a
+                starts[k + 1] = s + m.dur[b] + m.gap
+                improved = True
+    return order
+
+
+def optimize_order(tasks: Sequence[Dict], mood_label: Optional[str], start_dt: dt.datetime,
+                   gap: int = 10, budget_ms: float = 50.0,
+                   weights: Optional[Dict[str, float]] = None,
+                   info: Optional[Dict] = None) -> List[Dict]:
+    """
+    Reorder tasks (same dicts, new order) to fit the mood's energy curve.
+
+    tasks      dicts with "Task" and "Duration (mins)", optionally "Deadline"
+               (datetime), "Energy" (0-1 demand) and "Category"
+    budget_ms  wall-clock cap; the best ordering found by then is returned,
+               or the tasks in their given order if the greedy pass itself
+               did not finish (so pre-sort them by the plain strategy)
+    weights    overrides for DEFAULT_WEIGHTS
+    info       if given, gets "optimized": False when the budget ran out first
+    """
+    if info is not None:
+        info["optimized"] = True
+    if len(tasks) < 2:
+        return list(tasks)
+    stop = time.perf_counter() + budget_ms / 1000.0
+    try:
+        m = _Model(tasks, mood_label, start_dt, gap, weights, deadline=stop)
+    except _OutOfTime:
+        m = None
+    order = _greedy(m, len(tasks), stop) if m is not None else None
+    if order is None:
+        if info is not None:
+            info["optimized"] = False
+        return list(tasks)
+    order = _improve(m, order, stop)
+    return [tasks[i] for i in order]
+
+
+def order_cost(tasks: Sequence[Dict], mood_label: Optional[str], start_dt: dt.datetime,
+               gap: int = 10, weights: Optional[Dict[str, float]] = None) -> float:
+    """Cost of the tasks in the given order (lower is better); for comparing strategies."""
+    m = _Model(tasks, mood_label, start_dt, gap, weights)
+    return m.cost(range(len(tasks)))
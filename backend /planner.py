@@ -1,11 +1,9 @@
 # planner.py
+import hashlib
+import uuid
 from datetime import datetime, timedelta
-from executor import ExecutorAgent
-from advisor import AdvisorAgent
-from emotion_model import EmotionModel
-from mcp import MCPAgent
-from rag_index import RAGAgent
-from tools import ToolAgent
+from agents import default_registry
+from executor import ExecutionContext
 
 # =========================
 # 🧩 Planner Agent
@@ -26,24 +24,21 @@ class PlannerAgent:
             return {"error": "No tasks provided."}
 
         motivation = self.strategies.get(emotion, self.strategies["neutral"])
+        plan = list(self.iter_plan(emotion, tasks, start_time, task_interval))
+        return {"emotion": emotion, "motivation": motivation, "plan": plan}
 
-        if start_time is None:
-            start_time = datetime.now()
-
-        plan = []
-        current_time = start_time
+    def iter_plan(self, emotion, tasks, start_time=None, task_interval=60):
+        """Plan items one at a time, for callers that stream them instead of holding the plan."""
+        current_time = start_time if start_time is not None else datetime.now()
         for i, task in enumerate(tasks):
-            time_slot = current_time.strftime("%I:%M %p")
-            plan.append({
-                "time": time_slot,
+            yield {
+                "time": current_time.strftime("%I:%M %p"),
                 "task": task,
                 "priority": self._assign_priority(i, emotion),
                 "status": "Pending"
-            })
+            }
             current_time += timedelta(minutes=task_interval)
 
-        return {"emotion": emotion, "motivation": motivation, "plan": plan}
-
     def _assign_priority(self, index, emotion):
         if emotion in ["anger", "joy"]:
             return "High" if index < 2 else "Medium"
@@ -52,34 +47,74 @@ class PlannerAgent:
         return "High" if index == 0 else "Medium" if index < 3 else "Low"
 
 
+# =========================
+# 📅 Tool calls
+# =========================
+def plan_tool_calls(plan, tools, user_id=None, day=None, session_id=None):
+    """
+    One calendar event and one reminder per planned task, for whichever of
+    calendar_api / reminder_bot are connected. Each call carries an
+    Idempotency-Key derived from its content and owner (user_id, else
+    session_id, else a fresh id per plan), so it is safe to retry and never
+    shared with another user's identical task.
+    """
+    day = day or datetime.now().date().isoformat()
+    owner = f"user:{user_id}" if user_id is not None else f"session:{session_id or uuid.uuid4().hex}"
+    calls = []
+    for item in plan.get("plan", []):
+        when = f"{day} {item['time']}"
+        for tool, path, body in (
+            ("calendar_api", "/events", {"title": item["task"], "start": when, "priority": item.get("priority")}),
+            ("reminder_bot", "/reminders", {"text": item["task"], "at": when}),
+        ):
+            if not tools.connected(tool):
+                continue
+            key = hashlib.sha256(f"{tool}|{owner}|{when}|{item['task']}".encode("utf-8")).hexdigest()[:32]
+            calls.append({"tool": tool, "method": "POST", "path": path, "body": body,
+                          "headers": {"Idempotency-Key": key}, "idempotent": True})
+    return calls
+
+
+def summarize_tool_results(results):
+    errors = [str(r) for r in results if isinstance(r, Exception)]
+    return {"sent": len(results) - len(errors), "failed": len(errors), "errors": errors[:5]}
+
+
 # =========================
 # 🔗 Coordinator Function
 # =========================
-def generate_emotion_aware_plan(user_text, tasks):
-    emotion_model = EmotionModel()
-    detected_emotion = emotion_model.detect_emotion(user_text)
+def generate_emotion_aware_plan(user_text, tasks, registry=None, user_id=None):
+    # agents are started once and shared; only the execution context is per call
+    agents = registry or default_registry()
+    detected_emotion = agents.get("emotion").detect_emotion(user_text)
     emotion = detected_emotion.get("emotion", "neutral")
 
-    planner = PlannerAgent()
-    executor = ExecutorAgent()
-    advisor = AdvisorAgent()
-    rag = RAGAgent()
-    mcp = MCPAgent()
-    tools = ToolAgent()
+    planner = agents.get("planner")
+    executor = agents.get("executor")
+    advisor = agents.get("advisor")
+    rag = agents.get("rag")
+    mcp = agents.get("mcp")
+    tools = agents.get("tools")
+    context = ExecutionContext()
 
     # Generate base plan
     plan = planner.generate_plan(emotion, tasks)
 
     # Execute plan simulation
-    executed_plan = executor.execute_plan(plan)
+    executed_plan = executor.execute_plan(plan, context)
+
+    # Push the plan to the calendar / reminder tools, all calls in parallel
+    calls = plan_tool_calls(executed_plan, tools, user_id)
+    tool_results = summarize_tool_results(tools.invoke_many(calls)) if calls else None
 
-    # Advisor tips
-    advice = advisor.generate_advice(emotion, tasks)
+    # Advisor tips, personalized from what this user got done before
+    advice = advisor.generate_advice(emotion, tasks, memory=rag, user_id=user_id)
 
-    # Integrations
-    rag.connect()
-    mcp.connect()
-    tools.connect_tools(["calendar_api", "reminder_bot"])
+    # Remember today for future plans (appends to the local index; no model call)
+    rag.remember([t["task"] for t in executed_plan["plan"]], kind="task", user_id=user_id,
+                 extras=[{"emotion": emotion, "status": t["status"]} for t in executed_plan["plan"]])
+    rag.remember([user_text], kind="mood", user_id=user_id, extras=[{"emotion": emotion}])
+    rag.remember([advice], kind="advice", user_id=user_id, extras=[{"emotion": emotion}])
 
     result = {
         "emotion": emotion,
@@ -91,8 +126,10 @@ def generate_emotion_aware_plan(user_text, tasks):
             "MCP": mcp.status(),
             "Tools": tools.status()
         },
-        "execution_summary": executor.summary()
+        "execution_summary": context.summary()
     }
+    if tool_results is not None:
+        result["tool_calls"] = tool_results
 
     return result
 
@@ -1,11 +1,423 @@
 # rag_index.py
+"""
+Local retrieval index over past tasks, moods and advice.
+
+Texts are embedded offline by feature hashing: lower-cased words and word
+bigrams are hashed into `dim` signed buckets and the vector is L2-normalized.
+No model download is needed, and adding a text costs microseconds.
+
+Everything lives in one directory and is memory-mapped, so opening an index
+of any size takes milliseconds:
+
+    vectors.npy   int8 (capacity, dim), unit vectors scaled by 127, insertion order
+    lists.npy     int32 coarse cluster per row (-1 before training)
+    kinds.npy     int8 kind code per row (task / mood / advice / note)
+    users.npy     uint32 hash of the row's user_id (0 = none)
+    offsets.npy   int64 byte offset of each row's record in meta.jsonl
+    meta.jsonl    one JSON record per row (text, kind, user_id, extras)
+    centroids.npy float32 (nlist, dim), once trained
+    order.npy     row ids grouped by list, bounds.npy where each list starts
+    state.json    dim, count, nlist, grouped; written last, so it is the commit point
+    lock          flock'd by whichever process is writing
+
+Several processes may share one index. Writes take an exclusive flock on
+`lock` and first catch up with state.json, remapping any column file another
+process grew, so rows are never written over; searches catch up when
+state.json has changed. (Without fcntl, e.g. on Windows, keep to one
+writing process per index.)
+
+Small indexes are searched exhaustively. Once `train_at` rows exist, a
+background thread trains a k-means coarse quantizer on a sample and assigns
+every row to its nearest centroid (IVF). A query then scores only the rows of its
+`nprobe` nearest lists plus rows added since the lists were last grouped, so
+top-k over a million entries stays in the low milliseconds. Every query is
+scoped to one user (user_id=None means rows added without one), and scores
+all of that user's rows exactly when there are at most 65536 of them.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+KINDS = {"note": 0, "task": 1, "mood": 2, "advice": 3}
+_SCALE = 127.0  # int8 storage of unit vectors
+_CHUNK = 65536
+_COLUMNS = ("vectors.npy", "lists.npy", "kinds.npy", "users.npy", "offsets.npy")
+_TOKEN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature(token: str, dim: int):
+    h = zlib.crc32(token.encode("utf-8"))
+    return h % dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and word bigrams, L2-normalized."""
+
+    def __init__(self, dim: int = 128):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall((text or "").lower())
+            for token in words + [a + " " + b for a, b in zip(words, words[1:])]:
+                bucket, sign = _feature(token, self.dim)
+                out[row, bucket] += sign
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def _user_hash(user_id: Optional[str]) -> int:
+    return 0 if user_id is None else (zlib.crc32(str(user_id).encode("utf-8")) or 1)
+
+
+class VectorIndex:
+    """Append-only, memory-mapped vector index with an IVF coarse quantizer."""
+
+    def __init__(self, path: str, dim: int = 128, train_at: int = 20000, nprobe: int = 8):
+        self.path = path
+        self.train_at = train_at
+        self.nprobe = nprobe
+        self._lock = threading.RLock()  # threads of this process; _exclusive() adds the flock
+        os.makedirs(path, exist_ok=True)
+        self._lockfile = open(self._file("lock"), "a")
+        self.dim = self._read_state().get("dim", dim)
+        self.embedder = HashingEmbedder(self.dim)
+        self.count = self.nlist = self._grouped = 0  # _grouped: rows covered by order/bounds
+        self.capacity = 0
+        self.centroids = self._order = self._bounds = None
+        self._state_seen = self._column_sizes = None
+        self._worker: Optional[threading.Thread] = None
+        self._meta = open(self._file("meta.jsonl"), "ab+")
+        with self._exclusive():
+            if not self.capacity:
+                self._open(max(1024, self.count))
+
+    # ---------- storage ----------
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self._file("state.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_state(self) -> None:
+        tmp = self._file("state.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "count": self.count, "nlist": self.nlist, "grouped": self._grouped}, f)
+        os.replace(tmp, self._file("state.json"))
+        self._state_seen = self._stamp("state.json")
+
+    def _stamp(self, name: str):
+        try:
+            st = os.stat(self._file(name))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _flock(self, op: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lockfile, op)
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the index against other threads and processes, caught up with their writes."""
+        with self._lock:
+            self._flock(fcntl.LOCK_EX if fcntl else 0)
+            try:
+                self._refresh(force=True)
+                yield
+            finally:
+                self._flock(fcntl.LOCK_UN if fcntl else 0)
+
+    def _changed(self) -> bool:
+        return self._stamp("state.json") != self._state_seen
+
+    def _refresh(self, force: bool = False) -> None:
+        """
+        Adopt what other processes committed. Writers (force) always re-read
+        state.json, since a replaced file can come back with the same stamp;
+        a search re-reads it only when its stamp changed.
+        """
+        if not force and not self._changed():
+            return
+        self._state_seen = self._stamp("state.json")
+        state = self._read_state()
+        self.count = state.get("count", 0)
+        # column files are only ever replaced by larger copies
+        if self.count > self.capacity or self._column_sizes != self._sizes():
+            self._open(max(1024, self.count))
+        if state.get("nlist", 0) != self.nlist:
+            self.nlist = state["nlist"]
+            self.centroids = np.load(self._file("centroids.npy"))
+        if state.get("grouped", 0) != self._grouped:
+            if state.get("grouped", 0):
+                self._order = np.load(self._file("order.npy"), mmap_mode="r")
+                self._bounds = np.load(self._file("bounds.npy"))
+                self._grouped = len(self._order)
+            else:
+                self._order, self._grouped = None, 0
+
+    def _sizes(self):
+        return tuple(stamp and stamp[2] for stamp in map(self._stamp, _COLUMNS))
+
+    def _column(self, name, dtype, shape, fill=0):
+        """Memory-map a column file, growing it (copy into a larger file) if it is too small."""
+        fname = self._file(name)
+        old = np.load(fname, mmap_mode="r+") if os.path.exists(fname) else None
+        if old is not None and old.shape[0] >= shape[0]:
+            return old
+        tmp = fname + ".tmp.npy"
+        new = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+        new[:] = fill
+        if old is not None:
+            new[:old.shape[0]] = old
+            del old
+        new.flush()
+        del new
+        os.replace(tmp, fname)
+        return np.load(fname, mmap_mode="r+")
+
+    def _open(self, capacity: int) -> None:
+        self.vectors = self._column("vectors.npy", np.int8, (capacity, self.dim))
+        self.lists = self._column("lists.npy", np.int32, (capacity,), fill=-1)
+        self.kinds = self._column("kinds.npy", np.int8, (capacity,))
+        self.users = self._column("users.npy", np.uint32, (capacity,))
+        self.offsets = self._column("offsets.npy", np.int64, (capacity,))
+        self.capacity = min(len(col) for col in (self.vectors, self.lists, self.kinds, self.users, self.offsets))
+        self._column_sizes = self._sizes()
+
+    # ---------- writes ----------
+    def add(self, texts: Sequence[str], kind: str = "note", user_id: Optional[str] = None,
+            extras: Optional[Sequence[Dict[str, Any]]] = None) -> List[int]:
+        """Append texts (one kind/user per call); returns their row ids."""
+        texts = list(texts)
+        if not texts:
+            return []
+        vecs = self.embedder.embed(texts)
+        with self._exclusive():
+            start, end = self.count, self.count + len(texts)
+            if end > self.capacity:
+                self._open(max(end, 2 * self.capacity))
+            self.vectors[start:end] = np.rint(vecs * _SCALE)
+            self.kinds[start:end] = KINDS.get(kind, 0)
+            self.users[start:end] = _user_hash(user_id)
+            if self.nlist:
+                self.lists[start:end] = self._assign(vecs)
+            self._meta.seek(0, os.SEEK_END)
+            for row, text in enumerate(texts):
+                self.offsets[start + row] = self._meta.tell()
+                record = {"id": start + row, "text": text, "kind": kind, "user_id": user_id,
+                          **((extras[row] if extras else None) or {})}
+                self._meta.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            self._meta.flush()
+            self.count = end
+            self._write_state()
+            if not self.nlist and self.count >= self.train_at:
+                self._background(self.train)
+            elif self.nlist and self.count - self._grouped > max(50000, self._grouped // 10):
+                self._background(self._group)
+            return list(range(start, end))
+
+    def _background(self, job) -> None:
+        """Run train/_group on one helper thread so add() never waits for them."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=job, name="mindsync-rag-index", daemon=True)
+            self._worker.start()
+
+    def _rows(self, rows) -> np.ndarray:
+        return self.vectors[rows].astype(np.float32) / _SCALE
+
+    def _scores(self, rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+        # plain-ndarray view: fancy indexing a np.memmap pays for the subclass on every call
+        return self.vectors.view(np.ndarray)[rows].astype(np.float32) @ (q / _SCALE)
+
+    def _assign(self, vecs: np.ndarray) -> np.ndarray:
+        return np.argmax(vecs @ self.centroids.T, axis=1).astype(np.int32)
+
+    def train(self, iterations: int = 8, seed: int = 0) -> None:
+        """
+        Fit the coarse quantizer on a sample and assign every row to a list.
+        The heavy part runs without the lock, so adds and searches continue
+        (exhaustively) meanwhile.
+        """
+        n = self.count
+        nlist = int(min(4096, max(16, 4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, size=min(n, nlist * 40), replace=False))
+        sample = self._rows(sample_rows)
+        cent = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ cent.T, axis=1)
+            sums = np.zeros_like(cent)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            keep = norms[:, 0] > 0
+            cent[keep] = sums[keep] / norms[keep]  # empty clusters keep their old centroid
+        lists = np.empty(n, dtype=np.int32)
+        for i in range(0, n, _CHUNK):
+            chunk = self._rows(slice(i, min(i + _CHUNK, n)))
+            lists[i:i + len(chunk)] = np.argmax(chunk @ cent.T, axis=1)
+        with self._exclusive():
+            if self.nlist:
+                return  # another process trained it meanwhile
+            self.centroids = cent
+            np.save(self._file("centroids.npy"), cent)
+            self.lists[:n] = lists
+            if self.count > n:
+                self.lists[n:self.count] = self._assign(self._rows(slice(n, self.count)))
+            self.lists.flush()
+            self.nlist = nlist
+            self._order, self._grouped = None, 0  # every row is "tail" until regrouped
+            self._write_state()
+        self._group()
+
+    # ---------- reads ----------
+    def _group(self) -> None:
+        """
+        Row ids sorted by list (CSR layout) for all rows so far, saved for the
+        next open. Rows added later are found through lists.npy until the next
+        regroup.
+        """
+        n = self.count
+        lists = np.array(self.lists[:n])
+        order = np.argsort(lists, kind="stable").astype(np.int64)
+        bounds = np.searchsorted(lists[order], np.arange(self.nlist + 1))
+        tmp = f".{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        for name, arr in (("order.npy", order), ("bounds.npy", bounds)):
+            np.save(self._file(name + tmp), arr)
+        with self._exclusive():
+            for name in ("order.npy", "bounds.npy"):
+                os.replace(self._file(name + tmp), self._file(name))
+            self._order, self._bounds, self._grouped = order, bounds, n
+            self._write_state()
+
+    def _candidates(self, q: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        if not self.nlist:
+            return None
+        probe = np.argpartition(-(self.centroids @ q), min(nprobe, self.nlist - 1))[:nprobe]
+        parts = [] if self._order is None else [self._order[self._bounds[p]:self._bounds[p + 1]] for p in probe]
+        tail = np.arange(self._grouped, self.count)
+        if len(tail):
+            lists = self.lists.view(np.ndarray)[self._grouped:self.count]
+            parts.append(tail[(lists[:, None] == probe).any(axis=1)])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def search(self, query: str, k: int = 5, kind: Optional[str] = None, user_id: Optional[str] = None,
+               nprobe: Optional[int] = None, any_user: bool = False) -> List[Dict[str, Any]]:
+        """
+        Top-k records of `user_id` (None: rows added without a user) by cosine
+        similarity, each with a "score". any_user=True searches every user's rows.
+        """
+        q = self.embedder.embed([query])[0]
+        if not q.any():
+            return []
+        user = None if any_user else _user_hash(user_id)
+        with self._lock:
+            if self._changed():
+                self._flock(fcntl.LOCK_SH if fcntl else 0)
+                try:
+                    self._refresh()
+                finally:
+                    self._flock(fcntl.LOCK_UN if fcntl else 0)
+            rows = None
+            if user is not None:
+                # one user's history is small: score all of it exactly rather than probing
+                own = np.flatnonzero(self.users.view(np.ndarray)[:self.count] == user)
+                if len(own) <= _CHUNK:
+                    rows = own
+            if rows is None:
+                rows = self._candidates(q, nprobe or self.nprobe)
+            chunks = [rows] if rows is not None else [np.arange(i, min(i + _CHUNK, self.count))
+                                                      for i in range(0, self.count, _CHUNK)]
+            best_rows, best_scores = [], []
+            for chunk in chunks:
+                mask = np.ones(len(chunk), dtype=bool)
+                if kind is not None:
+                    mask &= self.kinds.view(np.ndarray)[chunk] == KINDS.get(kind, 0)
+                if user is not None:
+                    mask &= self.users.view(np.ndarray)[chunk] == user
+                chunk = chunk[mask]
+                if not len(chunk):
+                    continue
+                scores = self._scores(chunk, q)
+                top = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+                best_rows.append(chunk[top])
+                best_scores.append(scores[top])
+            if not best_rows:
+                return []
+            rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+            top = np.argsort(-scores)[:k]
+            out = []
+            for row, score in zip(rows[top], scores[top]):
+                self._meta.seek(int(self.offsets[row]))
+                record = json.loads(self._meta.readline())
+                if user is not None and record.get("user_id") != user_id:
+                    continue  # user hash collision
+                out.append({**record, "score": round(float(score), 4)})
+            return out
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._worker.join()
+        with self._lock:
+            self._meta.close()
+            self._lockfile.close()
+            for col in (self.vectors, self.lists, self.kinds, self.users, self.offsets):
+                col.flush()
+
+
 class RAGAgent:
-    def __init__(self):
+    """Planner-facing memory: remember() past tasks, moods and advice, recall() similar ones."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("MINDSYNC_RAG_PATH", "rag_index")
+        self.index: Optional[VectorIndex] = None
         self.connected = False
 
     def connect(self):
+        if self.index is None:
+            self.index = VectorIndex(self.path)
         self.connected = True
         return "RAG connected."
 
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        self.connected = False
+
+    def remember(self, texts: Iterable[str], kind: str = "note", user_id: Optional[str] = None,
+                 extras: Optional[Sequence[Dict[str, Any]]] = None) -> List[int]:
+        if self.index is None:
+            self.connect()
+        return self.index.add(list(texts), kind=kind, user_id=user_id, extras=extras)
+
+    def recall(self, query: str, k: int = 5, kind: Optional[str] = None,
+               user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        if self.index is None:
+            return []
+        return self.index.search(query, k=k, kind=kind, user_id=user_id)
+
     def status(self):
         return "Active" if self.connected else "Inactive"
@@ -0,0 +1,253 @@
+# reschedule.py
+"""
+Incremental rescheduling after a single edit.
+
+Given the previous schedule (events sorted by start, as produced by
+make_events / schedule_tasks) and one edit, only the events around the edit
+point are parsed and moved:
+
+    move    {"op": "move",   "index" | "id", "start", ["end"]}
+    resize  {"op": "resize", "index" | "id", "end", ["start"]}
+    insert  {"op": "insert", "title", "start", "end" | "duration"}
+    delete  {"op": "delete", "index" | "id"}
+
+The edited event is pinned where the user put it. Later events it now
+overlaps are pushed back (keeping the break between them), and the ripple
+stops at the first event that already clears the one before it. With
+compact=True, deleting or shrinking an event pulls the back-to-back chain
+behind it forward to close the hole.
+
+A ScheduleIndex wraps the events once: an id map, and start/end times
+parsed on first use (offsets like "+02:00" are converted to local time, so
+times compare correctly whatever their format). Events are found by binary
+search on start time, so an edit parses O(log n + k) events for k moved
+ones. Keep the index and commit() each diff into it (backend_api keeps one
+per schedule version) and later edits need no O(n) step at all.
+
+The result is a diff: {"changed": [...], "added": [...], "removed": [ids]}.
+Events are identified by their "id" field; schedules from make_events and
+schedule_tasks carry one. An event without one is named after its position
+when the index is built, and keeps that name through later edits.
+"""
+import datetime as dt
+import uuid
+from typing import Dict, List, Optional, Sequence, Union
+
+from scheduler import ISO_FMT, local_naive
+
+
+def _parse(value) -> dt.datetime:
+    if not isinstance(value, dt.datetime):
+        value = dt.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return local_naive(value)
+
+
+def _fmt(when: dt.datetime) -> str:
+    return when.strftime(ISO_FMT)
+
+
+class ScheduleIndex:
+    """
+    Events sorted by start, with an id map and lazily parsed times. Keep one
+    per schedule and commit() each diff into it: later edits then find their
+    event in O(log n) and parse only what they touch.
+    """
+
+    def __init__(self, events: Sequence[Dict]):
+        # events without an id are named after their position, once; the names stay with them
+        self.events: List[Dict] = [ev if "id" in ev else dict(ev, id=str(i)) for i, ev in enumerate(events)]
+        self.by_id: Dict[str, Dict] = {}
+        for ev in self.events:
+            self.by_id.setdefault(str(ev["id"]), ev)
+        self._starts: List[Optional[dt.datetime]] = [None] * len(self.events)
+        self._ends: List[Optional[dt.datetime]] = [None] * len(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def event_id(self, i: int) -> str:
+        return str(self.events[i]["id"])
+
+    def start(self, i: int) -> dt.datetime:
+        if self._starts[i] is None:
+            self._starts[i] = _parse(self.events[i]["start"])
+        return self._starts[i]
+
+    def end(self, i: int) -> dt.datetime:
+        if self._ends[i] is None:
+            self._ends[i] = _parse(self.events[i]["end"])
+        return self._ends[i]
+
+    def _first_at(self, when: dt.datetime) -> int:
+        lo, hi = 0, len(self.events)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.start(mid) < when:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def position(self, eid: str) -> int:
+        ev = self.by_id.get(str(eid))
+        if ev is None:
+            raise KeyError(f"no event with id {eid!r}")
+        i = self._first_at(_parse(ev["start"]))
+        while self.events[i] is not ev:  # events sharing a start time
+            i += 1
+        return i
+
+    def locate(self, edit: Dict) -> int:
+        if edit.get("index") is not None:
+            i = int(edit["index"])
+            if not 0 <= i < len(self.events):
+                raise IndexError(f"no event at index {i}")
+            return i
+        if edit.get("id") is not None:
+            return self.position(edit["id"])
+        raise ValueError("edit needs an 'index' or 'id'")
+
+    def commit(self, diff: Dict[str, List]) -> None:
+        """Apply a diff from apply_edit() in place; touches only the events it names."""
+        removed = set(diff.get("removed", []))
+        changed = diff.get("changed", [])
+        for pos in sorted((self.position(eid) for eid in list(removed) + [c["id"] for c in changed]), reverse=True):
+            self.events.pop(pos)
+            del self._starts[pos], self._ends[pos]
+        for eid in removed:
+            del self.by_id[eid]
+        for c in changed:
+            # a copy: the dicts the index was built from are never modified
+            ev = self.by_id[c["id"]] = dict(self.by_id[c["id"]], start=c["start"], end=c["end"])
+            self._insert(ev)
+        for ev in diff.get("added", []):
+            ev = dict(ev)
+            self.by_id[str(ev["id"])] = ev
+            self._insert(ev)
+
+    def _insert(self, ev: Dict) -> None:
+        s = _parse(ev["start"])
+        i = self._first_at(s)
+        self.events.insert(i, ev)
+        self._starts.insert(i, s)
+        self._ends.insert(i, None)
+
+
+def event_id(events: Sequence[Dict], i: int) -> str:
+    return str(events[i].get("id", i))
+
+
+def apply_edit(events: Union[Sequence[Dict], ScheduleIndex], edit: Dict, gap: int = 0,
+               compact: bool = False) -> Dict[str, List]:
+    """Diff that applies `edit` to `events` (a list or a ScheduleIndex of it); nothing is modified."""
+    op = (edit.get("op") or "").lower()
+    if op not in ("move", "resize", "insert", "delete"):
+        raise ValueError(f"unknown edit op {op!r}")
+    idx = events if isinstance(events, ScheduleIndex) else ScheduleIndex(events)
+    gap_td = dt.timedelta(minutes=gap)
+    skip: Optional[int] = None if op == "insert" else idx.locate(edit)
+    n = len(idx) - (0 if skip is None else 1)
+
+    # the schedule without the edited event, without copying it
+    def at(p: int) -> int:
+        return p + 1 if skip is not None and p >= skip else p
+
+    changed: Dict[int, tuple] = {}
+    diff: Dict[str, List] = {"changed": [], "added": [], "removed": []}
+
+    def _pull(p: int, orig_end: dt.datetime, new_end: dt.datetime):
+        """Close a hole: shift the back-to-back chain starting at p earlier."""
+        while p < n:
+            j = at(p)
+            s, e = idx.start(j), idx.end(j)
+            if s != orig_end + gap_td or new_end >= orig_end:
+                break
+            ns = new_end + gap_td
+            changed[j] = (ns, ns + (e - s))
+            orig_end, new_end = e, ns + (e - s)
+            p += 1
+
+    if op == "delete":
+        diff["removed"].append(idx.event_id(skip))
+        if compact:
+            _pull(skip, idx.end(skip), idx.start(skip) - gap_td)
+        return _finish(idx, changed, diff)
+
+    if op == "insert":
+        s = _parse(edit["start"])
+        e = _parse(edit["end"]) if edit.get("end") else s + dt.timedelta(minutes=int(edit.get("duration", 30)))
+        item = {"title": (edit.get("title") or "").strip() or "Untitled Task", "start": _fmt(s), "end": _fmt(e)}
+        item["id"] = str(edit["id"]) if edit.get("id") is not None else f"new-{uuid.uuid4().hex[:12]}"
+        if item["id"] in idx.by_id:
+            raise ValueError(f"an event with id {item['id']!r} already exists")
+        diff["added"].append(item)
+    else:
+        os_, oe = idx.start(skip), idx.end(skip)
+        if op == "move":
+            s = _parse(edit["start"])
+            e = _parse(edit["end"]) if edit.get("end") else s + (oe - os_)
+        else:
+            s = _parse(edit["start"]) if edit.get("start") else os_
+            e = _parse(edit["end"])
+        if e < s:
+            raise ValueError("event would end before it starts")
+        changed[skip] = (s, e)
+
+    # first remaining event starting at or after the pinned one
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if idx.start(at(mid)) < s:
+            lo = mid + 1
+        else:
+            hi = mid
+    p = lo
+
+    # a predecessor the edit now overlaps goes behind the pinned event
+    cur_end = e
+    if p > 0:
+        j = at(p - 1)
+        js, je = idx.start(j), idx.end(j)
+        if je + gap_td > s and js < e:
+            ns = cur_end + gap_td
+            changed[j] = (ns, ns + (je - js))
+            cur_end = ns + (je - js)
+    while p < n:
+        j = at(p)
+        js, je = idx.start(j), idx.end(j)
+        if js >= cur_end + gap_td:
+            break
+        ns = cur_end + gap_td
+        changed[j] = (ns, ns + (je - js))
+        cur_end = ns + (je - js)
+        p += 1
+
+    if op == "resize" and compact and e < oe and len(changed) == 1:
+        _pull(skip, oe, e)
+    return _finish(idx, changed, diff)
+
+
+def _finish(idx: ScheduleIndex, changed, diff):
+    for j, (s, e) in sorted(changed.items(), key=lambda kv: kv[1][0]):
+        diff["changed"].append({"id": idx.event_id(j), "title": idx.events[j].get("title"),
+                                "start": _fmt(s), "end": _fmt(e)})
+    return diff
+
+
+def apply_diff(events: Sequence[Dict], diff: Dict[str, List]) -> List[Dict]:
+    """The full schedule with a diff applied, sorted by start (for clients that keep the whole list)."""
+    by_id = {c["id"]: c for c in diff.get("changed", [])}
+    removed = set(diff.get("removed", []))
+    out = []
+    for i, ev in enumerate(events):
+        eid = event_id(events, i)
+        if eid in removed:
+            continue
+        c = by_id.get(eid)
+        ev = dict(ev, id=eid)
+        if c:
+            ev.update(start=c["start"], end=c["end"])
+        out.append(ev)
+    out.extend(diff.get("added", []))
+    out.sort(key=lambda ev: _parse(ev["start"]))
+    return out
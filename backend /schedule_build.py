@@ -0,0 +1,121 @@
+# schedule_build.py
+"""
+/generate_schedule's request models and the request -> schedule step.
+
+Bulk scheduling runs build_schedule in spawned worker processes, which
+import this module and nothing else of the API, so it stays free of the
+heavy imports (emotion engine and model, agents, RAG index, tool runtime,
+pandas): a worker costs scheduler + optimizer + pydantic, not a second copy
+of the API. Saving results is left to the caller (backend_api).
+"""
+import datetime as dt
+import json
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from optimizer import optimize_order
+from scheduler import parse_clock, parse_when, schedule_tasks
+
+
+class TaskIn(BaseModel):
+    name: str
+    hours: int = 0
+    minutes: int = 0
+    deadline: Optional[str] = None  # ISO datetime, or "HH:MM" on the schedule day
+    energy: Optional[float] = None  # 0-1 effort, used by the optimizer (defaults from length)
+    category: Optional[str] = None  # switching category between tasks costs the optimizer
+
+class BusyIn(BaseModel):
+    start: str
+    end: str
+    title: Optional[str] = None
+
+class ScheduleIn(BaseModel):
+    tasks: List[TaskIn]
+    mood_label: Optional[str] = "neutral"
+    start_time: str = "09:00"
+    break_min: int = 10
+    busy: List[BusyIn] = []
+    day_start: Optional[str] = None  # window start on later days; defaults to start_time
+    day_end: str = "23:00"
+    days: int = Field(1, ge=1, le=62)  # days the schedule may spill over; capped, as slots are built per day
+    date: Optional[dt.date] = None  # the day being planned; defaults to today
+    optimize: bool = False  # energy-aware ordering instead of the strategy sort
+    budget_ms: float = 50.0  # time cap for the optimizer
+    user_id: Optional[str] = None  # generated tasks are saved to tasks_db under this user
+
+
+def emotion_to_strategy(label: Optional[str]) -> str:
+    if not label:
+        return "neutral"
+    label = label.lower()
+    low = {"sadness", "fear", "anger"}
+    high = {"joy", "optimism", "love"}
+    if label in low: return "short-first"
+    if label in high: return "long-first"
+    return "neutral"
+
+
+def tasks_from_items(items) -> List[Dict]:
+    """Task dicts straight from request models (name/hours/minutes), no DataFrame needed."""
+    return [{"Task": (t.name or "").strip() or "Untitled Task",
+             "Duration (mins)": int(t.hours or 0) * 60 + int(t.minutes or 0)} for t in items]
+
+
+def build_schedule(body: ScheduleIn) -> dict:
+    """Strategy sort (or optimizer) + placement for one request; nothing is saved."""
+    label = (body.mood_label or "neutral").lower()
+    strategy = emotion_to_strategy(label)
+
+    # reorder by strategy (also the optimizer's fallback if its budget runs out)
+    tasks = list(body.tasks)
+    if strategy == "long-first":
+        tasks.sort(key=lambda t: -((t.hours or 0) * 60 + (t.minutes or 0)))
+    elif strategy == "short-first":
+        tasks.sort(key=lambda t: ((t.hours or 0) * 60 + (t.minutes or 0)))
+
+    day = body.date or dt.date.today()
+    rows = tasks_from_items(tasks)
+    for row, t in zip(rows, tasks):
+        if t.deadline:
+            row["Deadline"] = parse_when(t.deadline, day)
+        if t.energy is not None:
+            row["Energy"] = t.energy
+        if t.category:
+            row["Category"] = t.category
+
+    start_dt = dt.datetime.combine(day, parse_clock(body.start_time, dt.time(9, 0)))
+    optimized = False
+    if body.optimize:
+        info = {}
+        rows = optimize_order(rows, label, start_dt, body.break_min, budget_ms=body.budget_ms, info=info)
+        optimized = info["optimized"]
+        if optimized:
+            strategy = "energy-aware"
+    busy = [(parse_when(b.start, day), parse_when(b.end, day)) for b in body.busy]
+    placed = schedule_tasks(rows, start_dt, body.break_min, busy=busy,
+                            day_end=parse_clock(body.day_end, dt.time(23, 0)),
+                            day_start=parse_clock(body.day_start, start_dt.time()),
+                            days=body.days, keep_order=optimized)  # the optimizer weighs deadlines itself
+    return {"events": placed["events"], "unscheduled": placed["unscheduled"], "strategy": strategy}
+
+
+def schedule_chunk(chunk):
+    """
+    (record, (label, day) to persist it under, or None) for (index, raw line)
+    pairs; runs in a bulk worker process. A bad line becomes an error record,
+    not a failed chunk.
+    """
+    out = []
+    for index, line in chunk:
+        user_id = None
+        try:
+            data = json.loads(line)
+            user_id = data.get("user_id") if isinstance(data, dict) else None
+            body = ScheduleIn(**data)
+            record = {"index": index, "user_id": user_id, **build_schedule(body)}
+            out.append((record, ((body.mood_label or "neutral").lower(), body.date or dt.date.today())))
+        except Exception as e:
+            out.append(({"index": index, "user_id": user_id, "error": f"{type(e).__name__}: {e}"}, None))
+    return out
@@ -0,0 +1,185 @@
+# scheduler.py
+"""
+Constraint-aware task placement.
+
+Time is handled as integer minutes from midnight of the schedule's first
+day. Working windows (one per day, the first starting at the requested start
+time and every window ending at day_end) minus the busy blocks give a sorted
+list of free slots. A max segment tree over the slots' remaining capacity
+finds the earliest slot that can hold a task in O(log m); a task always takes
+the front of its slot, so slots shrink but never split and the tree stays the
+same size. Placing n tasks into m slots costs O((n + m) log m) overall.
+
+Tasks with a deadline are placed first, earliest deadline first, then the
+rest in the order given (so the mood strategy's ordering is kept wherever
+it fits). Anything that cannot be placed is reported, not dropped silently.
+"""
+import datetime as dt
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from event_table import EventTable, epoch_minutes
+
+ISO_FMT = "%Y-%m-%dT%H:%M:%S"
+
+
+def parse_clock(value, default: dt.time) -> dt.time:
+    """'HH:MM' (or a time) to a time; None gives the default."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, dt.time):
+        return value
+    h, m = [int(x) for x in str(value).split(":")[:2]]
+    return dt.time(h, m)
+
+
+def local_naive(when: dt.datetime) -> dt.datetime:
+    """Naive local wall-clock time; an aware datetime is converted first, not just stripped."""
+    return when.astimezone().replace(tzinfo=None) if when.tzinfo is not None else when
+
+
+def parse_when(value, day: dt.date) -> Optional[dt.datetime]:
+    """ISO datetime (an offset or 'Z' is converted to local time), or 'HH:MM' on `day`; None passes through."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, dt.datetime):
+        return local_naive(value)
+    text = str(value)
+    if "T" not in text and " " not in text and len(text) <= 5:
+        return dt.datetime.combine(day, parse_clock(text, dt.time(0, 0)))
+    return local_naive(dt.datetime.fromisoformat(text.replace("Z", "+00:00")))
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort and merge overlapping/touching [start, end) intervals."""
+    merged: List[List[int]] = []
+    for s, e in sorted((s, e) for s, e in intervals if e > s):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return [(s, e) for s, e in merged]
+
+
+def subtract_intervals(windows: Sequence[Tuple[int, int]], busy: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Free parts of sorted, disjoint `windows` once sorted, merged `busy` is removed (linear sweep)."""
+    free = []
+    j = 0
+    for ws, we in windows:
+        cur = ws
+        while j < len(busy) and busy[j][1] <= cur:
+            j += 1
+        k = j
+        while k < len(busy) and busy[k][0] < we:
+            bs, be = busy[k]
+            if bs > cur:
+                free.append((cur, bs))
+            cur = max(cur, be)
+            if be > we:
+                break
+            k += 1
+        if cur < we:
+            free.append((cur, we))
+    return free
+
+
+class _MaxTree:
+    """Max segment tree over slot capacities with leftmost-fit search."""
+
+    def __init__(self, values: Sequence[int]):
+        size = 1
+        while size < max(1, len(values)):
+            size *= 2
+        self.size = size
+        self.tree = [-1] * (2 * size)
+        self.tree[size:size + len(values)] = list(values)
+        for i in range(size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def update(self, idx: int, value: int) -> None:
+        i = idx + self.size
+        self.tree[i] = value
+        i //= 2
+        while i:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def first_at_least(self, need: int) -> int:
+        """Index of the leftmost leaf with value >= need, or -1."""
+        if self.tree[1] < need:
+            return -1
+        i = 1
+        while i < self.size:
+            i = 2 * i if self.tree[2 * i] >= need else 2 * i + 1
+        return i - self.size
+
+
+def schedule_tasks(tasks: Sequence[Dict], start_dt: dt.datetime, gap: int = 10,
+                   busy: Iterable[Tuple[dt.datetime, dt.datetime]] = (),
+                   day_end: dt.time = dt.time(23, 0), day_start: Optional[dt.time] = None,
+                   days: int = 1, keep_order: bool = False) -> Dict[str, List[Dict]]:
+    """
+    Place tasks into free time around busy blocks.
+
+    tasks     dicts with "Task" and "Duration (mins)", optionally "Deadline" (datetime)
+    start_dt  earliest start on the first day
+    busy      (start, end) datetimes that must stay free of tasks (meetings, etc.)
+    day_end   end of the working window each day (the calendar view stops at 23:00)
+    day_start start of the window on the following days (defaults to start_dt's time)
+    days      how many days the schedule may spill over
+    keep_order place tasks in the given order instead of deadline tasks first
+              (for an order that already accounts for deadlines, e.g. optimize_order's)
+
+    Returns {"events": EventsView, "unscheduled": [...]}; events are sorted by
+    start and read like make_events' (list(...) or .to_list() for a plain list).
+    """
+    base = dt.datetime.combine(start_dt.date(), dt.time(0, 0))
+    day_start = day_start or start_dt.time()
+
+    def _mins(when: dt.datetime) -> int:
+        return int((when - base).total_seconds() // 60)
+
+    windows = []
+    for d in range(max(1, days)):
+        ws = d * 1440 + (day_start.hour * 60 + day_start.minute)
+        if d == 0:
+            ws = _mins(start_dt)
+        we = d * 1440 + day_end.hour * 60 + day_end.minute
+        if we > ws:
+            windows.append((ws, we))
+
+    blocked = merge_intervals((_mins(s), _mins(e)) for s, e in busy)
+    slots = subtract_intervals(windows, blocked)
+    cursor = [s for s, _ in slots]
+    ends = [e for _, e in slots]
+    tree = _MaxTree([e - s for s, e in slots])
+
+    # deadline tasks first (EDF), the rest keep their given order
+    order = range(len(tasks)) if keep_order else sorted(
+        range(len(tasks)), key=lambda i: (tasks[i].get("Deadline") is None, tasks[i].get("Deadline") or dt.datetime.max, i))
+    placed: List[Tuple[int, int, int]] = []
+    unscheduled: List[Dict] = []
+    for i in order:
+        t = tasks[i]
+        title = ((t.get("Task") or t.get("Task Name") or "").strip()) or "Untitled Task"
+        mins = max(0, int(t.get("Duration (mins)", 30)))
+        idx = tree.first_at_least(mins)
+        if idx < 0:
+            unscheduled.append({"title": title, "duration": mins, "reason": "no free slot long enough"})
+            continue
+        start = cursor[idx]
+        deadline = t.get("Deadline")
+        if deadline is not None and start + mins > _mins(deadline):
+            unscheduled.append({"title": title, "duration": mins, "reason": "cannot finish before deadline"})
+            continue
+        placed.append((start, start + mins, i))
+        cursor[idx] = start + mins + gap
+        tree.update(idx, ends[idx] - cursor[idx])
+
+    placed.sort()
+    origin = epoch_minutes(base)
+    # an event's id is its task's position in `tasks`, so it survives edits that reorder or drop others
+    table = EventTable([((tasks[i].get("Task") or tasks[i].get("Task Name") or "").strip()) or "Untitled Task"
+                        for _, _, i in placed],
+                       [origin + s for s, _, _ in placed], [e - s for s, e, _ in placed],
+                       ids=[str(i) for _, _, i in placed])
+    return {"events": table.events, "unscheduled": unscheduled}
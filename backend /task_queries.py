@@ -0,0 +1,127 @@
+# task_queries.py
+"""
+Read side of tasks_db.
+
+Every query is shaped to be answered from an index rather than a table scan,
+so it stays in the milliseconds on multi-million-row tables:
+
+    find_tasks        emotion/status/user filters, newest first, from the index of
+                      the most selective filter given: idx_tasks_user, then
+                      idx_tasks_emotion, else idx_tasks_created (the others are
+                      checked in that index)
+    history           keyset pages over (created_at, id), newest first (idx_tasks_created
+                      when unfiltered); the cursor is the last row's position, so page N
+                      costs the same as page 1
+    completion_stats  per-emotion totals from task_totals / task_counts, which
+                      save_tasks and triggers keep current, so the cost does not grow
+                      with the table
+    events_between    a user's saved events overlapping a time window
+                      (idx_events_user_end_start)
+"""
+import datetime as dt
+from typing import Any, Dict, List, Optional, Tuple
+
+import tasks_db
+
+_COLUMNS = "id, task, emotion, status, user_id, created_at"
+
+
+def _row(r) -> Dict[str, Any]:
+    return {
+        "id": r[0], "task": r[1], "emotion": r[2], "status": r[3], "user_id": r[4],
+        "created_at": dt.datetime.fromtimestamp(r[5], dt.timezone.utc).isoformat() if r[5] is not None else None,
+    }
+
+
+def encode_cursor(created_at: int, row_id: int) -> str:
+    return f"{created_at}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        created_at, row_id = cursor.split(":")
+        return int(created_at), int(row_id)
+    except ValueError:
+        raise ValueError(f"bad cursor {cursor!r}") from None
+
+
+def _where(emotion, status, user_id) -> Tuple[List[str], List[Any]]:
+    clauses, params = [], []
+    for column, value in (("user_id", user_id), ("emotion", emotion), ("status", status)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return clauses, params
+
+
+def _index(emotion, status, user_id) -> str:
+    # pinned rather than left to the planner, which without ANALYZE statistics may walk
+    # a whole emotion's rows looking for one user's
+    if user_id is not None:
+        return " INDEXED BY idx_tasks_user"
+    if emotion is not None:
+        return " INDEXED BY idx_tasks_emotion"
+    return " INDEXED BY idx_tasks_created"
+
+
+def find_tasks(emotion: Optional[str] = None, status: Optional[str] = None, user_id: Optional[str] = None,
+               limit: int = 50, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Newest tasks matching every given filter."""
+    return history(emotion=emotion, status=status, user_id=user_id, limit=limit, path=path)["tasks"]
+
+
+def history(user_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = 50,
+            emotion: Optional[str] = None, status: Optional[str] = None,
+            path: Optional[str] = None) -> Dict[str, Any]:
+    """One page of tasks, newest first: {"tasks": [...], "next_cursor": str | None}."""
+    limit = max(1, min(int(limit), 1000))
+    clauses, params = _where(emotion, status, user_id)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend([created_at, row_id])
+    sql = f"SELECT {_COLUMNS} FROM tasks" + _index(emotion, status, user_id)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    rows = tasks_db.connect(path).execute(sql, params + [limit + 1]).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "tasks": [_row(r) for r in rows],
+        "next_cursor": encode_cursor(rows[-1][5], rows[-1][0]) if more else None,
+    }
+
+
+def completion_stats(user_id: Optional[str] = None, path: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """{emotion: {"total", "completed"}}; a task counts as completed when its status says so."""
+    if user_id is None:
+        sql, params = "SELECT emotion, status, n FROM task_totals WHERE n > 0", []
+    else:
+        sql, params = "SELECT emotion, status, n FROM task_counts WHERE user_id = ? AND n > 0", [user_id]
+    out: Dict[str, Dict[str, int]] = {}
+    for emotion, status, n in tasks_db.connect(path).execute(sql, params):
+        entry = out.setdefault(emotion or "unknown", {"total": 0, "completed": 0})
+        entry["total"] += n
+        if "completed" in (status or "").lower():
+            entry["completed"] += n
+    return out
+
+
+def _iso_bound(value) -> str:
+    """Date or datetime (object or ISO text) as the naive ISO text events are stored in."""
+    if isinstance(value, str):
+        value = dt.datetime.fromisoformat(value)
+    if not isinstance(value, dt.datetime):
+        value = dt.datetime.combine(value, dt.time(0, 0))
+    return value.replace(tzinfo=None).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def events_between(user_id: str, start, end, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Saved events of `user_id` overlapping [start, end), ordered by start."""
+    rows = tasks_db.connect(path).execute(
+        'SELECT id, schedule_id, title, start, "end" FROM events '
+        'WHERE user_id = ? AND "end" > ? AND start < ? ORDER BY start, id',
+        (user_id, _iso_bound(start), _iso_bound(end)),
+    ).fetchall()
+    return [{"id": r[0], "schedule_id": r[1], "title": r[2], "start": r[3], "end": r[4]} for r in rows]
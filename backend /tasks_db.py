@@ -1,21 +1,263 @@
 # tasks_db.py
+"""
+SQLite persistence for tasks.
+
+Each thread reuses one connection per database file instead of opening a
+new one per write. Connections run in WAL mode with synchronous=NORMAL:
+readers never block the writer, and a commit appends to the WAL without an
+fsync (the WAL is synced at checkpoints). A crash can lose the last few
+commits but never corrupts the database. save_tasks() writes a whole plan
+with executemany in a single transaction.
+
+The schema is versioned with PRAGMA user_version; connect() applies any
+MIGRATIONS the file has not seen yet, each in its own transaction, so
+databases written by older versions are upgraded in place.
+
+The database path is MINDSYNC_DB_PATH (default "tasks.db").
+"""
+import os
 import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-def init_db():
-    conn = sqlite3.connect("tasks.db")
-    c = conn.cursor()
-    c.execute("""CREATE TABLE IF NOT EXISTS tasks (
+_local = threading.local()
+
+SCHEMA = """CREATE TABLE IF NOT EXISTS tasks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 task TEXT,
                 emotion TEXT,
                 status TEXT
-                )""")
-    conn.commit()
-    conn.close()
-
-def save_task(task, emotion, status):
-    conn = sqlite3.connect("tasks.db")
-    c = conn.cursor()
-    c.execute("INSERT INTO tasks (task, emotion, status) VALUES (?, ?, ?)", (task, emotion, status))
-    conn.commit()
-    conn.close()
+                )"""
+
+# MIGRATIONS[v] takes a database from user_version v to v + 1
+MIGRATIONS: List[List[str]] = [
+    # 1: the original table
+    [SCHEMA],
+    # 2: who/when columns, read indexes, and (emotion, status) counts, per user and overall; save_tasks adds
+    #    inserts to the counts once per batch, triggers handle the (rare) updates and deletes
+    [
+        "ALTER TABLE tasks ADD COLUMN created_at INTEGER",
+        "ALTER TABLE tasks ADD COLUMN user_id TEXT",
+        "UPDATE tasks SET created_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE created_at IS NULL",
+        # newest-first reads: per user, per emotion, and overall (status has three values, so a
+        # status-only page is a short scan of idx_tasks_created). The other filter columns ride
+        # along, so they are checked in the index and only returned rows are read from the table
+        "CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at, id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks (user_id, created_at, id, emotion, status)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_emotion ON tasks (emotion, created_at, id, status)",
+        """CREATE TABLE IF NOT EXISTS task_counts (
+                user_id TEXT NOT NULL,
+                emotion TEXT NOT NULL,
+                status TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (user_id, emotion, status)
+                ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS task_totals (
+                emotion TEXT NOT NULL,
+                status TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (emotion, status)
+                ) WITHOUT ROWID""",
+        """INSERT INTO task_counts
+               SELECT COALESCE(user_id, ''), COALESCE(emotion, ''), COALESCE(status, ''), COUNT(*)
+               FROM tasks GROUP BY 1, 2, 3""",
+        """INSERT INTO task_totals
+               SELECT emotion, status, SUM(n) FROM task_counts GROUP BY emotion, status""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_count_delete AFTER DELETE ON tasks BEGIN
+               UPDATE task_counts SET n = n - 1
+                   WHERE user_id = COALESCE(OLD.user_id, '') AND emotion = COALESCE(OLD.emotion, '')
+                     AND status = COALESCE(OLD.status, '');
+               UPDATE task_totals SET n = n - 1
+                   WHERE emotion = COALESCE(OLD.emotion, '') AND status = COALESCE(OLD.status, '');
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS tasks_count_update AFTER UPDATE OF user_id, emotion, status ON tasks BEGIN
+               UPDATE task_counts SET n = n - 1
+                   WHERE user_id = COALESCE(OLD.user_id, '') AND emotion = COALESCE(OLD.emotion, '')
+                     AND status = COALESCE(OLD.status, '');
+               UPDATE task_totals SET n = n - 1
+                   WHERE emotion = COALESCE(OLD.emotion, '') AND status = COALESCE(OLD.status, '');
+               INSERT INTO task_counts
+                   VALUES (COALESCE(NEW.user_id, ''), COALESCE(NEW.emotion, ''), COALESCE(NEW.status, ''), 1)
+                   ON CONFLICT (user_id, emotion, status) DO UPDATE SET n = n + 1;
+               INSERT INTO task_totals VALUES (COALESCE(NEW.emotion, ''), COALESCE(NEW.status, ''), 1)
+                   ON CONFLICT (emotion, status) DO UPDATE SET n = n + 1;
+           END""",
+    ],
+    # 3: detected moods, newest-first per user
+    [
+        """CREATE TABLE IF NOT EXISTS moods (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT,
+                confidence REAL,
+                user_id TEXT,
+                created_at INTEGER
+                )""",
+        "CREATE INDEX IF NOT EXISTS idx_moods_user_created ON moods (user_id, created_at, id)",
+    ],
+    # 4: saved schedules (one per user and day) and their events, found by time window
+    [
+        """CREATE TABLE IF NOT EXISTS schedules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                strategy TEXT,
+                created_at INTEGER
+                )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_schedules_user_day ON schedules (user_id, day)",
+        """CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                schedule_id INTEGER NOT NULL REFERENCES schedules (id),
+                user_id TEXT NOT NULL,
+                title TEXT,
+                start TEXT NOT NULL,
+                "end" TEXT NOT NULL
+                )""",
+        # window queries bound "end" from below and "start" from above; both are in the index
+        'CREATE INDEX IF NOT EXISTS idx_events_user_end_start ON events (user_id, "end", start)',
+        "CREATE INDEX IF NOT EXISTS idx_events_schedule ON events (schedule_id)",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def db_path() -> str:
+    return os.getenv("MINDSYNC_DB_PATH", "tasks.db")
+
+
+def _configure(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring the file up to SCHEMA_VERSION; returns the version it started at."""
+    start = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version in range(start, SCHEMA_VERSION):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # another process may have migrated while we waited for the lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] > version:
+                conn.rollback()
+                continue
+            for stmt in MIGRATIONS[version]:
+                conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version={version + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return start
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """This thread's connection to `path`, opened (and migrated) on first use."""
+    path = path or db_path()
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path)
+        _configure(conn)
+        migrate(conn)
+        conns[path] = conn
+    return conn
+
+
+def close(path: Optional[str] = None) -> None:
+    """Close this thread's connection to `path` (all of them by default); the next call reopens."""
+    conns = getattr(_local, "conns", {})
+    for p in ([path] if path else list(conns)):
+        conn = conns.pop(p, None)
+        if conn is not None:
+            conn.close()
+
+
+def init_db(path: Optional[str] = None):
+    connect(path)
+
+
+_INSERT = "INSERT INTO tasks (task, emotion, status, user_id, created_at) VALUES (?, ?, ?, ?, ?)"
+
+
+def save_task(task, emotion, status, user_id: Optional[str] = None, path: Optional[str] = None):
+    save_tasks([(task, emotion, status, user_id)], path=path)
+
+
+TaskRow = Union[Sequence, Dict]
+
+
+def _as_tuple(row: TaskRow, now: int) -> Tuple:
+    if isinstance(row, dict):
+        return (row.get("task"), row.get("emotion"), row.get("status"),
+                row.get("user_id"), row.get("created_at") or now)
+    task, emotion, status, *rest = row
+    return (task, emotion, status, rest[0] if rest else None, now)
+
+
+def save_tasks(rows: Iterable[TaskRow], path: Optional[str] = None) -> int:
+    """
+    Insert many rows in one transaction, with their task_counts / task_totals;
+    returns the count. Every insert into tasks goes through here. A row is a
+    (task, emotion, status[, user_id]) tuple or a dict with those keys
+    (plus an optional "created_at" in unix seconds).
+    """
+    now = int(time.time())
+    rows = [_as_tuple(r, now) for r in rows]
+    if not rows:
+        return 0
+    counts = Counter((r[3] or "", r[1] or "", r[2] or "") for r in rows)
+    totals: Counter = Counter()
+    for (_, emotion, status), n in counts.items():
+        totals[emotion, status] += n
+    conn = connect(path)
+    with conn:
+        conn.executemany(_INSERT, rows)
+        # one upsert per distinct (user, emotion, status) in the batch instead of a trigger per row
+        conn.executemany("INSERT INTO task_counts VALUES (?, ?, ?, ?) "
+                         "ON CONFLICT (user_id, emotion, status) DO UPDATE SET n = n + excluded.n",
+                         [(*key, n) for key, n in counts.items()])
+        conn.executemany("INSERT INTO task_totals VALUES (?, ?, ?) "
+                         "ON CONFLICT (emotion, status) DO UPDATE SET n = n + excluded.n",
+                         [(*key, n) for key, n in totals.items()])
+    return len(rows)
+
+
+def save_moods(rows: Iterable[Dict], path: Optional[str] = None) -> int:
+    """Insert {"label", "confidence", "user_id"[, "created_at"]} rows in one transaction."""
+    now = int(time.time())
+    rows = [(r.get("label"), r.get("confidence"), r.get("user_id"), r.get("created_at") or now) for r in rows]
+    if not rows:
+        return 0
+    conn = connect(path)
+    with conn:
+        conn.executemany("INSERT INTO moods (label, confidence, user_id, created_at) VALUES (?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def save_schedules(rows: Iterable[Dict], path: Optional[str] = None) -> int:
+    """
+    Store {"user_id", "day", "strategy", "events"} schedules, each replacing
+    that user's schedule for the day; returns the number of events written.
+    """
+    now = int(time.time())
+    conn = connect(path)
+    written = 0
+    with conn:
+        for r in rows:
+            user_id, day = r["user_id"], str(r["day"])
+            conn.execute("DELETE FROM events WHERE schedule_id IN "
+                         "(SELECT id FROM schedules WHERE user_id = ? AND day = ?)", (user_id, day))
+            conn.execute("DELETE FROM schedules WHERE user_id = ? AND day = ?", (user_id, day))
+            schedule_id = conn.execute("INSERT INTO schedules (user_id, day, strategy, created_at) VALUES (?, ?, ?, ?)",
+                                       (user_id, day, r.get("strategy"), now)).lastrowid
+            events = [(schedule_id, user_id, e.get("title"), e["start"], e["end"]) for e in r.get("events", [])]
+            conn.executemany('INSERT INTO events (schedule_id, user_id, title, start, "end") VALUES (?, ?, ?, ?, ?)',
+                             events)
+            written += len(events)
+    return written
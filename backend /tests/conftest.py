@@ -0,0 +1,15 @@
+# conftest.py
+"""The backend modules are flat and imported by name, so tests run against the directory above."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def _tmp_data(tmp_path, monkeypatch):
+    # nothing a test saves lands in the working directory
+    monkeypatch.setenv("MINDSYNC_DB_PATH", str(tmp_path / "tasks.db"))
+    monkeypatch.setenv("MINDSYNC_RAG_PATH", str(tmp_path / "rag_index"))
@@ -0,0 +1,120 @@
+# test_backend_api.py
+import json
+
+from fastapi.testclient import TestClient
+
+import backend_api
+from agents import default_registry
+from write_behind import shutdown_default_writer
+
+
+def test_shutdown_stops_running_agents():
+    stopped = []
+    default_registry().register("probe", object, stop=stopped.append)
+    with TestClient(backend_api.app):
+        agent = default_registry().get("probe")
+    assert stopped == [agent]
+
+
+def test_schedule_days_are_capped():
+    client = TestClient(backend_api.app)
+    body = {"tasks": [{"name": "a", "minutes": 30}], "date": "2025-01-06"}
+    assert client.post("/generate_schedule", json={**body, "days": 3000000}).status_code == 422
+    assert client.post("/generate_schedule", json={**body, "days": 0}).status_code == 422
+    assert client.post("/generate_schedule", json={**body, "days": 62}).status_code == 200
+
+
+def _events():
+    return [{"id": str(i), "title": f"T{i}", "start": f"2025-01-06T{9 + i:02d}:00:00",
+             "end": f"2025-01-06T{9 + i:02d}:30:00"} for i in range(4)]
+
+
+def test_reschedule_version_is_single_use():
+    client = TestClient(backend_api.app)
+    first = client.post("/reschedule", json={"events": _events(), "edit": {"op": "delete", "id": "1"}}).json()
+    assert first["removed"] == ["1"]
+    moved = client.post("/reschedule", json={"version": first["version"],
+                                             "edit": {"op": "move", "id": "3", "start": "2025-01-06T09:10:00"}})
+    assert moved.status_code == 200
+    again = client.post("/reschedule", json={"version": first["version"], "edit": {"op": "delete", "id": "0"}})
+    assert again.status_code == 409
+
+
+def test_reschedule_version_survives_a_failed_edit(monkeypatch):
+    client = TestClient(backend_api.app)
+    version = client.post("/reschedule", json={"events": _events(),
+                                               "edit": {"op": "delete", "id": "0"}}).json()["version"]
+    bad = client.post("/reschedule", json={"version": version, "edit": {"op": "delete", "id": "nope"}})
+    assert bad.status_code == 400
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(backend_api, "apply_edit", boom)
+    assert client.post("/reschedule", json={"version": version, "edit": {"op": "delete", "id": "2"}}).status_code == 500
+    monkeypatch.undo()
+    ok = client.post("/reschedule", json={"version": version, "edit": {"op": "delete", "id": "2"}})
+    assert ok.status_code == 200 and ok.json()["removed"] == ["2"]
+
+
+def test_etag_round_trip_answers_304():
+    client = TestClient(backend_api.app)
+    body = {"tasks": [{"name": "a", "minutes": 30}, {"name": "b", "hours": 1}], "mood_label": "joy",
+            "date": "2025-01-06"}
+    first = client.post("/generate_schedule", json=body)
+    etag = first.headers["etag"]
+    assert client.post("/generate_schedule", json=body, headers={"If-None-Match": etag}).status_code == 304
+    # same strategy, same schedule: "optimism" sorts like "joy"
+    same = client.post("/generate_schedule", json={**body, "mood_label": "optimism"}, headers={"If-None-Match": etag})
+    assert same.status_code == 304
+    changed = client.post("/generate_schedule", json={**body, "break_min": 5}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert "etag" not in client.post("/generate_schedule", json={**body, "optimize": True}).headers
+
+
+def test_latest_request_is_the_saved_schedule_even_from_cache():
+    client = TestClient(backend_api.app)
+    a = {"tasks": [{"name": "A", "minutes": 30}], "date": "2025-01-06", "user_id": "u1"}
+    b = {**a, "tasks": [{"name": "B", "minutes": 45}]}
+    for body in (a, b):
+        client.post("/generate_schedule", json=body)
+    etag = client.post("/generate_schedule", json=a).headers["etag"]  # a cache hit
+    assert client.post("/generate_schedule", json=a, headers={"If-None-Match": etag}).status_code == 304
+    shutdown_default_writer()  # flush the write-behind queue
+    week = client.get("/events", params={"user_id": "u1", "start": "2025-01-06", "end": "2025-01-13"}).json()
+    assert [e["title"] for e in week["events"]] == ["A"]
+    assert client.get("/events", params={"user_id": "u1", "start": "2025-01-07", "end": "2025-01-08"}).json() == {
+        "events": []}
+
+
+def _frames(text):
+    out = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((fields["event"], json.loads(fields["data"]), fields.get("id")))
+    return out
+
+
+def test_execute_stream_sends_plan_then_tasks_then_done():
+    client = TestClient(backend_api.app)
+    body = {"tasks": ["a", "b", "c"], "mood_label": "joy", "start_time": "09:00", "task_interval": 30,
+            "user_id": "sse"}
+    response = client.post("/execute/stream", json=body)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = _frames(response.text)
+    assert [f[0] for f in frames] == ["plan", "task", "task", "task", "done"]
+    assert frames[0][1]["emotion"] == "joy" and frames[0][1]["total"] == 3
+    tasks = [f[1] for f in frames[1:4]]
+    assert [t["task"] for t in tasks] == ["a", "b", "c"]
+    assert [t["time"] for t in tasks] == ["09:00 AM", "09:30 AM", "10:00 AM"]
+    assert [f[2] for f in frames[1:4]] == ["0", "1", "2"]
+    assert frames[-1][1] == {"total": 3, "completed": sum("Completed" in t["status"] for t in tasks)}
+    shutdown_default_writer()  # flush the write-behind queue
+    saved = client.get("/tasks", params={"user_id": "sse"}).json()["tasks"]
+    assert sorted((t["task"], t["status"]) for t in saved) == sorted((t["task"], t["status"]) for t in tasks)
+
+
+def test_execute_stream_rejects_bad_input_before_streaming():
+    client = TestClient(backend_api.app)
+    assert client.post("/execute/stream", json={"tasks": []}).status_code == 400
+    assert client.post("/execute/stream", json={"tasks": ["a"], "start_time": "25:99"}).status_code == 400
@@ -0,0 +1,65 @@
+# test_bulk.py
+import json
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend_api
+import schedule_build
+
+
+def _line(i, **extra):
+    return json.dumps({"tasks": [{"name": f"t{i}", "minutes": 30}], "date": "2025-01-06",
+                       "user_id": f"u{i}", **extra}).encode() + b"\n"
+
+
+def _post(client, parts):
+    r = client.post("/generate_schedule/bulk", content=iter(parts),
+                    headers={"Content-Type": "application/x-ndjson"})
+    return r, [json.loads(line) for line in r.text.splitlines()] if r.status_code == 200 else None
+
+
+@pytest.fixture
+def client():
+    with TestClient(backend_api.app) as c:
+        yield c
+
+
+def test_lines_split_across_body_chunks(client):
+    body = b"".join(_line(i) for i in range(5)) + b"\n" + _line(5, days=0)
+    parts = [body[k:k + 7] for k in range(0, len(body), 7)]
+    r, records = _post(client, parts)
+    assert r.status_code == 200
+    by_index = {rec["index"]: rec for rec in records}
+    assert sorted(by_index) == list(range(6))
+    assert all(by_index[i]["events"][0]["title"] == f"t{i}" for i in range(5))
+    assert "error" in by_index[5]
+
+
+def test_long_line_before_any_result_is_413(client, monkeypatch):
+    monkeypatch.setattr(backend_api, "_BULK_MAX_LINE", 100)
+    r, _ = _post(client, [_line(0, mood_label="x" * 200)])
+    assert r.status_code == 413
+    r, _ = _post(client, [b"{" + b" " * 150])  # no newline yet, already too long
+    assert r.status_code == 413
+
+
+def test_long_line_after_results_ends_the_stream_with_an_error(client, monkeypatch):
+    monkeypatch.setattr(backend_api, "_BULK_MAX_LINE", 200)
+    monkeypatch.setattr(backend_api, "_BULK_CHUNK", 1)
+    monkeypatch.setattr(backend_api, "_BULK_IN_FLIGHT", 1)
+    r, records = _post(client, [_line(0), _line(1), _line(2, mood_label="x" * 300), _line(3)])
+    assert r.status_code == 200
+    assert [rec["index"] for rec in records[:2]] == [0, 1] and "events" in records[1]
+    assert records[-1]["index"] == 2 and "longer than" in records[-1]["error"]
+
+
+def test_bulk_workers_stay_light():
+    # what a spawned worker imports to unpickle schedule_chunk
+    heavy = {"torch", "transformers", "pandas", "emotion_engine", "agents", "rag_index", "tools", "fastapi"}
+    code = "import sys, schedule_build; print(sorted(set(sys.modules) & %r))" % heavy
+    import subprocess
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=schedule_build.__file__.rsplit("/", 1)[0]).stdout.strip()
+    assert out == "[]"
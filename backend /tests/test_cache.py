@@ -0,0 +1,47 @@
+# test_cache.py
+from cache import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "b" is now the oldest
+    c.set("c", 3)
+    assert c.get("b") is None and c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = _Clock()
+    c = TTLCache(maxsize=10, ttl=5, clock=clock)
+    c.set("a", 1)
+    clock.now = 4.9
+    assert c.get("a") == 1
+    clock.now = 5.0
+    assert c.get("a", "gone") == "gone"
+    assert c.stats()["expirations"] == 1 and len(c) == 0
+
+
+def test_pop_hands_an_entry_out_once():
+    clock = _Clock()
+    c = TTLCache(maxsize=10, ttl=5, clock=clock)
+    c.set("a", 1)
+    assert c.pop("a") == 1 and c.pop("a") is None
+    c.set("b", 2)
+    clock.now = 6
+    assert c.pop("b", "expired") == "expired"
+
+
+def test_zero_size_disables_caching():
+    c = TTLCache(maxsize=0)
+    c.set("a", 1)
+    assert c.get("a") is None
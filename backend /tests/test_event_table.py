@@ -0,0 +1,38 @@
+# test_event_table.py
+import datetime as dt
+import json
+
+import pytest
+
+from core import make_events
+from event_table import EventTable
+
+
+def _reference(tasks, start, gap):
+    # the plain per-event loop the table replaces
+    out, at = [], start
+    for i, t in enumerate(tasks):
+        end = at + dt.timedelta(minutes=t["Duration (mins)"])
+        out.append({"id": str(i), "title": t["Task"], "start": at.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "end": end.strftime("%Y-%m-%dT%H:%M:%S")})
+        at = end + dt.timedelta(minutes=gap)
+    return out
+
+
+def test_view_matches_the_per_event_loop():
+    tasks = [{"Task": f"t{i}", "Duration (mins)": 25 + i * 7} for i in range(50)]
+    start = dt.datetime(2025, 3, 30, 22, 15, 42)  # crosses midnight, keeps seconds
+    view = make_events(tasks, start, 10)
+    want = _reference(tasks, start, 10)
+    assert view.to_list() == want and list(view) == want and view == want
+    assert view[0] == want[0] and view[-1] == want[-1] and view[10:13] == want[10:13] and view[::7] == want[::7]
+    with pytest.raises(IndexError):
+        view[50]
+
+
+def test_view_serializes_through_the_api_encoder():
+    import backend_api
+
+    view = EventTable(["a"], [0], [30]).events
+    assert json.loads(backend_api._dumps({"events": view})) == {
+        "events": [{"title": "a", "start": "1970-01-01T00:00:00", "end": "1970-01-01T00:30:00"}]}
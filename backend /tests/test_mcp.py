@@ -0,0 +1,39 @@
+# test_mcp.py
+import asyncio
+import time
+
+from mcp import Orchestrator, Step
+
+
+def _run(steps):
+    return asyncio.run(Orchestrator(steps).run())
+
+
+def test_independent_steps_overlap_and_dependents_see_results():
+    def slow(_):
+        time.sleep(0.2)
+        return 1
+
+    t0 = time.perf_counter()
+    run = _run([Step("a", slow), Step("b", slow), Step("c", lambda r: r["a"] + r["b"], deps=["a", "b"])])
+    assert run["results"]["c"] == 2
+    assert time.perf_counter() - t0 < 0.35
+
+
+def test_step_timeout_bounds_latency():
+    # the stuck step keeps its thread, but neither the run nor asyncio.run waits for it
+    t0 = time.perf_counter()
+    run = _run([Step("stuck", lambda _: time.sleep(1.5), timeout=0.2), Step("after", lambda r: 1, deps=["stuck"])])
+    assert time.perf_counter() - t0 < 1.0
+    assert run["errors"]["stuck"].startswith("timed out")
+    assert run["errors"]["after"].startswith("skipped")
+
+
+def test_failure_skips_only_dependents():
+    def boom(_):
+        raise RuntimeError("no")
+
+    run = _run([Step("bad", boom), Step("dep", lambda r: 1, deps=["bad"]), Step("other", lambda r: 2)])
+    assert run["results"]["other"] == 2
+    assert "RuntimeError" in run["errors"]["bad"]
+    assert "dep" in run["errors"] and "dep" not in run["results"]
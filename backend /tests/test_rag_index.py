@@ -0,0 +1,79 @@
+# test_rag_index.py
+import multiprocessing as mp
+import sys
+
+import pytest
+
+from rag_index import VectorIndex
+
+
+def _texts(n, tag):
+    return [f"{tag} task {i} about topic{i % 37} in area{i % 11}" for i in range(n)]
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = VectorIndex(str(tmp_path / "rag"), train_at=10 ** 9)  # trained explicitly where a test needs it
+    yield idx
+    idx.close()
+
+
+def test_search_is_scoped_to_one_user(index):
+    index.add(["finish the quarterly report"], kind="task", user_id="alice")
+    index.add(["finish the quarterly report draft"], kind="task", user_id="bob")
+    index.add(["finish the report"], kind="task")
+    assert [r["user_id"] for r in index.search("quarterly report", user_id="alice")] == ["alice"]
+    assert [r["user_id"] for r in index.search("quarterly report")] == [None]  # anonymous rows only
+    assert len(index.search("quarterly report", any_user=True)) == 3
+    assert index.search("quarterly report", kind="advice", user_id="alice") == []
+
+
+def test_trained_index_still_finds_exact_matches(index):
+    texts = _texts(3000, "bulk")
+    index.add(texts, kind="task")
+    index.train(iterations=4)
+    index._group()
+    assert index.nlist > 0
+    for i in (0, 1234, 2999):
+        assert index.search(texts[i], k=1, nprobe=index.nlist)[0]["text"] == texts[i]
+
+
+def test_rows_survive_reopening(tmp_path):
+    path = str(tmp_path / "rag")
+    first = VectorIndex(path)
+    first.add(_texts(50, "kept"), user_id="u")
+    first.close()
+    again = VectorIndex(path)
+    try:
+        assert len(again) == 50
+        assert again.search("kept task 7 about topic7 in area7", k=1, user_id="u")[0]["id"] == 7
+    finally:
+        again.close()
+
+
+def _writer(path, tag, n):
+    idx = VectorIndex(path)
+    for k in range(0, n, 50):
+        idx.add(_texts(n, tag)[k:k + 50], user_id=tag)
+    idx.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="writers share the index through flock")
+def test_writer_processes_do_not_lose_rows(tmp_path):
+    path = str(tmp_path / "rag")
+    VectorIndex(path).close()
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_writer, args=(path, tag, 400)) for tag in ("p1", "p2")]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    idx = VectorIndex(path)
+    try:
+        assert len(idx) == 800
+        for tag in ("p1", "p2"):
+            hit = idx.search(f"{tag} task 399 about topic29 in area3", k=1, user_id=tag)
+            assert hit and hit[0]["text"] == f"{tag} task 399 about topic29 in area3"
+    finally:
+        idx.close()
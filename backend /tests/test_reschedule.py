@@ -0,0 +1,51 @@
+# test_reschedule.py
+import pytest
+
+from reschedule import ScheduleIndex, apply_diff, apply_edit
+
+
+def _plain():
+    # no ids: they are named by position when indexed
+    return [{"title": t, "start": f"2025-01-06T{9 + i:02d}:00:00", "end": f"2025-01-06T{9 + i:02d}:30:00"}
+            for i, t in enumerate("abcd")]
+
+
+def test_move_ripples_only_until_the_first_event_that_clears():
+    diff = apply_edit(_plain(), {"op": "move", "index": 0, "start": "2025-01-06T09:45:00"})
+    assert [(c["title"], c["start"]) for c in diff["changed"]] == [("a", "2025-01-06T09:45:00"),
+                                                                  ("b", "2025-01-06T10:15:00")]
+
+
+def test_compact_delete_pulls_the_back_to_back_chain_forward():
+    events = [{"id": "0", "title": "a", "start": "2025-01-06T09:00:00", "end": "2025-01-06T09:30:00"},
+              {"id": "1", "title": "b", "start": "2025-01-06T09:30:00", "end": "2025-01-06T10:00:00"},
+              {"id": "2", "title": "c", "start": "2025-01-06T10:00:00", "end": "2025-01-06T10:30:00"}]
+    diff = apply_edit(events, {"op": "delete", "id": "0"}, compact=True)
+    assert diff["removed"] == ["0"]
+    assert [(c["id"], c["start"]) for c in diff["changed"]] == [("1", "2025-01-06T09:00:00"),
+                                                               ("2", "2025-01-06T09:30:00")]
+
+
+def test_positional_ids_stay_with_their_events_across_commits():
+    idx = ScheduleIndex(_plain())
+    idx.commit(apply_edit(idx, {"op": "delete", "index": 0}))
+    diff = apply_edit(idx, {"op": "move", "id": "3", "start": "2025-01-06T08:00:00"})
+    assert [c["title"] for c in diff["changed"]] == ["d"]
+    idx.commit(diff)
+    assert [(e["id"], e["title"]) for e in idx.events] == [("3", "d"), ("1", "b"), ("2", "c")]
+
+
+def test_times_with_offsets_compare_as_instants():
+    events = [{"id": "x", "title": "x", "start": "2025-01-06T09:00:00Z", "end": "2025-01-06T10:00:00Z"}]
+    # the same instant written with another offset overlaps, so x is pushed behind the new event
+    diff = apply_edit(events, {"op": "insert", "id": "n", "title": "n",
+                               "start": "2025-01-06T10:30:00+01:00", "duration": 30})
+    assert [c["id"] for c in diff["changed"]] == ["x"]
+
+
+def test_insert_rejects_a_duplicate_id_and_apply_diff_keeps_order():
+    events = _plain()
+    with pytest.raises(ValueError):
+        apply_edit(events, {"op": "insert", "id": "1", "title": "dup", "start": "2025-01-06T15:00:00"})
+    diff = apply_edit(events, {"op": "insert", "id": "n", "title": "n", "start": "2025-01-06T08:00:00"})
+    assert [e["title"] for e in apply_diff(events, diff)] == ["n", "a", "b", "c", "d"]
@@ -0,0 +1,70 @@
+# test_scheduler.py
+import datetime as dt
+import time
+
+from optimizer import optimize_order
+from scheduler import parse_when, schedule_tasks
+
+START = dt.datetime(2025, 1, 6, 9, 0)
+
+
+def _tasks():
+    return [{"Task": "A", "Duration (mins)": 60},
+            {"Task": "B", "Duration (mins)": 30},
+            {"Task": "C", "Duration (mins)": 120, "Deadline": dt.datetime(2025, 1, 6, 12, 0)}]
+
+
+def test_deadline_tasks_go_first_by_default():
+    events = schedule_tasks(_tasks(), START, 10)["events"]
+    assert [e["title"] for e in events] == ["C", "A", "B"]
+
+
+def test_keep_order_places_the_optimized_order():
+    info = {}
+    order = optimize_order(_tasks(), "joy", START, 10, budget_ms=1000, info=info)
+    assert info["optimized"]
+    events = schedule_tasks(order, START, 10, keep_order=True)["events"]
+    assert [e["title"] for e in events] == [t["Task"] for t in order]
+
+
+def test_optimizer_budget_covers_model_setup():
+    tasks = [{"Task": f"t{i}", "Duration (mins)": 5 + i % 90, "Category": "abc"[i % 3]} for i in range(100000)]
+    info = {}
+    t0 = time.perf_counter()
+    order = optimize_order(tasks, "joy", START, 10, budget_ms=20, info=info)
+    assert (time.perf_counter() - t0) * 1000 < 80
+    assert not info["optimized"] and order == tasks
+
+
+def test_tasks_fill_around_busy_blocks():
+    busy = [(dt.datetime(2025, 1, 6, 9, 30), dt.datetime(2025, 1, 6, 10, 0))]
+    tasks = [{"Task": "long", "Duration (mins)": 60}, {"Task": "short", "Duration (mins)": 20}]
+    events = schedule_tasks(tasks, START, 0, busy=busy)["events"]
+    # first fit: "long" skips the 30-minute gap before the meeting, "short" takes it
+    assert [(e["title"], e["start"]) for e in events] == [("short", "2025-01-06T09:00:00"),
+                                                         ("long", "2025-01-06T10:00:00")]
+
+
+def test_overflow_spills_to_the_next_day_or_is_reported():
+    tasks = [{"Task": f"t{i}", "Duration (mins)": 60} for i in range(3)]
+    late = dt.datetime(2025, 1, 6, 21, 0)
+    one_day = schedule_tasks(tasks, late, 0, days=1)
+    assert [e["title"] for e in one_day["events"]] == ["t0", "t1"]
+    assert [u["title"] for u in one_day["unscheduled"]] == ["t2"]
+    two_days = schedule_tasks(tasks, late, 0, days=2, day_start=dt.time(8, 0))
+    assert two_days["events"][-1]["start"] == "2025-01-07T08:00:00" and not two_days["unscheduled"]
+
+
+def test_a_task_that_cannot_meet_its_deadline_is_unscheduled():
+    tasks = [{"Task": "blocker", "Duration (mins)": 120, "Deadline": dt.datetime(2025, 1, 6, 11, 0)},
+             {"Task": "late", "Duration (mins)": 60, "Deadline": dt.datetime(2025, 1, 6, 11, 30)}]
+    placed = schedule_tasks(tasks, START, 0)
+    assert [e["title"] for e in placed["events"]] == ["blocker"]
+    assert placed["unscheduled"] == [{"title": "late", "duration": 60, "reason": "cannot finish before deadline"}]
+
+
+def test_offsets_are_converted_not_dropped():
+    day = dt.date(2025, 1, 6)
+    utc = parse_when("2025-01-06T08:00:00Z", day)
+    assert utc == parse_when("2025-01-06T10:00:00+02:00", day)
+    assert utc == dt.datetime(2025, 1, 6, 8, 0, tzinfo=dt.timezone.utc).astimezone().replace(tzinfo=None)
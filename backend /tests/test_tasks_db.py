@@ -0,0 +1,57 @@
+# test_tasks_db.py
+import sqlite3
+
+import task_queries
+import tasks_db
+
+
+def _db(tmp_path):
+    return str(tmp_path / "t.db")
+
+
+def test_counts_follow_inserts_updates_and_deletes(tmp_path):
+    path = _db(tmp_path)
+    tasks_db.save_tasks([("a", "joy", "✅ Completed", "u1"), ("b", "joy", "🔜 Pending", "u1"),
+                         ("c", "sadness", "✅ Completed", "u2")], path=path)
+    tasks_db.save_task("d", "joy", "✅ Completed", "u2", path=path)
+    assert task_queries.completion_stats(path=path) == {"joy": {"total": 3, "completed": 2},
+                                                        "sadness": {"total": 1, "completed": 1}}
+    conn = tasks_db.connect(path)
+    with conn:
+        conn.execute("UPDATE tasks SET status = '✅ Completed' WHERE task = 'b'")
+        conn.execute("DELETE FROM tasks WHERE task = 'c'")
+    assert task_queries.completion_stats(path=path) == {"joy": {"total": 3, "completed": 3}}
+    assert task_queries.completion_stats("u1", path=path) == {"joy": {"total": 2, "completed": 2}}
+
+
+def test_filters_and_pages_newest_first(tmp_path):
+    path = _db(tmp_path)
+    rows = [{"task": f"t{i}", "emotion": ("joy", "fear")[i % 2], "status": ("done", "todo", "later")[i % 3],
+             "user_id": f"u{i % 4}", "created_at": 1000 + i} for i in range(120)]
+    tasks_db.save_tasks(rows, path=path)
+    for kw in ({}, {"user_id": "u1"}, {"emotion": "fear"}, {"status": "todo"},
+               {"emotion": "joy", "status": "later"}, {"user_id": "u2", "emotion": "joy", "status": "done"}):
+        want = [r["task"] for r in reversed(rows) if all(r[k] == v for k, v in kw.items())]
+        got, cursor = [], None
+        while True:
+            page = task_queries.history(limit=7, cursor=cursor, path=path, **kw)
+            got += [t["task"] for t in page["tasks"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert got == want, kw
+
+
+def test_version_1_file_is_migrated_with_its_counts(tmp_path):
+    path = _db(tmp_path)
+    conn = sqlite3.connect(path)
+    conn.execute(tasks_db.SCHEMA)
+    conn.executemany("INSERT INTO tasks (task, emotion, status) VALUES (?, ?, ?)",
+                     [("old", "joy", "✅ Completed"), ("older", "anger", "🔜 Pending")])
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+    conn.close()
+    assert tasks_db.connect(path).execute("PRAGMA user_version").fetchone()[0] == tasks_db.SCHEMA_VERSION
+    assert task_queries.completion_stats(path=path) == {"joy": {"total": 1, "completed": 1},
+                                                        "anger": {"total": 1, "completed": 0}}
+    assert [t["task"] for t in task_queries.find_tasks(path=path)] == ["older", "old"]
@@ -0,0 +1,106 @@
+# test_tools.py
+import asyncio
+import time
+
+import pytest
+
+from fake_tools import FakeToolServer
+from tools import ToolAgent, ToolError
+
+
+def _agent(url, **kw):
+    agent = ToolAgent(**{"timeout": 2.0, "backoff": 0.001, **kw})
+    agent.connect_tools(["calendar_api", "reminder_bot"], urls={"calendar_api": url})
+    return agent
+
+
+@pytest.fixture
+def server():
+    fake = FakeToolServer()
+    fake.start()
+    yield fake
+    fake.stop()
+
+
+def test_unconfigured_tool_is_reported_not_called(server, monkeypatch):
+    monkeypatch.delenv("MINDSYNC_REMINDER_BOT_URL", raising=False)
+    agent = _agent(server.url)
+    try:
+        assert agent.status() == {"calendar_api": "Connected", "reminder_bot": "Not configured"}
+        with pytest.raises(ToolError):
+            agent.invoke("reminder_bot", "GET", "/reminders")
+    finally:
+        agent.close()
+
+
+def test_gets_are_cached_and_posts_are_not(server):
+    agent = _agent(server.url)
+    try:
+        assert agent.invoke("calendar_api", "GET", "/events") == {"events": []}
+        assert agent.invoke("calendar_api", "GET", "/events") == {"events": []}
+        assert server.state.requests == 1
+        agent.invoke("calendar_api", "POST", "/events", body={"title": "a", "start": "s"})
+        agent.invoke("calendar_api", "POST", "/events", body={"title": "a", "start": "s"})
+        assert len(server.state.items["events"]) == 2
+    finally:
+        agent.close()
+
+
+def test_only_idempotent_calls_are_retried():
+    with FakeToolServer(fail_rate=1.0) as url:
+        agent = _agent(url, retries=2, cache_size=0)
+        try:
+            with pytest.raises(ToolError) as err:
+                agent.invoke("calendar_api", "GET", "/events")
+            assert err.value.status == 503
+            assert agent.stats()["tools"]["calendar_api"]["retries"] == 2
+            with pytest.raises(ToolError):
+                agent.invoke("calendar_api", "POST", "/events", body={"title": "a", "start": "s"})
+            assert agent.stats()["tools"]["calendar_api"]["retries"] == 2  # the create was sent once
+        finally:
+            agent.close()
+
+
+def test_idempotency_key_makes_a_resent_create_safe(server):
+    agent = _agent(server.url, cache_size=0)
+    call = {"tool": "calendar_api", "method": "POST", "path": "/events", "body": {"title": "a", "start": "s"},
+            "headers": {"Idempotency-Key": "k1"}, "idempotent": True}
+    try:
+        first, again = agent.invoke_many([call, call])
+        assert first["id"] == again["id"]
+        assert len(server.state.items["events"]) == 1
+    finally:
+        agent.close()
+
+
+def test_call_many_overlaps_calls_and_keeps_failures_in_place():
+    with FakeToolServer(latency_ms=200) as url:
+        agent = _agent(url, cache_size=0)
+        try:
+            calls = [{"tool": "calendar_api", "path": "/events", "params": {"n": i}} for i in range(6)]
+            calls.insert(3, {"tool": "calendar_api", "path": "/nowhere"})
+            t0 = time.perf_counter()
+            results = asyncio.run(agent.call_many(calls))
+            assert time.perf_counter() - t0 < 0.8  # 7 calls of 200 ms each, sent together
+            assert isinstance(results[3], ToolError) and results[3].status == 404
+            assert all(r == {"events": []} for i, r in enumerate(results) if i != 3)
+        finally:
+            agent.close()
+
+
+def test_plan_tool_call_keys_are_scoped_to_the_owner(server):
+    from planner import plan_tool_calls
+
+    agent = _agent(server.url)
+    plan = {"plan": [{"time": "09:00 AM", "task": "write report", "priority": "High"}]}
+    try:
+        key = lambda **kw: plan_tool_calls(plan, agent, day="2026-01-05", **kw)[0]["headers"]["Idempotency-Key"]
+        assert key(user_id="alice") == key(user_id="alice")
+        assert key(user_id="alice") != key(user_id="bob")
+        assert key(session_id="s1") == key(session_id="s1")
+        assert key() != key()  # anonymous plans never share keys
+        for user in ("alice", "bob"):
+            agent.invoke_many(plan_tool_calls(plan, agent, user_id=user, day="2026-01-05"))
+        assert len(server.state.items["events"]) == 2
+    finally:
+        agent.close()
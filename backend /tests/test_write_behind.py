@@ -0,0 +1,49 @@
+# test_write_behind.py
+import threading
+import time
+
+import pytest
+
+from write_behind import WriteBehind
+
+
+def _writer(release, written):
+    def save(rows, path=None):
+        release.wait(5)
+        written.extend(rows)
+        return len(rows)
+    return {"t": save}
+
+
+def test_rows_are_written_in_batches():
+    written = []
+    release = threading.Event()
+    release.set()
+    w = WriteBehind(batch_size=10, flush_ms=20, writers=_writer(release, written)).start()
+    assert w.submit_many("t", range(25)) == 25
+    w.stop()
+    assert sorted(written) == list(range(25))
+    assert w.stats()["flushes"] >= 3
+
+
+def test_submit_many_waits_once_for_the_whole_batch():
+    written = []
+    release = threading.Event()  # the writer is stuck until released
+    w = WriteBehind(max_queue=5, batch_size=1, flush_ms=0, put_timeout=0.2,
+                    writers=_writer(release, written)).start()
+    t0 = time.perf_counter()
+    queued = w.submit_many("t", range(30))
+    elapsed = time.perf_counter() - t0
+    release.set()
+    w.stop()
+    assert elapsed < 0.5  # one put_timeout, not 0.2 s per row
+    stats = w.stats()
+    assert stats["submitted"] == queued and stats["dropped"] == 30 - queued
+    assert 5 <= queued <= 6
+    assert len(written) == queued
+
+
+def test_unknown_table_is_rejected():
+    w = WriteBehind(writers={"t": lambda rows, path=None: len(rows)})
+    with pytest.raises(KeyError):
+        w.submit("nope", 1)
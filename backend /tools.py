@@ -1,11 +1,267 @@
 # tools.py
+"""
+Async runtime for external tools (calendar_api, reminder_bot, ...).
+
+One ToolAgent serves every request. It runs its own event loop on a
+background thread, and each connected tool gets one httpx.AsyncClient (a
+keep-alive connection pool) plus a semaphore capping its calls in flight.
+A call:
+
+  * is answered from a TTLCache when it is idempotent and the same request
+    was answered within `cache_ttl` seconds;
+  * times out after `timeout` seconds;
+  * is retried with exponential backoff and jitter after connection errors,
+    timeouts, 429 and 5xx, but only when idempotent, so a create is never
+    sent twice unless the caller made it safe (e.g. an Idempotency-Key).
+
+GET and HEAD are idempotent by default; pass idempotent=True for others.
+call()/call_many() are coroutines usable from any event loop, and
+invoke()/invoke_many() block for sync callers. call_many() runs its calls
+concurrently, so a batch costs about as much as its slowest call.
+
+A tool's base URL is MINDSYNC_<TOOL>_URL (e.g. MINDSYNC_CALENDAR_API_URL).
+Tools without one are reported as "Not configured" and never called.
+fake_tools.py serves a local calendar/reminder API to point them at.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from cache import TTLCache
+
+_MISS = object()
+
+
+class ToolError(Exception):
+    """A tool call that failed for good (after any retries)."""
+    def __init__(self, tool: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{tool}: {message}")
+        self.tool = tool
+        self.status = status
+
+
+def _httpx():
+    try:
+        import httpx
+    except ImportError as e:
+        raise RuntimeError("tool calls need `pip install httpx`") from e
+    return httpx
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class _Tool:
+    """Per-tool connection pool, concurrency cap and counters (touched only on the agent's loop)."""
+    def __init__(self, name: str, base_url: str, max_concurrency: int):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.client = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.in_flight = 0
+        self.ms_total = 0.0
+        self.ms_max = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        sent = self.calls - self.cache_hits
+        return {
+            "base_url": self.base_url,
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "ms_avg": round(self.ms_total / sent, 3) if sent else 0.0,
+            "ms_max": round(self.ms_max, 3),
+        }
+
+
 class ToolAgent:
-    def __init__(self):
-        self.connected_tools = {}
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 retries: Optional[int] = None, backoff: Optional[float] = None,
+                 cache_size: Optional[int] = None, cache_ttl: Optional[float] = None):
+        env = os.getenv
+        self.max_concurrency = max_concurrency or int(env("MINDSYNC_TOOL_MAX_CONCURRENCY", "8"))
+        self.timeout = timeout or float(env("MINDSYNC_TOOL_TIMEOUT_S", "5"))
+        self.retries = retries if retries is not None else int(env("MINDSYNC_TOOL_RETRIES", "2"))
+        self.backoff = backoff if backoff is not None else float(env("MINDSYNC_TOOL_BACKOFF_MS", "100")) / 1000.0
+        self.cache = TTLCache(cache_size if cache_size is not None else int(env("MINDSYNC_TOOL_CACHE_SIZE", "1024")),
+                              cache_ttl if cache_ttl is not None else float(env("MINDSYNC_TOOL_CACHE_TTL", "60")))
+        self.connected_tools: Dict[str, str] = {}
+        self._tools: Dict[str, _Tool] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ---------- lifecycle ----------
+    def connect_tools(self, tools: Iterable[str], urls: Optional[Dict[str, str]] = None):
+        """Register tools by name; URLs come from `urls` or MINDSYNC_<TOOL>_URL."""
+        urls = urls or {}
+        for name in tools:
+            url = urls.get(name) or os.getenv(f"MINDSYNC_{name.upper()}_URL")
+            if not url:
+                self.connected_tools[name] = "Not configured"
+                continue
+            _httpx()
+            self._tools[name] = _Tool(name, url, self.max_concurrency)
+            self.connected_tools[name] = "Connected"
+        if self._tools:
+            self._start_loop()
+
+    def connected(self, name: str) -> bool:
+        return name in self._tools
+
+    def _start_loop(self) -> None:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="mindsync-tools", daemon=True)
+                self._thread.start()
+                self._loop = loop
 
-    def connect_tools(self, tools):
-        for t in tools:
-            self.connected_tools[t] = "Connected"
+    def close(self) -> None:
+        """Close every connection pool and stop the loop thread."""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_clients(), loop).result(self.timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(self.timeout)
+        loop.close()
+
+    async def _close_clients(self) -> None:
+        for tool in self._tools.values():
+            client, tool.client = tool.client, None
+            if client is not None:
+                await client.aclose()
 
     def status(self):
         return self.connected_tools
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tools": {name: tool.stats() for name, tool in self._tools.items()}, "cache": self.cache.stats()}
+
+    # ---------- calls ----------
+    async def _on_loop(self, coro):
+        """Await `coro` on the agent's loop from whatever loop the caller runs on."""
+        if self._loop is None:
+            coro.close()
+            raise RuntimeError("no tools connected")
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def _blocking(self, coro):
+        if self._loop is None:
+            coro.close()
+            raise RuntimeError("no tools connected")
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("invoke() called from the tool loop; await call() instead")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def call(self, tool: str, method: str = "GET", path: str = "/", params: Optional[Dict] = None,
+                   body: Any = None, headers: Optional[Dict[str, str]] = None, idempotent: Optional[bool] = None):
+        """One tool call; returns the decoded JSON response (None for an empty body)."""
+        return await self._on_loop(self._call(tool, method, path, params, body, headers, idempotent))
+
+    async def call_many(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run `calls` (dicts of call() arguments) concurrently. Results come back
+        in order; a call that failed is returned as its ToolError.
+        """
+        return await self._on_loop(self._call_many(calls))
+
+    def invoke(self, tool: str, method: str = "GET", path: str = "/", params: Optional[Dict] = None,
+               body: Any = None, headers: Optional[Dict[str, str]] = None, idempotent: Optional[bool] = None):
+        """Blocking call() for sync code."""
+        return self._blocking(self._call(tool, method, path, params, body, headers, idempotent))
+
+    def invoke_many(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """Blocking call_many() for sync code."""
+        return self._blocking(self._call_many(calls))
+
+    async def _call_many(self, calls):
+        results = await asyncio.gather(*(self._call(**c) for c in calls), return_exceptions=True)
+        return [r if not isinstance(r, Exception) or isinstance(r, ToolError)
+                else ToolError(c.get("tool", "?"), f"{type(r).__name__}: {r}") for c, r in zip(calls, results)]
+
+    def _client(self, tool: _Tool):
+        if tool.client is None:
+            httpx = _httpx()
+            tool.client = httpx.AsyncClient(
+                base_url=tool.base_url, timeout=self.timeout,
+                limits=httpx.Limits(max_connections=tool.max_concurrency,
+                                    max_keepalive_connections=tool.max_concurrency))
+            tool.semaphore = asyncio.Semaphore(tool.max_concurrency)
+        return tool.client
+
+    async def _call(self, tool, method="GET", path="/", params=None, body=None, headers=None, idempotent=None):
+        spec = self._tools.get(tool)
+        if spec is None:
+            raise ToolError(tool, "not connected")
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in ("GET", "HEAD")
+        spec.calls += 1
+        key = None
+        if idempotent:
+            key = (tool, method, path, _canonical(params), _canonical(body), _canonical(headers))
+            cached = self.cache.get(key, _MISS)
+            if cached is not _MISS:
+                spec.cache_hits += 1
+                return cached
+
+        httpx = _httpx()
+        client = self._client(spec)
+        attempts = 1 + (self.retries if idempotent else 0)
+        error = None
+        for attempt in range(attempts):
+            if attempt:
+                spec.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            async with spec.semaphore:
+                spec.in_flight += 1
+                t0 = time.perf_counter()
+                try:
+                    response = await client.request(method, path, params=params, json=body, headers=headers)
+                except httpx.TimeoutException:
+                    error = ToolError(tool, f"timed out after {self.timeout}s")
+                    continue
+                except httpx.TransportError as e:
+                    error = ToolError(tool, f"{type(e).__name__}: {e}")
+                    continue
+                finally:
+                    ms = (time.perf_counter() - t0) * 1000.0
+                    spec.in_flight -= 1
+                    spec.ms_total += ms
+                    spec.ms_max = max(spec.ms_max, ms)
+            status = response.status_code
+            if status == 429 or status >= 500:
+                error = ToolError(tool, f"HTTP {status}", status)
+                continue
+            if status >= 400:
+                spec.errors += 1
+                raise ToolError(tool, f"HTTP {status}: {response.text[:200]}", status)
+            result = response.json() if response.content else None
+            if key is not None:
+                self.cache.set(key, result)
+            return result
+        spec.errors += 1
+        raise error
@@ -0,0 +1,214 @@
+# write_behind.py
+"""
+Write-behind persistence for tasks_db.
+
+Request handlers and agents hand rows to a WriteBehind and return at once;
+a background thread groups them by table and writes each group with one
+executemany transaction. A batch is flushed when it reaches `batch_size`
+rows or `flush_ms` after its first row arrived, whichever comes first.
+
+The queue is bounded. When it is full, submit() blocks for up to
+`put_timeout` seconds (backpressure on the producers) and then drops the
+row and counts it, so a stuck disk cannot stall the API forever;
+submit_many() waits at most `put_timeout` for the whole batch, not per row.
+stop() writes everything still queued before it returns.
+
+default_writer() is the process-wide instance (tasks_db path, env-tuned);
+it starts on first use and is flushed at interpreter exit.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import tasks_db
+
+WRITERS: Dict[str, Callable[..., int]] = {
+    "tasks": tasks_db.save_tasks,
+    "moods": tasks_db.save_moods,
+    "schedules": tasks_db.save_schedules,
+}
+
+_STOP = object()
+
+
+class WriteBehind:
+    """Bounded queue of (table, row) drained by one writer thread in batches."""
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 500, flush_ms: float = 200.0,
+                 put_timeout: float = 1.0, path: Optional[str] = None,
+                 writers: Optional[Dict[str, Callable[..., int]]] = None):
+        self.batch_size = max(1, batch_size)
+        self.flush_s = max(0.0, flush_ms) / 1000.0
+        self.put_timeout = put_timeout
+        self.path = path
+        self.writers = writers or WRITERS
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._written = 0
+        self._dropped = 0
+        self._blocked = 0
+        self._flushes = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        self._flush_ms_total = 0.0
+        self._flush_ms_max = 0.0
+        self._flush_ms_last = 0.0
+
+    # ---------- lifecycle ----------
+    def start(self) -> "WriteBehind":
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mindsync-write-behind", daemon=True)
+                self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Flush everything queued so far, then stop the writer thread."""
+        with self._start_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            self._thread = None
+
+    # ---------- producers ----------
+    def submit(self, table: str, row: Any) -> bool:
+        """Queue one row; False if it was dropped because the queue stayed full."""
+        return self.submit_many(table, (row,)) == 1
+
+    def submit_many(self, table: str, rows: Iterable[Any]) -> int:
+        """
+        Queue rows; returns how many were queued. The rows share one
+        `put_timeout`: once it has run out, rows that do not fit at once are dropped.
+        """
+        if table not in self.writers:
+            raise KeyError(f"no writer for table {table!r}")
+        if not self.running:
+            self.start()
+        deadline = None
+        queued = blocked = dropped = 0
+        for row in rows:
+            try:
+                self._queue.put_nowait((table, row))
+                queued += 1
+                continue
+            except queue.Full:
+                pass
+            blocked += 1
+            if deadline is None:
+                deadline = time.monotonic() + self.put_timeout
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Full
+                self._queue.put((table, row), timeout=remaining)
+                queued += 1
+            except queue.Full:
+                dropped += 1
+        with self._stats_lock:
+            self._submitted += queued
+            self._blocked += blocked
+            self._dropped += dropped
+        return queued
+
+    # ---------- writer thread ----------
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch: List[Tuple[str, Any]] = [item]
+            deadline = time.monotonic() + self.flush_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[str, Any]]) -> None:
+        by_table: Dict[str, List[Any]] = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        t0 = time.perf_counter()
+        written = 0
+        for table, rows in by_table.items():
+            try:
+                written += self.writers[table](rows, path=self.path)
+            except Exception as e:
+                with self._stats_lock:
+                    self._errors += 1
+                    self._last_error = f"{table}: {type(e).__name__}: {e}"
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._stats_lock:
+            self._written += written
+            self._flushes += 1
+            self._flush_ms_last = ms
+            self._flush_ms_total += ms
+            self._flush_ms_max = max(self._flush_ms_max, ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "queue_max": self._queue.maxsize,
+                "submitted": self._submitted,
+                "written": self._written,
+                "dropped": self._dropped,
+                "blocked": self._blocked,
+                "flushes": self._flushes,
+                "errors": self._errors,
+                "last_error": self._last_error,
+                "flush_ms_last": round(self._flush_ms_last, 3),
+                "flush_ms_avg": round(self._flush_ms_total / self._flushes, 3) if self._flushes else 0.0,
+                "flush_ms_max": round(self._flush_ms_max, 3),
+            }
+
+
+# ---------- process-wide writer ----------
+_default: Optional[WriteBehind] = None
+_default_lock = threading.Lock()
+
+
+def default_writer() -> WriteBehind:
+    """The shared writer for tasks_db's default path, started on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = WriteBehind(
+                max_queue=int(os.getenv("MINDSYNC_WRITE_QUEUE_SIZE", "10000")),
+                batch_size=int(os.getenv("MINDSYNC_WRITE_BATCH_SIZE", "500")),
+                flush_ms=float(os.getenv("MINDSYNC_WRITE_FLUSH_MS", "200")),
+                put_timeout=float(os.getenv("MINDSYNC_WRITE_PUT_TIMEOUT_MS", "1000")) / 1000.0,
+            )
+        return _default.start()
+
+
+def shutdown_default_writer() -> None:
+    """Flush and stop the shared writer (app shutdown); the next default_writer() starts a fresh one."""
+    global _default
+    with _default_lock:
+        writer, _default = _default, None
+    if writer is not None:
+        writer.stop()
+
+
+atexit.register(shutdown_default_writer)
@@ -10,12 +10,63 @@ export async function apiDetectMood(text) {
   return r.json();
 }
 
+// last schedule per request body, revalidated with its ETag
+const scheduleCache = new Map();
+
 export async function apiGenerateSchedule({ tasks, mood_label, start_time, break_min }) {
-  const r = await fetch(`${API_BASE}/generate_schedule`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ tasks, mood_label, start_time, break_min }),
-  });
+  const body = JSON.stringify({ tasks, mood_label, start_time, break_min });
+  const cached = scheduleCache.get(body);
+  const headers = { "Content-Type": "application/json" };
+  if (cached) headers["If-None-Match"] = cached.etag;
+  const r = await fetch(`${API_BASE}/generate_schedule`, { method: "POST", headers, body });
+  if (r.status === 304 && cached) return cached.data;
   if (!r.ok) throw new Error(`generate_schedule ${r.status}`);
+  const data = await r.json();
+  const etag = r.headers.get("ETag");
+  if (etag) {
+    scheduleCache.delete(body);
+    scheduleCache.set(body, { etag, data });
+    if (scheduleCache.size > 32) scheduleCache.delete(scheduleCache.keys().next().value);
+  }
+  return data;
+}
+
+export async function apiEvents({ user_id, start, end }) {
+  const qs = new URLSearchParams({ user_id, start, end });
+  const r = await fetch(`${API_BASE}/events?${qs}`);
+  if (!r.ok) throw new Error(`events ${r.status}`);
   return r.json();
 }
+
+// Runs a plan on the server and yields its Server-Sent Events as they arrive:
+// { event: "plan" | "task" | "done", data }. POST (not EventSource) so the task list
+// goes in the body; pass an AbortController's signal to stop listening.
+//   for await (const { event, data } of apiExecuteStream({ tasks, mood_label })) { ... }
+export async function* apiExecuteStream({ tasks, mood_label, start_time, task_interval, user_id }, { signal } = {}) {
+  const r = await fetch(`${API_BASE}/execute/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify({ tasks, mood_label, start_time, task_interval, user_id }),
+    signal,
+  });
+  if (!r.ok) throw new Error(`execute/stream ${r.status}`);
+  const reader = r.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buf = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buf += value;
+    let end;
+    while ((end = buf.indexOf("\n\n")) >= 0) {
+      const frame = buf.slice(0, end);
+      buf = buf.slice(end + 2);
+      let event = "message";
+      const data = [];
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+      }
+      if (data.length) yield { event, data: JSON.parse(data.join("\n")) };
+    }
+  }
+}